@@ -0,0 +1,257 @@
+# python_snake_game_archive.py
+# author: Robin Jiang
+#
+# this module packs many replays into one archive file that can be read through mmap, so that any game, or any
+# range of steps of a game, can be loaded without reading the rest of the file. Every game also gets a keyframe
+# (the full state of the game) every few steps, so the game at any step can be rebuilt without playing it back
+# from the start.
+#
+# layout of an archive, all big endian:
+#   header:    b"SNKA", format version (1 byte), number of games (4 bytes), offset of the index (8 bytes)
+#   per game:  the replay (see python_snake_game_replay), then its keyframes
+#   per game, keyframe table: for each keyframe, its step (4 bytes), offset (8 bytes) and size (4 bytes)
+#   index:     for each game, the offset (8 bytes) and size (4 bytes) of its replay, and the offset (8 bytes) of its
+#              keyframe table and number of keyframes (4 bytes)
+
+import mmap
+import struct
+import sys
+from array import array
+from typing import BinaryIO
+
+import python_snake_game_model
+import python_snake_game_replay
+
+MAGIC = b"SNKA"
+VERSION = 1
+HEADER = struct.Struct(">4sBIQ")
+INDEX_ENTRY = struct.Struct(">QIQI")
+KEYFRAME_ENTRY = struct.Struct(">IQI")
+
+# how many steps there are between keyframes by default
+KEYFRAME_INTERVAL = 256
+
+# keyframe (a packed SnakeGameSnapshot): step, flags (game over, still growing, point eaten, already turned),
+# queued turn (0 for none or 1-4 for N, E, S, W), snake length, point (row * cols + col, or -1), number of free
+# cells, random generator version, whether there is a gauss_next and gauss_next, then the snake cells, the snake
+# directions, the free cells and the random generator state
+_KEYFRAME = struct.Struct(">IBBIiIBBd")
+_RANDOM_STATE_SIZE = 625
+
+
+class ArchiveFormatError(Exception):
+    """For if a file is not an archive this module can read"""
+    pass
+
+
+class ArchiveWriter:
+    """Writes replays into an archive file. Keyframes are made by playing every replay back as it is added."""
+    def __init__(self, file: BinaryIO, keyframe_interval: int = KEYFRAME_INTERVAL) -> None:
+        self._file = file
+        self._keyframe_interval = keyframe_interval
+        self._index = []
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+
+    def add_replay(self, replay: bytes) -> int:
+        """Adds a replay (header and steps) to the archive and returns its game number"""
+        rows, cols, seed = _read_replay_header(replay)
+        replay_offset = self._file.tell()
+        self._file.write(replay)
+
+        keyframes = []
+        game = python_snake_game_replay.new_game(rows, cols, seed)
+        turns_of_step = python_snake_game_replay.STEP_TURNS
+        for step, byte in enumerate(memoryview(replay)[python_snake_game_replay.HEADER.size:], 1):
+            python_snake_game_replay.apply_step(game, turns_of_step[byte])
+            if step % self._keyframe_interval == 0:
+                data = encode_keyframe(game, step)
+                keyframes.append((step, self._file.tell(), len(data)))
+                self._file.write(data)
+
+        table_offset = self._file.tell()
+        for keyframe in keyframes:
+            self._file.write(KEYFRAME_ENTRY.pack(*keyframe))
+        self._index.append((replay_offset, len(replay), table_offset, len(keyframes)))
+        return len(self._index) - 1
+
+    def add_replay_file(self, path: str) -> int:
+        """Adds the replay saved at path to the archive and returns its game number"""
+        with open(path, "rb") as file:
+            return self.add_replay(file.read())
+
+    def close(self) -> None:
+        """Writes the index, fills in the header and closes the file"""
+        index_offset = self._file.tell()
+        for entry in self._index:
+            self._file.write(INDEX_ENTRY.pack(*entry))
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, len(self._index), index_offset))
+        self._file.close()
+
+
+class ArchiveReader:
+    """Reads games out of an archive file through mmap. Only the parts of the file that are asked for are read."""
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < HEADER.size:
+            raise ArchiveFormatError("the file is too short to be an archive")
+        magic, version, self._games, self._index_offset = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ArchiveFormatError("the file is not an archive")
+        if version != VERSION:
+            raise ArchiveFormatError(f"archive format version {version} is not supported")
+
+    def __len__(self) -> int:
+        return self._games
+
+    def __enter__(self) -> 'ArchiveReader':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def get_replay(self, game: int) -> memoryview:
+        """returns the replay (header and steps) of the game, without copying it"""
+        offset, size, _, _ = self._get_index_entry(game)
+        return memoryview(self._mmap)[offset:offset + size]
+
+    def get_header(self, game: int) -> tuple[int, int, int]:
+        """returns the rows, columns and seed of the game"""
+        offset, _, _, _ = self._get_index_entry(game)
+        return _read_replay_header(self._mmap, offset)
+
+    def get_step_count(self, game: int) -> int:
+        _, size, _, _ = self._get_index_entry(game)
+        return size - python_snake_game_replay.HEADER.size
+
+    def get_steps(self, game: int, start: int = 0, stop: int | None = None) -> bytes:
+        """returns the step bytes of the game from step start up to (not including) step stop"""
+        offset, size, _, _ = self._get_index_entry(game)
+        first = offset + python_snake_game_replay.HEADER.size
+        steps = size - python_snake_game_replay.HEADER.size
+        if stop is None or stop > steps:
+            stop = steps
+        return self._mmap[first + start:first + max(start, stop)]
+
+    def game_at(self, game: int, step: int | None = None) -> 'python_snake_game_model.SnakeGameState':
+        """Rebuilds the game after the given number of steps (or at the end), starting from the last keyframe
+        at or before that step instead of from the start of the game."""
+        rows, cols, seed = self.get_header(game)
+        steps = self.get_step_count(game)
+        if step is None or step > steps:
+            step = steps
+        keyframe = self._find_keyframe(game, step)
+        if keyframe is None:
+            start = 0
+            state = python_snake_game_replay.new_game(rows, cols, seed)
+        else:
+            keyframe_offset, keyframe_size = keyframe
+            start, state = decode_keyframe(self._mmap[keyframe_offset:keyframe_offset + keyframe_size], rows, cols)
+        turns_of_step = python_snake_game_replay.STEP_TURNS
+        for byte in self.get_steps(game, start, step):
+            python_snake_game_replay.apply_step(state, turns_of_step[byte])
+        return state
+
+    # protected class methods
+    def _get_index_entry(self, game: int) -> tuple[int, int, int, int]:
+        if not 0 <= game < self._games:
+            raise IndexError(f"there is no game {game} in the archive")
+        return INDEX_ENTRY.unpack_from(self._mmap, self._index_offset + game * INDEX_ENTRY.size)
+
+    def _find_keyframe(self, game: int, step: int) -> tuple[int, int] | None:
+        """returns the offset and size of the last keyframe at or before the step, or None if there is none.
+        Keyframes are in order of their steps, so this is a binary search."""
+        _, _, table_offset, count = self._get_index_entry(game)
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            keyframe_step, _, _ = KEYFRAME_ENTRY.unpack_from(self._mmap, table_offset + middle * KEYFRAME_ENTRY.size)
+            if keyframe_step <= step:
+                low = middle + 1
+            else:
+                high = middle
+        if low == 0:
+            return None
+        _, offset, size = KEYFRAME_ENTRY.unpack_from(self._mmap, table_offset + (low - 1) * KEYFRAME_ENTRY.size)
+        return offset, size
+
+
+def encode_keyframe(game: 'python_snake_game_model.SnakeGameState', step: int) -> bytes:
+    """Packs a snapshot of the game after the given step into bytes"""
+    snapshot = game.snapshot()
+    snake = snapshot.get_snake()
+    point = -1
+    if snapshot.get_point_coordinates() is not None:
+        row, col = snapshot.get_point_coordinates()
+        point = row * snapshot.get_columns() + col
+    flags = (snapshot.get_game_over() | snapshot.get_still_growing() << 1 | snapshot.get_point_eaten() << 2 |
+             snapshot.get_already_turned() << 3)
+    next_move = 0
+    if snapshot.get_next_move() is not None:
+        next_move = snapshot.get_next_move() + 1
+    free_cells = snapshot.get_free_cells()
+    random_version, random_state, gauss_next = snapshot.get_random_state()
+
+    return b"".join((
+        _KEYFRAME.pack(step, flags, next_move, len(snake), point, len(free_cells), random_version,
+                       gauss_next is not None, gauss_next or 0.0),
+        struct.pack(f">{len(snake)}I", *snake),
+        snapshot.get_directions(),
+        _pack_cells(free_cells),
+        struct.pack(f">{_RANDOM_STATE_SIZE}I", *random_state),
+    ))
+
+
+def decode_keyframe(data: bytes, rows: int, cols: int) -> tuple[int, 'python_snake_game_model.SnakeGameState']:
+    """Unpacks a keyframe made by encode_keyframe. Returns its step and the game at that step."""
+    (step, flags, next_move, length, point, free_count, random_version,
+     has_gauss_next, gauss_next) = _KEYFRAME.unpack_from(data, 0)
+    offset = _KEYFRAME.size
+    snake = list(struct.unpack_from(f">{length}I", data, offset))
+    offset += 4 * length
+    directions = bytes(data[offset:offset + length])
+    offset += length
+    free_cells = _unpack_cells(data[offset:offset + 4 * free_count])
+    offset += 4 * free_count
+    random_state = struct.unpack_from(f">{_RANDOM_STATE_SIZE}I", data, offset)
+
+    snapshot = python_snake_game_model.SnakeGameSnapshot(
+        rows, cols, snake, directions, divmod(point, cols) if point != -1 else None, free_cells, None,
+        bool(flags & 1), bool(flags & 2), bool(flags & 4), bool(flags & 8), next_move - 1 if next_move else None,
+        (random_version, random_state, gauss_next if has_gauss_next else None))
+    return step, python_snake_game_model.SnakeGameState.from_snapshot(snapshot)
+
+
+def _pack_cells(cells: array) -> bytes:
+    """Packs an array of cells as 4 byte big endian ints. The free cells of a keyframe can be most of the board,
+    so they are packed as one array instead of one int at a time."""
+    if cells.itemsize != 4 or sys.byteorder == "big":
+        return struct.pack(f">{len(cells)}I", *cells)
+    swapped = array('i', cells)
+    swapped.byteswap()
+    return swapped.tobytes()
+
+
+def _unpack_cells(data: bytes) -> array:
+    """unpacks cells packed by _pack_cells"""
+    cells = array('i')
+    if cells.itemsize != 4:
+        return array('i', struct.unpack(f">{len(data) // 4}I", data))
+    cells.frombytes(data)
+    if sys.byteorder == "little":
+        cells.byteswap()
+    return cells
+
+
+def _read_replay_header(data: bytes, offset: int = 0) -> tuple[int, int, int]:
+    """returns the rows, columns and seed of the replay starting at offset"""
+    if len(data) - offset < python_snake_game_replay.HEADER.size:
+        raise python_snake_game_replay.ReplayFormatError("the data is too short to be a replay")
+    magic, version, rows, cols, seed = python_snake_game_replay.HEADER.unpack_from(data, offset)
+    if magic != python_snake_game_replay.MAGIC or version != python_snake_game_replay.VERSION:
+        raise python_snake_game_replay.ReplayFormatError("the data is not a replay this module can read")
+    return rows, cols, seed
@@ -0,0 +1,78 @@
+# python_snake_game_archive_test.py
+# author: Robin Jiang
+#
+# this is the unittesting for replay archives
+
+import io
+import os
+import random
+import tempfile
+import unittest
+from python_snake_game_archive import *
+from python_snake_game_replay import ReplayReader, ReplayRecorder
+
+
+class TestArchive(unittest.TestCase):
+    """Tests that games come out of an archive the same as they went in"""
+    def setUp(self):
+        self._replays = [_record_game(seed) for seed in range(6)]
+        handle, self._path = tempfile.mkstemp(suffix=".snka")
+        os.close(handle)
+        writer = ArchiveWriter(open(self._path, "wb"), keyframe_interval=4)
+        for replay in self._replays:
+            writer.add_replay(replay)
+        writer.close()
+        self._archive = ArchiveReader(self._path)
+
+    def tearDown(self):
+        self._archive.close()
+        os.remove(self._path)
+
+    def test_replays_come_back_out_unchanged(self):
+        self.assertEqual(len(self._replays), len(self._archive))
+        for game, replay in enumerate(self._replays):
+            self.assertEqual(replay, bytes(self._archive.get_replay(game)))
+            self.assertEqual(len(replay) - python_snake_game_replay.HEADER.size, self._archive.get_step_count(game))
+            first_step = python_snake_game_replay.HEADER.size
+            self.assertEqual(replay[first_step + 3:first_step + 9], self._archive.get_steps(game, 3, 9))
+
+    def test_game_at_every_step_matches_playing_the_replay(self):
+        for game, replay in enumerate(self._replays):
+            reader = ReplayReader(io.BytesIO(replay))
+            boards = [state._prepare_print_board() for state in reader.iter_games()]
+            for step in range(1, len(boards) + 1):
+                self.assertEqual(boards[step - 1], self._archive.game_at(game, step)._prepare_print_board())
+
+    def test_fast_forwarded_game_carries_on_the_same(self):
+        # the random generator and free cells come back from the keyframe, so new points match too
+        game = self._archive.game_at(0, 4)
+        self.assertEqual(ReplayReader(io.BytesIO(self._replays[0])).replay().get_snake_length(),
+                         self._archive.game_at(0).get_snake_length())
+        for byte in self._archive.get_steps(0, 4):
+            python_snake_game_replay.apply_step(game, python_snake_game_replay.STEP_TURNS[byte])
+        self.assertEqual(self._archive.game_at(0)._prepare_print_board(), game._prepare_print_board())
+
+
+def _record_game(seed: int) -> bytes:
+    """Records a game where the snake heads for the point, turning randomly now and then"""
+    file = io.BytesIO()
+    recorder = ReplayRecorder(file, 8, 8, seed=seed)
+    game = recorder.get_game()
+    turn_random = random.Random(seed)
+    while not game.get_game_over():
+        head = game.get_snake_head()
+        point = game.get_point_coordinates()
+        if point is not None and turn_random.random() < 0.8:
+            if point[0] != head.get_row():
+                recorder.turn("N" if point[0] < head.get_row() else "S")
+            else:
+                recorder.turn("W" if point[1] < head.get_column() else "E")
+        else:
+            recorder.turn(turn_random.choice("NESW"))
+        recorder.progress_game()
+    recorder._writer.flush()
+    return file.getvalue()
+
+
+if __name__ == "__main__":
+    unittest.main()
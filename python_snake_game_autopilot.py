@@ -0,0 +1,585 @@
+# python_snake_game_autopilot.py
+# author: Robin Jiang
+#
+# this module contains an autopilot that plays the snake game by itself. It heads for the point along a path found
+# by an A* search, but only if the snake could still reach its own tail after eating the point. Otherwise it
+# follows its tail until a safe path opens up.
+#
+# the autopilot keeps its own copy of where the snake is, which it moves along with the game each step instead
+# of reading the whole board, and a path is followed to its end (or until the point moves) before searching
+# again, so most steps don't search at all. Searches use arrays made once per board size, and a generation
+# number instead of clearing them.
+#
+# so that no decision takes long however big the board is, the searches of one decision can only visit
+# SEARCH_BUDGET cells between them. The search for the point starts from the point and is carried on from one
+# decision to the next until it gets to the head, and the snake follows its tail until then. A path to the tail
+# never runs out, since every cell the tail leaves is added to the end of it.
+#
+# there is also a Hamiltonian autopilot, which never loses. It moves along a cycle that goes through every cell of
+# the board once, taking shortcuts towards the point that can't trap the snake. The cycle for each board size is
+# made once and kept, in memory and optionally on disk, so every step is a few table lookups.
+
+import os
+from array import array
+from collections import deque
+
+import python_snake_game_model
+
+# change in (row, col) for moving in each direction, in the order of "NESW"
+_DELTAS = ((-1, 0), (0, 1), (1, 0), (0, -1))
+
+# how many cells the searches of one decision can visit between them. At one or two microseconds a cell, this
+# keeps decisions under a millisecond
+SEARCH_BUDGET = 300
+
+# how much of the budget the search for the point and the check that its path is safe can use, so that there is
+# some left to find the tail
+POINT_BUDGET = SEARCH_BUDGET // 2
+
+# how many cells are counted around each neighbour of the head, even once the budget has run out, so that the
+# snake doesn't turn into a dead end it could have seen
+MIN_ROOM = 16
+
+# Hamiltonian cycles already made, keyed by (rows, cols)
+_cycles = {}
+
+
+class Autopilot:
+    """Chooses which way the snake should turn. An autopilot can be called as a policy of
+    python_snake_game_headless, and follows whichever game it was last called with."""
+    def __init__(self) -> None:
+        self._game = None
+        self._rows = 0
+        self._cols = 0
+
+        # the snake as cells (row * cols + col) from tail to head, and which cells it is on
+        self._snake = deque()
+        self._occupied = bytearray()
+
+        # the cells the snake is following (not including the head), to the point or to the tail,
+        # and the point that was on the board when the path was found
+        self._path = deque()
+        self._path_point = None
+        # whether the path goes to the tail. Every cell the tail leaves is then added to the end of the path, since
+        # it stays empty until the head gets there
+        self._following_tail = False
+
+        # the neighbours of every cell, and arrays for counting the room around a cell, made once per board size.
+        # a cell has been counted if its entry in _seen is the current generation
+        self._neighbours = array('i')
+        self._seen = array('I')
+        self._queue = array('i')
+        self._generation = 0
+
+        # the search for the point, carried on from one decision to the next, and the search for the tail
+        self._point_search = None
+        self._tail_search = None
+        # how many more cells the searches of this decision can visit
+        self._budget = 0
+
+    def __call__(self, game: 'python_snake_game_model.SnakeGameState') -> str | None:
+        return self.choose_move(game)
+
+    def __getstate__(self) -> dict:
+        """The game isn't pickled, so that an autopilot can be sent to other processes"""
+        state = self.__dict__.copy()
+        state["_game"] = None
+        return state
+
+    def choose_move(self, game: 'python_snake_game_model.SnakeGameState') -> str | None:
+        """Returns the direction to turn ("N", "E", "S", "W") before the next step, or None to keep going straight.
+        Works with SnakeGameState and CompactSnakeGameState."""
+        head_block = game.get_snake_head()
+        self._follow(game, head_block.get_row() * self._cols + head_block.get_column() if self._cols else -1)
+        head = self._snake[-1]
+        direction = "NESW".index(head_block.get_direction())
+        behind = self._neighbours[head * 4 + (direction + 2) % 4]
+        point = game.get_point_coordinates()
+        next_cell = self._choose_cell(head, behind, point[0] * self._cols + point[1] if point is not None else -1)
+        if next_cell == -1:
+            return None
+        move = "NESW"[self._neighbours[head * 4:head * 4 + 4].index(next_cell)]
+        if move == head_block.get_direction():
+            return None
+        return move
+
+    def reset(self) -> None:
+        """Forgets the game, so the next call reads the snake from the game again"""
+        self._game = None
+
+    # protected class methods
+    def _choose_cell(self, head: int, behind: int, point: int) -> int:
+        """returns the cell the head should move into next, or -1 if every way is blocked.
+        behind is the cell the snake can't turn back into, and point is -1 if there is no point."""
+        self._budget = SEARCH_BUDGET
+        if len(self._path) == 0 or point != self._path_point:
+            self._plan(head, behind, point)
+        elif self._following_tail and point != -1:
+            # the search for the point may have got to the head since the last step
+            self._try_point(head, behind, point)
+        if len(self._path) > 0:
+            return self._path[0]
+        return self._roomiest_neighbour(head, behind, point)
+
+    def _follow(self, game: 'python_snake_game_model.SnakeGameState', head: int) -> None:
+        """Moves the copy of the snake along with the game. If the game has changed in any other way than
+        taking a step (a new game, or a restored snapshot), the snake is read from the game again."""
+        snake = self._snake
+        if game is self._game and len(snake) > 0:
+            if head != snake[-1] and head in self._neighbours[snake[-1] * 4:snake[-1] * 4 + 4]:
+                snake.append(head)
+                self._occupied[head] = 1
+                if len(self._path) > 0 and self._path[0] == head:
+                    self._path.popleft()
+                else:
+                    self._path.clear()
+                    self._following_tail = False
+                while len(snake) > game.get_snake_length():
+                    tail = snake.popleft()
+                    self._occupied[tail] = 0
+                    # the tail the path was found to is already at the end of it
+                    if self._following_tail and (len(self._path) == 0 or tail != self._path[-1]):
+                        self._path.append(tail)
+            if head == snake[-1] and len(snake) == game.get_snake_length():
+                return
+        self._read_snake(game)
+
+    def _read_snake(self, game: 'python_snake_game_model.SnakeGameState') -> None:
+        """Reads the whole snake from the game"""
+        self._game = game
+        tail = game.get_snake_tail()
+        rows, cols = game.get_rows(), game.get_columns()
+        if (rows, cols) != (self._rows, self._cols):
+            self._allocate(rows, cols)
+        else:
+            for cell in self._snake:
+                self._occupied[cell] = 0
+            self._point_search.stop()
+        self._snake.clear()
+        self._path.clear()
+        self._path_point = None
+        self._following_tail = False
+        block = tail
+        while block is not None:
+            cell = block.get_row() * cols + block.get_column()
+            self._snake.append(cell)
+            self._occupied[cell] = 1
+            block = block.get_next()
+
+    def _allocate(self, rows: int, cols: int) -> None:
+        """Makes the arrays for a board of this size"""
+        self._rows = rows
+        self._cols = cols
+        cells = rows * cols
+        self._occupied = bytearray(cells)
+        # made from shifted ranges a direction at a time rather than cell by cell, since this is done in the first
+        # decision on a board and would take over ten milliseconds on a 100x100 one
+        no_cells = array('i', [-1])
+        east = array('i', range(1, cells + 1))
+        east[cols - 1::cols] = no_cells * rows
+        west = array('i', range(-1, cells - 1))
+        west[::cols] = no_cells * rows
+        self._neighbours = no_cells * (cells * 4)
+        self._neighbours[0::4] = no_cells * cols + array('i', range(cells - cols))
+        self._neighbours[1::4] = east
+        self._neighbours[2::4] = array('i', range(cols, cells)) + no_cells * cols
+        self._neighbours[3::4] = west
+        self._seen = array('I', [0]) * cells
+        self._queue = array('i', [0]) * cells
+        self._generation = 0
+        self._point_search = _Search(self._neighbours, self._occupied, cols)
+        self._tail_search = _Search(self._neighbours, self._occupied, cols)
+
+    def _plan(self, head: int, behind: int, point: int) -> None:
+        """Finds a new path: a path to the point if it is safe, or else a path to the tail.
+        The path is followed until the snake gets to the end of it or the point moves, since the cells on it
+        stay empty until then. If there is no path yet, the path is left empty."""
+        self._path.clear()
+        self._path_point = point
+        self._following_tail = False
+        if point != -1 and self._try_point(head, behind, point):
+            return
+        # while the snake is still growing its tail doesn't move, so it can't be followed
+        if len(self._snake) >= 4:
+            path = self._find_path(head, self._snake[0], behind)
+            if path is not None:
+                self._path.extend(path)
+                self._following_tail = True
+
+    def _try_point(self, head: int, behind: int, point: int) -> bool:
+        """Carries on the search for the point, and if it has got to the head, takes the path to the point
+        instead of the one being followed if it is safe. Returns whether it was taken."""
+        search = self._point_search
+        if search.get_start() != point or search.is_finished():
+            # a search that has finished without getting to the head went around cells the snake has left since
+            search.start(point, head)
+        budget = min(self._budget, POINT_BUDGET)
+        starts = [cell for cell in self._neighbours[head * 4:head * 4 + 4]
+                  if cell != -1 and cell != behind and not self._occupied[cell]]
+        cell = search.nearest(starts)
+        if cell == -1:
+            cell = search.run(budget, starts)
+            budget -= search.get_visited()
+            self._budget -= search.get_visited()
+            if cell == -1:
+                return False
+        # the search started from the point, so this goes from next to the head to the point
+        path = search.trace(cell)
+        if any(self._occupied[cell] for cell in path):
+            # the search went through cells the snake has moved into since
+            search.stop()
+            return False
+        kept = self._budget - budget
+        self._budget = budget
+        safe = self._safe_after(path)
+        self._budget += kept
+        if not safe:
+            return False
+        self._path.clear()
+        self._path.extend(path)
+        self._following_tail = False
+        return True
+
+    def _find_path(self, start: int, target: int, blocked: int) -> list[int] | None:
+        """returns a path from start (not included) to target, not going straight from start into blocked,
+        or None if there is none or the budget runs out first"""
+        search = self._tail_search
+        search.start(start, target, blocked)
+        found = search.run(self._budget, (target,))
+        self._budget -= search.get_visited()
+        if found == -1:
+            return None
+        path = search.trace(target)
+        path.pop()
+        path.reverse()
+        return path
+
+    def _roomiest_neighbour(self, head: int, behind: int, point: int) -> int:
+        """Returns the empty cell next to the head with the most cells reachable from it, or -1 if there is none.
+        Only as many cells as are left in the budget are counted around each one, so the cells are tried nearest
+        to the point first, and the first one with more room than can be counted is taken straight away."""
+        cells = [cell for cell in self._neighbours[head * 4:head * 4 + 4]
+                 if cell != -1 and cell != behind and not self._occupied[cell]]
+        if point != -1:
+            cells.sort(key=lambda cell: _distance(cell, point, self._cols))
+        best, best_room = -1, 0
+        for index, cell in enumerate(cells):
+            limit = max(MIN_ROOM, self._budget // (len(cells) - index))
+            room = self._count_reachable(cell, limit)
+            self._budget -= room
+            if room >= limit:
+                return cell
+            if room > best_room:
+                best, best_room = cell, room
+        return best
+
+    def _safe_after(self, path: list[int]) -> bool:
+        """Returns whether the snake could still reach its tail after following the path and eating the point.
+        The copy of the snake is moved to the end of the path for the check and then put back."""
+        snake = self._snake
+        occupied = self._occupied
+        length = len(snake)
+        # the snake grows on every step while it is shorter than 3, and on the step it eats the point
+        for step in range(len(path)):
+            if length < 3 or step == len(path) - 1:
+                length += 1
+        cells = list(snake) + path
+        vacated = len(cells) - length
+        if vacated >= len(cells) - 1:
+            return True
+        for cell in cells[:vacated]:
+            occupied[cell] = 0
+        for cell in cells[max(vacated, len(snake)):]:
+            occupied[cell] = 1
+        search = self._tail_search
+        search.start(cells[-1], cells[vacated])
+        found = search.run(self._budget, (cells[vacated],))
+        self._budget -= search.get_visited()
+        # if the budget runs out first, the snake has at least as much room as the search went through,
+        # which is safe enough if the snake fits in it
+        safe = found != -1 or (not search.is_finished() and search.get_visited() >= length)
+        for cell in path:
+            occupied[cell] = 0
+        for cell in snake:
+            occupied[cell] = 1
+        return safe
+
+    def _count_reachable(self, start: int, limit: int) -> int:
+        """returns how many empty cells can be reached from the empty cell start, including itself,
+        counting up to limit"""
+        generation = self._next_generation()
+        seen = self._seen
+        queue = self._queue
+        neighbours = self._neighbours
+        occupied = self._occupied
+        seen[start] = generation
+        queue[0] = start
+        index, size = 0, 1
+        while index < size and size < limit:
+            base = queue[index] * 4
+            index += 1
+            for neighbour in (neighbours[base], neighbours[base + 1], neighbours[base + 2], neighbours[base + 3]):
+                if neighbour != -1 and seen[neighbour] != generation and not occupied[neighbour]:
+                    seen[neighbour] = generation
+                    queue[size] = neighbour
+                    size += 1
+        return min(size, limit)
+
+    def _next_generation(self) -> int:
+        """Starts a new count. The seen array only has to be cleared when the generation wraps around."""
+        self._generation += 1
+        if self._generation == 0xFFFFFFFF:
+            self._seen = array('I', [0]) * len(self._seen)
+            self._generation = 1
+        return self._generation
+
+
+class _Search:
+    """A* search through the empty cells of a board, from a start cell towards a target cell, with the distance
+    to the target (ignoring the snake) as the estimate. It can be stopped when it runs out of budget and carried
+    on later. Each step changes the estimate of the whole path by 0 (towards the target) or 2 (away from it), so
+    instead of a heap there are two lists: the cells on the current estimate, tried last in first, so that on an
+    open board the search goes straight to the target, and the cells on the next one."""
+    def __init__(self, neighbours: array, occupied: bytearray, cols: int) -> None:
+        self._neighbours = neighbours
+        self._occupied = occupied
+        self._cols = cols
+        cells = len(occupied)
+        # a cell has been reached if its entry in _seen is the current generation, and searched from if its entry
+        # in _closed is. The cost of a cell is how many steps it is from the start.
+        self._seen = array('I', [0]) * cells
+        self._closed = array('I', [0]) * cells
+        self._parent = array('i', [-1]) * cells
+        self._cost = array('i', [0]) * cells
+        self._generation = 0
+        self._start = -1
+        self._target_row = 0
+        self._target_col = 0
+        self._current = []
+        self._later = []
+        self._visited = 0
+
+    def start(self, start: int, target: int, blocked: int = -1) -> None:
+        """Starts a new search from start towards target, not going straight from start into blocked.
+        The empty cells next to start are reached straight away (the tail only moves out of the way after the
+        head has moved, so the target can't be reached from start if it is part of the snake)."""
+        self._generation += 1
+        if self._generation == 0xFFFFFFFF:
+            self._seen = array('I', [0]) * len(self._seen)
+            self._closed = array('I', [0]) * len(self._closed)
+            self._generation = 1
+        generation = self._generation
+        self._start = start
+        self._target_row, self._target_col = divmod(target, self._cols)
+        self._seen[start] = generation
+        self._closed[start] = generation
+        self._cost[start] = 0
+        self._current = []
+        self._later = []
+        self._visited = 0
+        row, col = divmod(start, self._cols)
+        towards = (self._target_row < row, self._target_col > col, self._target_row > row, self._target_col < col)
+        for direction in range(4):
+            cell = self._neighbours[start * 4 + direction]
+            if cell == -1 or cell == blocked or self._occupied[cell]:
+                continue
+            self._seen[cell] = generation
+            self._cost[cell] = 1
+            self._parent[cell] = start
+            (self._current if towards[direction] else self._later).append(cell)
+
+    def stop(self) -> None:
+        """Ends the search, so that it is started again the next time it is needed"""
+        self._start = -1
+
+    def run(self, budget: int, goals: tuple[int, ...] | list[int]) -> int:
+        """Searches from up to budget more cells, until it gets to one of the goals, and returns that goal
+        (or -1 if it didn't get to one). A goal can be part of the snake. Goals next to the start aren't looked
+        for, see start and nearest."""
+        generation = self._generation
+        seen = self._seen
+        closed = self._closed
+        parent = self._parent
+        cost = self._cost
+        neighbours = self._neighbours
+        occupied = self._occupied
+        cols = self._cols
+        target_row, target_col = self._target_row, self._target_col
+        current, later = self._current, self._later
+        visited = 0
+        found = -1
+        while found == -1 and visited < budget:
+            if not current:
+                if not later:
+                    break
+                current, later = later, current
+            cell = current.pop()
+            if closed[cell] == generation:
+                # it was reached again more cheaply and has already been searched from
+                continue
+            closed[cell] = generation
+            visited += 1
+            row, col = divmod(cell, cols)
+            # whether going N, E, S and W leads towards the target
+            towards = (target_row < row, target_col > col, target_row > row, target_col < col)
+            next_cost = cost[cell] + 1
+            base = cell * 4
+            for direction in range(4):
+                neighbour = neighbours[base + direction]
+                if neighbour == -1 or (seen[neighbour] == generation and cost[neighbour] <= next_cost):
+                    continue
+                if neighbour in goals:
+                    parent[neighbour] = cell
+                    cost[neighbour] = next_cost
+                    seen[neighbour] = generation
+                    found = neighbour
+                    break
+                if occupied[neighbour]:
+                    continue
+                seen[neighbour] = generation
+                cost[neighbour] = next_cost
+                parent[neighbour] = cell
+                if towards[direction]:
+                    current.append(neighbour)
+                else:
+                    later.append(neighbour)
+        self._current, self._later = current, later
+        self._visited = visited
+        return found
+
+    def nearest(self, cells: list[int]) -> int:
+        """returns whichever of the cells the search has already got to cheapest, or -1 if it has got to none"""
+        generation = self._generation
+        reached = [cell for cell in cells if self._seen[cell] == generation]
+        if self._start == -1 or len(reached) == 0:
+            return -1
+        return min(reached, key=self._cost.__getitem__)
+
+    def trace(self, cell: int) -> list[int]:
+        """returns the cells from cell back to the start of the search"""
+        path = [cell]
+        while cell != self._start:
+            cell = self._parent[cell]
+            path.append(cell)
+        return path
+
+    def get_start(self) -> int:
+        return self._start
+
+    def get_visited(self) -> int:
+        """returns how many cells the last run searched from"""
+        return self._visited
+
+    def is_finished(self) -> bool:
+        """returns whether every cell the search can get to has been searched from"""
+        return not self._current and not self._later
+
+
+def _distance(cell: int, other: int, cols: int) -> int:
+    """returns how many steps apart the cells would be if nothing was in the way"""
+    row, col = divmod(cell, cols)
+    other_row, other_col = divmod(other, cols)
+    return abs(row - other_row) + abs(col - other_col)
+
+
+class HamiltonianAutopilot(Autopilot):
+    """Autopilot that follows a Hamiltonian cycle of the board, so the snake always fills the board in the end.
+    The board needs an even number of rows or columns, or else there is no such cycle.
+
+    The snake always lies along the cycle between its tail and its head, so the cells ahead of the head on the
+    cycle, up to the tail, are empty. If shortcuts is True, the head jumps to whichever neighbouring cell is
+    furthest ahead on the cycle without passing the point or getting within half a board of the tail,
+    which keeps that true.
+    If cache_dir is given, the cycles are saved there and loaded again by later autopilots."""
+    def __init__(self, shortcuts: bool = True, cache_dir: str | None = None) -> None:
+        super().__init__()
+        self._shortcuts = shortcuts
+        self._cache_dir = cache_dir
+        # the cells in the order of the cycle, and the position of each cell in the cycle
+        self._cycle = array('i')
+        self._order = array('i')
+
+    # protected class methods
+    def _choose_cell(self, head: int, behind: int, point: int) -> int:
+        order = self._order
+        cells = len(order)
+        here = order[head]
+        # how far ahead on the cycle the tail and point are. moving onto the tail is a crash, since it only
+        # moves out of the way after the head has moved
+        tail_distance = (order[self._snake[0]] - here) % cells or cells
+        point_distance = (order[point] - here) % cells if point != -1 else cells
+
+        # the nearest cell ahead is the next one on the cycle, except when a snake of one block would have to
+        # turn back to get to it. a snake that short can start anywhere on the cycle
+        nearest, nearest_distance = -1, cells
+        furthest, furthest_distance = -1, 0
+        for cell in self._neighbours[head * 4:head * 4 + 4]:
+            if cell == -1 or cell == behind:
+                continue
+            distance = (order[cell] - here) % cells
+            if distance >= tail_distance:
+                continue
+            if distance < nearest_distance:
+                nearest, nearest_distance = cell, distance
+            # a shortcut has to leave half of the board free ahead of the head, so that the snake doesn't
+            # grow into its tail before it has moved past the cells that were skipped
+            if (self._shortcuts and furthest_distance < distance <= point_distance and
+                    distance <= tail_distance - cells // 2):
+                furthest, furthest_distance = cell, distance
+        return furthest if furthest != -1 else nearest
+
+    def _allocate(self, rows: int, cols: int) -> None:
+        super()._allocate(rows, cols)
+        self._cycle, self._order = hamiltonian_cycle(rows, cols, self._cache_dir)
+
+
+def hamiltonian_cycle(rows: int, cols: int, cache_dir: str | None = None) -> tuple[array, array]:
+    """Returns a cycle through every cell (row * cols + col) of the board, and the position of each cell in it.
+    Cycles are only made once for each size. Raises ValueError if rows and cols are both odd."""
+    if (rows, cols) in _cycles:
+        return _cycles[rows, cols]
+    if rows % 2 == 1 and cols % 2 == 1:
+        raise ValueError("a board with an odd number of rows and columns has no Hamiltonian cycle")
+    path = None
+    if cache_dir is not None:
+        path = os.path.join(cache_dir, f"hamiltonian-{rows}x{cols}.cycle")
+        cycle = _load_cycle(path, rows * cols)
+    if path is None or cycle is None:
+        cycle = _make_cycle(rows, cols)
+        if path is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(path, "wb") as file:
+                cycle.tofile(file)
+    order = array('i', [0]) * len(cycle)
+    for position, cell in enumerate(cycle):
+        order[cell] = position
+    _cycles[rows, cols] = cycle, order
+    return _cycles[rows, cols]
+
+
+def _make_cycle(rows: int, cols: int) -> array:
+    """Makes a Hamiltonian cycle: along the top row, down and up the columns from the right, except for the
+    first column, and back up the first column. That works when cols is even, so if only rows is even, the
+    cycle for the board turned on its side is made and turned back."""
+    if cols % 2 == 1:
+        # a cell at (row, col) of the board turned on its side is at (col, row) of this one
+        return array('i', ((cell % rows) * cols + cell // rows for cell in _make_cycle(cols, rows)))
+    cycle = array('i', range(cols))
+    for index, col in enumerate(range(cols - 1, 0, -1)):
+        rows_in_order = range(1, rows) if index % 2 == 0 else range(rows - 1, 0, -1)
+        cycle.extend(row * cols + col for row in rows_in_order)
+    cycle.extend(row * cols for row in range(rows - 1, 0, -1))
+    return cycle
+
+
+def _load_cycle(path: str, cells: int) -> array | None:
+    """returns the cycle saved at path, or None if there isn't one for a board of this many cells"""
+    try:
+        with open(path, "rb") as file:
+            cycle = array('i')
+            cycle.fromfile(file, cells)
+            if file.read(1) != b"":
+                return None
+    except (OSError, EOFError):
+        return None
+    return cycle
@@ -0,0 +1,107 @@
+# python_snake_game_autopilot_test.py
+# author: Robin Jiang
+#
+# this is the unittesting for the autopilot
+
+import os
+import pickle
+import random
+import tempfile
+import unittest
+import python_snake_game_autopilot
+from python_snake_game_autopilot import *
+from python_snake_game_headless import play, run_episode
+from python_snake_game_model import CompactSnakeGameState, SnakeGameState
+
+
+class TestAutopilot(unittest.TestCase):
+    """Tests that the autopilot plays well and keeps up with the game it is playing"""
+    def test_autopilot_eats_most_of_the_board(self):
+        for seed in range(5):
+            steps, score = run_episode(Autopilot(), 9, 9, max_steps=20000, seed=seed)
+            self.assertGreater(score, 30)
+
+    def test_autopilot_plays_both_game_classes_the_same(self):
+        for seed in range(3):
+            results = [run_episode(Autopilot(), 8, 11, max_steps=5000, game_class=game_class, seed=seed)
+                       for game_class in (SnakeGameState, CompactSnakeGameState)]
+            self.assertEqual(results[0], results[1])
+
+    def test_decisions_stay_within_the_search_budget_on_a_large_board(self):
+        # counted in cells rather than timed, so that a slow machine can't fail it; at one or two microseconds
+        # a cell this keeps every decision on a 100x100 board under a millisecond
+        game = CompactSnakeGameState(100, 100, rng=random.Random(0))
+        autopilot = Autopilot()
+        spent = []
+
+        def policy(game):
+            move = autopilot.choose_move(game)
+            spent.append(SEARCH_BUDGET - autopilot._budget)
+            return move
+
+        play(game, policy, 4000)
+        self.assertFalse(game.get_game_over())
+        self.assertGreater(game.get_snake_length(), 20)
+        # the room around each of the (at most three) cells the head can move into is always counted a little
+        self.assertLessEqual(max(spent), SEARCH_BUDGET + 3 * MIN_ROOM)
+
+    def test_autopilot_follows_a_restored_game(self):
+        game = SnakeGameState(9, 9, rng=random.Random(4))
+        autopilot = Autopilot()
+        play(game, autopilot, 60)
+        snapshot = game.snapshot()
+        play(game, autopilot, 25)
+        game.restore(snapshot)
+        self.assertEqual(Autopilot().choose_move(game), autopilot.choose_move(game))
+        fresh_game = SnakeGameState.from_snapshot(snapshot)
+        play(fresh_game, Autopilot(), 40)
+        play(game, autopilot, 40)
+        self.assertEqual(fresh_game._prepare_print_board(), game._prepare_print_board())
+
+    def test_autopilot_can_be_pickled_after_playing(self):
+        autopilot = Autopilot()
+        play(SnakeGameState(9, 9, rng=random.Random(0)), autopilot, 30)
+        game = SnakeGameState(9, 9, rng=random.Random(1))
+        self.assertEqual(Autopilot().choose_move(game), pickle.loads(pickle.dumps(autopilot)).choose_move(game))
+
+
+class TestHamiltonianAutopilot(unittest.TestCase):
+    """Tests the Hamiltonian cycles and that the autopilot following them fills the board"""
+    def test_cycle_goes_through_every_cell_once(self):
+        for rows, cols in ((2, 2), (4, 4), (6, 5), (5, 6), (9, 16)):
+            cycle, order = hamiltonian_cycle(rows, cols)
+            self.assertEqual(list(range(rows * cols)), sorted(cycle))
+            for position, cell in enumerate(cycle):
+                self.assertEqual(position, order[cell])
+                next_row, next_col = divmod(cycle[(position + 1) % len(cycle)], cols)
+                row, col = divmod(cell, cols)
+                self.assertEqual(1, abs(next_row - row) + abs(next_col - col))
+
+    def test_cycles_are_made_once(self):
+        self.assertIs(hamiltonian_cycle(6, 8), hamiltonian_cycle(6, 8))
+        with self.assertRaises(ValueError):
+            hamiltonian_cycle(9, 9)
+
+    def test_cycles_are_saved_to_disk(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cycle, order = hamiltonian_cycle(7, 4, cache_dir)
+            self.assertTrue(os.path.exists(os.path.join(cache_dir, "hamiltonian-7x4.cycle")))
+            del python_snake_game_autopilot._cycles[7, 4]
+            self.assertEqual((cycle, order), hamiltonian_cycle(7, 4, cache_dir))
+
+    def test_autopilot_fills_the_board(self):
+        for game_class in (SnakeGameState, CompactSnakeGameState):
+            for shortcuts in (True, False):
+                for seed in range(5):
+                    steps, score = run_episode(HamiltonianAutopilot(shortcuts), 8, 7, game_class=game_class,
+                                               seed=seed)
+                    self.assertEqual(8 * 7, score)
+
+    def test_shortcuts_take_fewer_steps(self):
+        with_shortcuts = sum(run_episode(HamiltonianAutopilot(True), 10, 10, seed=seed)[0] for seed in range(5))
+        without_shortcuts = sum(run_episode(HamiltonianAutopilot(False), 10, 10, seed=seed)[0] for seed in range(5))
+        self.assertLess(with_shortcuts, without_shortcuts)
+
+
+if __name__ == "__main__":
+    unittest.main()
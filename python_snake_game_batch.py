@@ -0,0 +1,215 @@
+# python_snake_game_batch.py
+# author: Robin Jiang
+#
+# this module runs many snake games in lockstep, with every board stored in one NumPy array so that a step of
+# all of the games is a handful of array operations. It follows the same rules as SnakeGameState.
+
+import random
+
+import numpy as np
+
+from python_snake_game_model import NORTH, EAST, SOUTH, _EMPTY, _HEAD, _BODY, _POINT
+
+# no turn, as opposed to one of the directions
+NO_TURN = -1
+
+
+class BatchSnakeEnv:
+    """Holds num_envs snake games of the same size and steps all of them at once.
+    Game i plays exactly the same game as a SnakeGameState after random.seed(seeds[i]), given the same turns.
+    Games that are over stay as they are until they are reset."""
+    def __init__(self, num_envs: int, rows: int = 9, cols: int = 9, seeds: list[int] | None = None) -> None:
+        """Minimum 3 rows and 3 cols. seeds defaults to 0, 1, ..., num_envs - 1"""
+        self._num_envs = num_envs
+        self._rows = rows
+        self._cols = cols
+        size = rows * cols
+        self._envs = np.arange(num_envs)
+
+        # cell states indexed by row * cols + col, as indexes into POSSIBLE_STATES
+        self._cells = np.zeros((num_envs, size), dtype=np.int8)
+
+        # the snake, as a ring buffer of cells from tail to head
+        self._body = np.zeros((num_envs, size), dtype=np.int32)
+        self._head_index = np.zeros(num_envs, dtype=np.int64)
+        self._tail_index = np.zeros(num_envs, dtype=np.int64)
+        self._direction = np.zeros(num_envs, dtype=np.int8)
+        self._length = np.zeros(num_envs, dtype=np.int64)
+
+        # same flags as SnakeGameState
+        self._game_over = np.zeros(num_envs, dtype=bool)
+        self._still_growing = np.zeros(num_envs, dtype=bool)
+        self._point_eaten = np.zeros(num_envs, dtype=bool)
+        self._already_turned = np.zeros(num_envs, dtype=bool)
+        self._next_move = np.zeros(num_envs, dtype=np.int8)
+        self._point = np.zeros(num_envs, dtype=np.int64)
+
+        # the empty cells of every board, kept in the same order as _FreeCellIndex so that points
+        # are picked from the same cells as in SnakeGameState
+        self._free_cells = np.zeros((num_envs, size), dtype=np.int32)
+        self._free_positions = np.zeros((num_envs, size), dtype=np.int32)
+        self._free_count = np.zeros(num_envs, dtype=np.int64)
+
+        # how far one move goes in each direction
+        self._deltas = np.array([-cols, 1, cols, -1], dtype=np.int64)
+
+        self._rngs = [random.Random() for _ in range(num_envs)]
+        if seeds is None:
+            seeds = range(num_envs)
+        self.reset(seeds=seeds)
+
+    def reset(self, envs: np.ndarray | None = None, seeds: list[int] | None = None) -> None:
+        """Starts new games for the envs (all of them by default), reseeding them if seeds are given"""
+        if envs is None:
+            envs = self._envs
+        envs = np.asarray(envs, dtype=np.int64)
+        if seeds is not None:
+            for env, seed in zip(envs, seeds):
+                self._rngs[env].seed(seed)
+        size = self._rows * self._cols
+        head = int(self._rows / 2) * self._cols + int(self._cols / 2)
+
+        self._cells[envs] = _EMPTY
+        self._cells[envs, head] = _HEAD
+        self._body[envs, 0] = head
+        self._head_index[envs] = 0
+        self._tail_index[envs] = 0
+        self._direction[envs] = NORTH
+        self._length[envs] = 1
+        self._game_over[envs] = False
+        self._still_growing[envs] = False
+        self._point_eaten[envs] = True
+        self._already_turned[envs] = False
+        self._next_move[envs] = NO_TURN
+        self._point[envs] = -1
+
+        self._free_cells[envs] = np.arange(size, dtype=np.int32)
+        self._free_positions[envs] = np.arange(size, dtype=np.int32)
+        self._free_count[envs] = size
+        self._remove_free_cells(envs, np.full(len(envs), head, dtype=np.int64))
+
+    def turn(self, directions: np.ndarray) -> None:
+        """Turns every snake like turn_north/turn_east/turn_south/turn_west would.
+        directions holds NORTH, EAST, SOUTH, WEST or NO_TURN for every game."""
+        directions = np.asarray(directions, dtype=np.int8)
+        wants_turn = (directions != NO_TURN) & ~self._game_over
+        perpendicular = (self._direction - directions) % 2 == 1
+        turning = wants_turn & perpendicular & ~self._already_turned
+        queueing = wants_turn & self._already_turned & (self._next_move == NO_TURN)
+        self._direction[turning] = directions[turning]
+        self._already_turned |= turning
+        self._next_move[queueing] = directions[queueing]
+
+    def step(self, directions: np.ndarray | None = None) -> np.ndarray:
+        """Turns the snakes (if directions are given) and moves every game that isn't over forward one block.
+        Returns which games are over."""
+        if directions is not None:
+            self.turn(directions)
+        rows, cols = self._rows, self._cols
+        size = rows * cols
+        envs = self._envs
+
+        head = self._body[envs, self._head_index]
+        row, col = np.divmod(head, cols)
+        direction = self._direction
+        on_board = np.select([direction == NORTH, direction == EAST, direction == SOUTH],
+                             [row > 0, col < cols - 1, row < rows - 1], col > 0)
+        next_cell = np.where(on_board, head + self._deltas[direction], head)
+        next_state = self._cells[envs, next_cell]
+        crashed = ~self._game_over & (~on_board | (next_state == _HEAD) | (next_state == _BODY))
+        moving = ~self._game_over & ~crashed
+        self._game_over |= crashed
+
+        self._already_turned[moving] = False
+        ate_point = moving & (next_state == _POINT)
+        too_short = self._length < 3
+        growing = moving & (ate_point | too_short | self._still_growing)
+        self._still_growing[growing] = (ate_point & too_short)[growing]
+        self._point_eaten |= ate_point
+        self._length += growing
+
+        # move the tail out
+        shrinking = np.flatnonzero(moving & ~growing)
+        tail = self._body[shrinking, self._tail_index[shrinking]]
+        self._tail_index[shrinking] = (self._tail_index[shrinking] + 1) % size
+        self._cells[shrinking, tail] = _EMPTY
+        self._add_free_cells(shrinking, tail)
+
+        # move the head in
+        not_eating = np.flatnonzero(moving & ~ate_point)
+        self._remove_free_cells(not_eating, next_cell[not_eating])
+        moved = np.flatnonzero(moving)
+        self._cells[moved, head[moved]] = _BODY
+        self._cells[moved, next_cell[moved]] = _HEAD
+        self._head_index[moved] = (self._head_index[moved] + 1) % size
+        self._body[moved, self._head_index[moved]] = next_cell[moved]
+
+        # turns that were queued up while the snake had already turned
+        queued = moving & (self._next_move != NO_TURN)
+        queued_directions = np.where(queued, self._next_move, NO_TURN)
+        self._next_move[queued] = NO_TURN
+        self.turn(queued_directions)
+
+        self._create_random_points(np.flatnonzero(moving & self._point_eaten))
+        return self._game_over.copy()
+
+    def get_num_envs(self) -> int:
+        return self._num_envs
+
+    def get_cells(self) -> np.ndarray:
+        """returns a read-only (num_envs, rows, cols) view of the cell states, as indexes into POSSIBLE_STATES"""
+        cells = self._cells.reshape(self._num_envs, self._rows, self._cols)
+        cells.flags.writeable = False
+        return cells
+
+    def get_game_over(self) -> np.ndarray:
+        return self._game_over.copy()
+
+    def get_snake_lengths(self) -> np.ndarray:
+        return self._length.copy()
+
+    def get_directions(self) -> np.ndarray:
+        """returns the direction of every snake's head as an index into "NESW\""""
+        return self._direction.copy()
+
+    def get_point_coordinates(self) -> np.ndarray:
+        """returns a (num_envs, 2) array of the row and column of every point, or -1 if there is none"""
+        coordinates = np.stack(np.divmod(self._point, self._cols), axis=1)
+        coordinates[self._point < 0] = -1
+        return coordinates
+
+    # protected class methods
+    def _create_random_points(self, envs: np.ndarray) -> None:
+        """Creates a random point on the boards of the envs. Boards filled by the snake are game over."""
+        full = self._free_count[envs] == 0
+        self._game_over[envs[full]] = True
+        self._point[envs[full]] = -1
+        self._point_eaten[envs[full]] = False
+        envs = envs[~full]
+        if len(envs) == 0:
+            return
+        # the only loop over games: drawing from each game's own random.Random keeps them
+        # in step with SnakeGameState, which calls random.choice on its free cells
+        positions = np.array([self._rngs[env].choice(range(count))
+                              for env, count in zip(envs.tolist(), self._free_count[envs].tolist())], dtype=np.int64)
+        cells = self._free_cells[envs, positions].astype(np.int64)
+        self._remove_free_cells(envs, cells)
+        self._cells[envs, cells] = _POINT
+        self._point[envs] = cells
+        self._point_eaten[envs] = False
+
+    def _add_free_cells(self, envs: np.ndarray, cells: np.ndarray) -> None:
+        """Adds one empty cell to the free cells of each of the envs"""
+        positions = self._free_count[envs]
+        self._free_cells[envs, positions] = cells
+        self._free_positions[envs, cells] = positions
+        self._free_count[envs] += 1
+
+    def _remove_free_cells(self, envs: np.ndarray, cells: np.ndarray) -> None:
+        """Removes one cell from the free cells of each of the envs by moving the last free cell into its place"""
+        positions = self._free_positions[envs, cells]
+        self._free_count[envs] -= 1
+        last = self._free_cells[envs, self._free_count[envs]]
+        self._free_cells[envs, positions] = last
+        self._free_positions[envs, last] = positions
+        self._free_positions[envs, cells] = -1
@@ -0,0 +1,76 @@
+# python_snake_game_batch_test.py
+# author: Robin Jiang
+#
+# this is the unittesting for the batch environment
+
+import random
+import unittest
+
+import numpy as np
+
+from python_snake_game_batch import *
+from python_snake_game_model import POSSIBLE_STATES, WEST, SnakeGameState
+
+
+class TestBatchSnakeEnv(unittest.TestCase):
+    """Tests that the BatchSnakeEnv plays the same games as SnakeGameState"""
+    def test_same_games_as_snake_game_state(self):
+        num_envs, rows, cols = 16, 6, 7
+        seeds = list(range(100, 100 + num_envs))
+        env = BatchSnakeEnv(num_envs, rows, cols, seeds)
+        games = [SnakeGameState(rows, cols) for _ in seeds]
+        # every game draws its points from its own copy of the global random state
+        random_states = []
+        for seed in seeds:
+            random.seed(seed)
+            random_states.append(random.getstate())
+
+        turn_random = random.Random(0)
+        for _ in range(300):
+            directions = [_towards_point(game) if turn_random.random() < 0.8 else
+                          turn_random.choice((NO_TURN, NORTH, EAST, SOUTH, WEST)) for game in games]
+            queued = [turn_random.choice((NO_TURN, NORTH, EAST, SOUTH, WEST)) for _ in games]
+            env.turn(directions)
+            env.step(queued)
+            for i, game in enumerate(games):
+                if game.get_game_over():
+                    continue
+                for direction in (directions[i], queued[i]):
+                    if direction != NO_TURN:
+                        (game.turn_north, game.turn_east, game.turn_south, game.turn_west)[direction]()
+                random.setstate(random_states[i])
+                game.progress_game()
+                random_states[i] = random.getstate()
+                self._assert_same_game(env, i, game)
+            if env.get_game_over().all():
+                break
+
+    def test_games_can_be_reset(self):
+        env = BatchSnakeEnv(4, 5, 5)
+        while not env.get_game_over().all():
+            env.step()
+        env.reset(np.array([1, 3]))
+        self.assertEqual([True, False, True, False], env.get_game_over().tolist())
+        self.assertEqual([1, 1], env.get_snake_lengths()[[1, 3]].tolist())
+
+    def _assert_same_game(self, env: BatchSnakeEnv, i: int, game: SnakeGameState) -> None:
+        states = [[POSSIBLE_STATES.index(block.get_state()) for block in row] for row in game.get_board_view()]
+        self.assertEqual(states, env.get_cells()[i].tolist())
+        self.assertEqual(game.get_game_over(), env.get_game_over()[i])
+        self.assertEqual(game.get_snake_length(), env.get_snake_lengths()[i])
+        self.assertEqual("NESW".index(game.get_snake_head().get_direction()), env.get_directions()[i])
+
+
+def _towards_point(game: SnakeGameState) -> int:
+    """returns a direction that gets the snake closer to the point"""
+    if game.get_point_coordinates() is None:
+        return NO_TURN
+    head = game.get_snake_head()
+    point_row, point_col = game.get_point_coordinates()
+    if point_row != head.get_row():
+        return NORTH if point_row < head.get_row() else SOUTH
+    return WEST if point_col < head.get_column() else EAST
+
+
+if __name__ == "__main__":
+    unittest.main()
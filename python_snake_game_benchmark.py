@@ -0,0 +1,391 @@
+# python_snake_game_benchmark.py
+# author: Robin Jiang
+#
+# this module measures how fast the model and the pygame view are: progress_game steps per second,
+# create_random_point, get_board and next block location times, and _redraw frame times, over a range of board
+# sizes and snake lengths.
+# The results can be saved as JSON and compared against a saved baseline to find regressions:
+#
+#   python python_snake_game_benchmark.py --json baseline.json
+#   python python_snake_game_benchmark.py --baseline baseline.json
+#
+# a benchmark that looks worse than the baseline is measured again before it counts as a regression, since
+# a busy machine can slow anything down for a moment.
+#
+# long snakes are laid along a Hamiltonian cycle of the board (see python_snake_game_autopilot) and follow it,
+# so they never crash. Board sizes in the suite have an even number of rows or columns for that reason.
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from array import array
+from collections.abc import Callable
+
+# draw off-screen so the benchmark can run without a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import python_snake_game_autopilot
+import python_snake_game_model
+import python_snake_game_view
+
+# the metric of each part of the suite, and whether higher is better
+METRICS = {
+    "progress_game": ("steps_per_second", True),
+    "create_random_point": ("microseconds", False),
+    "get_board": ("milliseconds", False),
+    "next_block_location": ("microseconds", False),
+    "redraw": ("ms_per_frame", False),
+}
+
+# how many times each benchmark is run, keeping the best result
+REPEATS = 3
+
+# how many more times a benchmark that looks like a regression is measured before it counts as one
+RECHECK_RUNS = 2
+
+# how many create_random_point calls are timed together, so that a batch takes a few hundred microseconds
+POINT_BATCH_SIZE = 500
+
+# how many _calculate_next_block_location calls are timed together, since each one takes well under a microsecond
+NEXT_BLOCK_BATCH_SIZE = 20000
+
+# how much worse than the baseline a result can be before it counts as a regression. The fastest benchmarks
+# take a few microseconds, so they move by a third or so from run to run on a busy machine
+TOLERANCE = 0.5
+
+# board sizes and snake lengths (as a fraction of the board) for the suite, and smaller ones for a quick run
+BOARD_SIZES = ((10, 10), (100, 100), (500, 500))
+QUICK_BOARD_SIZES = ((10, 10), (50, 50))
+FILL_RATIOS = (0.0, 0.25, 0.5, 0.9, 0.99)
+WINDOW_SIZES = ((800, 450), (1920, 1080), (3840, 2160))
+QUICK_WINDOW_SIZES = ((800, 450),)
+
+
+def measure_redraw(size: tuple[int, int], frames: int = 300, dirty_rects: bool = False,
+                   snake_length: int | None = None) -> dict:
+    """Plays frames of a game in a window of the given size and measures the time spent in _redraw.
+    If snake_length is given, the game starts with a snake that long, which follows a Hamiltonian cycle.
+    Returns the average milliseconds per frame and the average fraction of the window pushed to the display."""
+    random.seed(0)
+    pygame.init()
+    game = python_snake_game_view.SnakeGame(dirty_rects=dirty_rects)
+    game._resize_surface(size)
+    game._load_images()
+    game._phase = "GAME"
+    # the snake is steered the way the demo mode steers it, so that it stays alive
+    game._autopilot = _AvoidWalls()
+    if snake_length is not None:
+        game._game = make_game_with_snake(python_snake_game_model.SnakeGameState, python_snake_game_view.ROWS,
+                                          python_snake_game_view.COLUMNS, snake_length)
+        game._update_score()
+        game._autopilot = python_snake_game_autopilot.HamiltonianAutopilot(shortcuts=False)
+    window_area = size[0] * size[1]
+
+    total_time = 0
+    total_area = 0
+    for _ in range(frames):
+        game._advance(1 / python_snake_game_view.TARGET_FRAMERATE)
+        previous_rects = game._drawn_rects
+        last_full_redraw = game._last_full_redraw
+        start = time.perf_counter()
+        game._redraw()
+        total_time += time.perf_counter() - start
+        if dirty_rects and game._last_full_redraw is last_full_redraw:
+            total_area += sum(rect.width * rect.height for rect in previous_rects + game._drawn_rects)
+        else:
+            total_area += window_area
+    pygame.quit()
+    return {"ms_per_frame": total_time / frames * 1000, "updated_fraction": total_area / (frames * window_area)}
+
+
+def measure_progress_game(game_class: type, rows: int, cols: int, snake_length: int, steps: int = 20000) -> dict:
+    """Measures how many progress_game steps per second a game with a snake of the given length does.
+    The snake follows a Hamiltonian cycle. If it fills the board, the game is restored (without timing that)
+    and carries on."""
+    game = make_game_with_snake(game_class, rows, cols, snake_length)
+    snapshot = game.snapshot()
+    turns = _cycle_turns(game, rows, cols)
+    progress_game = game.progress_game
+    get_game_over = game.get_game_over
+    seconds = 0
+    done = 0
+    while done < steps:
+        game.restore(snapshot)
+        position = snake_length - 1
+        cells = len(turns)
+        start = time.perf_counter()
+        while done < steps and not get_game_over():
+            turn = turns[position]
+            if turn is not None:
+                turn()
+            progress_game()
+            position = (position + 1) % cells
+            done += 1
+        seconds += time.perf_counter() - start
+    return {"steps_per_second": steps / seconds}
+
+
+def measure_create_random_point(game_class: type, rows: int, cols: int, fill_ratio: float, batches: int = 20,
+                                batch_size: int = POINT_BATCH_SIZE) -> dict:
+    """Measures how long create_random_point takes when the snake fills fill_ratio of the board.
+    Calls are timed in batches of batch_size, big enough that timing a batch takes a tiny fraction of it,
+    and the fastest batch is kept. Each point is taken off the board again as part of the batch, so the board
+    stays as full as it started, whatever its size, and old points don't pile up on it. That is a constant-time
+    change of the board and the empty cells, and it is timed along with create_random_point."""
+    cells = rows * cols
+    game = make_game_with_snake(game_class, rows, cols, max(1, min(cells - 1, int(cells * fill_ratio))))
+    create_random_point = game.create_random_point
+    get_point_coordinates = game.get_point_coordinates
+    remove_point = _point_remover(game)
+    best = None
+    for _ in range(batches):
+        start = time.perf_counter()
+        for _ in range(batch_size):
+            create_random_point()
+            remove_point(*get_point_coordinates())
+        seconds = time.perf_counter() - start
+        if best is None or seconds < best:
+            best = seconds
+    return {"microseconds": best / batch_size * 1e6}
+
+
+def measure_get_board(game_class: type, rows: int, cols: int, snake_length: int, repeats: int | None = None) -> dict:
+    """Measures how long get_board takes on a board of the given size"""
+    game = make_game_with_snake(game_class, rows, cols, snake_length)
+    game.create_random_point()
+    if repeats is None:
+        repeats = max(3, 200000 // (rows * cols))
+    start = time.perf_counter()
+    for _ in range(repeats):
+        game.get_board()
+    return {"milliseconds": (time.perf_counter() - start) / repeats * 1000}
+
+
+def measure_next_block_location(rows: int, cols: int, batches: int = 7,
+                                batch_size: int = NEXT_BLOCK_BATCH_SIZE) -> dict:
+    """Measures how long SnakeGameState takes to work out where the head goes next, which progress_game does
+    every step. Calls are timed in batches of batch_size and the fastest batch is kept."""
+    game = make_game_with_snake(python_snake_game_model.SnakeGameState, rows, cols, 3)
+    calculate_next_block_location = game._calculate_next_block_location
+    best = None
+    for _ in range(batches):
+        start = time.perf_counter()
+        for _ in range(batch_size):
+            calculate_next_block_location()
+        seconds = time.perf_counter() - start
+        if best is None or seconds < best:
+            best = seconds
+    return {"microseconds": best / batch_size * 1e6}
+
+
+def make_game_with_snake(game_class: type, rows: int, cols: int, snake_length: int
+                         ) -> 'python_snake_game_model.SnakeGameState':
+    """Makes a game with a snake of the given length laid along the Hamiltonian cycle of the board, with its
+    head facing the next cell of the cycle. There is no point yet, so one is made by the first step."""
+    cycle, _ = python_snake_game_autopilot.hamiltonian_cycle(rows, cols)
+    cells = len(cycle)
+    snake = list(cycle[:snake_length])
+    directions = bytes(direction | direction << 2 for direction in
+                       (_direction(cycle[position], cycle[(position + 1) % cells], cols)
+                        for position in range(snake_length)))
+    snapshot = python_snake_game_model.SnakeGameSnapshot(
+        rows, cols, snake, directions, None, array('i', cycle[snake_length:]), None, False, False, True, False,
+        None, random.Random(0).getstate())
+    return game_class.from_snapshot(snapshot)
+
+
+def get_cases(quick: bool = False) -> list[tuple[str, dict, Callable[..., dict], tuple]]:
+    """Returns every benchmark of the suite over its matrix of board sizes and snake lengths, as the part of the
+    suite it is in, what identifies it in the results, and the function and arguments that measure it"""
+    board_sizes = QUICK_BOARD_SIZES if quick else BOARD_SIZES
+    window_sizes = QUICK_WINDOW_SIZES if quick else WINDOW_SIZES
+    game_classes = (python_snake_game_model.SnakeGameState, python_snake_game_model.CompactSnakeGameState)
+    cases = []
+    for rows, cols in board_sizes:
+        cells = rows * cols
+        for game_class in game_classes:
+            for snake_length in sorted({3, cells // 4, cells // 2}):
+                cases.append(("progress_game",
+                              {"game_class": game_class.__name__, "rows": rows, "cols": cols,
+                               "snake_length": snake_length},
+                              measure_progress_game, (game_class, rows, cols, snake_length, 5000 if quick else 20000)))
+            for fill_ratio in FILL_RATIOS:
+                cases.append(("create_random_point",
+                              {"game_class": game_class.__name__, "rows": rows, "cols": cols, "fill_ratio": fill_ratio},
+                              measure_create_random_point, (game_class, rows, cols, fill_ratio, 10 if quick else 40)))
+            cases.append(("get_board",
+                          {"game_class": game_class.__name__, "rows": rows, "cols": cols, "snake_length": cells // 4},
+                          measure_get_board, (game_class, rows, cols, cells // 4)))
+        cases.append(("next_block_location", {"rows": rows, "cols": cols},
+                      measure_next_block_location, (rows, cols, 3 if quick else 7)))
+    board_cells = python_snake_game_view.ROWS * python_snake_game_view.COLUMNS
+    for size in window_sizes:
+        for snake_length in (None, board_cells // 2):
+            for dirty_rects in (False, True):
+                cases.append(("redraw",
+                              {"width": size[0], "height": size[1], "snake_length": snake_length or 1,
+                               "dirty_rects": dirty_rects},
+                              measure_redraw, (size, 100 if quick else 300, dirty_rects, snake_length)))
+    return cases
+
+
+def run_suite(quick: bool = False) -> dict:
+    """Runs every benchmark of the suite (see get_cases), and returns the results in a form that can be saved
+    as JSON"""
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": quick,
+        **{part: [] for part in METRICS},
+    }
+    for part, case, measure, args in get_cases(quick):
+        results[part].append({**case, **_best_of(part, measure, *args)})
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float = TOLERANCE) -> list[str]:
+    """Returns a line describing every result that is more than tolerance worse than the same benchmark
+    in the baseline. Benchmarks that aren't in both are skipped."""
+    return [line for _, _, line in _find_regressions(results, baseline, tolerance)]
+
+
+def recheck(results: dict, baseline: dict, cases: list[tuple[str, dict, Callable[..., dict], tuple]],
+            tolerance: float = TOLERANCE, runs: int = RECHECK_RUNS) -> list[str]:
+    """Compares the results with the baseline like compare, but measures every benchmark that looks like a
+    regression again (up to runs more times) before counting it, since a busy machine can make any benchmark
+    look twice as slow for a moment. The best result of each benchmark is kept in results.
+    cases are the benchmarks the results came from, see get_cases."""
+    measures = {(part, tuple(case.items())): (measure, args) for part, case, measure, args in cases}
+    regressions = _find_regressions(results, baseline, tolerance)
+    for _ in range(runs):
+        if len(regressions) == 0:
+            break
+        for part, index, _ in regressions:
+            metric, higher_is_better = METRICS[part]
+            entry = results[part][index]
+            measure, args = measures[part, _case(entry, metric)]
+            result = _best_of(part, measure, *args)
+            if (result[metric] > entry[metric]) if higher_is_better else (result[metric] < entry[metric]):
+                entry.update(result)
+        regressions = _find_regressions(results, baseline, tolerance)
+    return [line for _, _, line in regressions]
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Runs the suite, prints the results, saves them if asked and compares them with a baseline if asked.
+    Returns 1 if there were regressions and 0 if not."""
+    parser = argparse.ArgumentParser(description="Benchmarks the snake game model and view")
+    parser.add_argument("--quick", action="store_true", help="run smaller boards and fewer steps")
+    parser.add_argument("--json", help="save the results to this file")
+    parser.add_argument("--baseline", help="compare the results with the ones saved in this file")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="how much worse than the baseline counts as a regression (default %(default)s)")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.quick)
+    regressions = []
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            regressions = recheck(results, json.load(file), get_cases(args.quick), args.tolerance)
+    for part, (metric, _) in METRICS.items():
+        for entry in results[part]:
+            print(f"{part} {dict(_case(entry, metric))}: {metric} {entry[metric]:.4g}")
+    if args.json is not None:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if len(regressions) > 0 else 0
+
+
+def _best_of(part: str, measure: Callable[..., dict], *args) -> dict:
+    """Runs a benchmark a few times and returns its best result, since anything else running on the machine
+    only ever makes a benchmark look worse"""
+    metric, higher_is_better = METRICS[part]
+    results = [measure(*args) for _ in range(REPEATS)]
+    return (max if higher_is_better else min)(results, key=lambda result: result[metric])
+
+
+def _case(entry: dict, metric: str) -> tuple:
+    """returns what identifies a benchmark result, which is everything in it except for its measurements"""
+    return tuple((key, value) for key, value in entry.items()
+                 if key != metric and key != "updated_fraction")
+
+
+def _find_regressions(results: dict, baseline: dict, tolerance: float) -> list[tuple[str, int, str]]:
+    """returns the part, the index in results[part] and a line describing every result that is more than
+    tolerance worse than the same benchmark in the baseline"""
+    regressions = []
+    for part, (metric, higher_is_better) in METRICS.items():
+        baseline_values = {_case(entry, metric): entry[metric] for entry in baseline.get(part, [])}
+        for index, entry in enumerate(results.get(part, [])):
+            case = _case(entry, metric)
+            if case not in baseline_values:
+                continue
+            old, new = baseline_values[case], entry[metric]
+            if (new < old * (1 - tolerance)) if higher_is_better else (new > old * (1 + tolerance)):
+                regressions.append((part, index, f"{part} {dict(case)}: {metric} {old:.4g} -> {new:.4g}"))
+    return regressions
+
+
+def _point_remover(game: 'python_snake_game_model.SnakeGameState') -> Callable[[int, int], None]:
+    """returns a function that takes the point at (row, col) off the board of the game and makes its cell empty
+    again, undoing create_random_point"""
+    add_free_cell = game._free_cells.add
+    if isinstance(game, python_snake_game_model.CompactSnakeGameState):
+        board_cells = game._cells
+        cols = game.get_columns()
+
+        def remove_point(row: int, col: int) -> None:
+            board_cells[row * cols + col] = python_snake_game_model._EMPTY
+            add_free_cell(row, col)
+    else:
+        board = game._board
+
+        def remove_point(row: int, col: int) -> None:
+            board[row][col] = python_snake_game_model.EMPTY_BLOCK
+            add_free_cell(row, col)
+    return remove_point
+
+
+def _direction(cell: int, next_cell: int, cols: int) -> int:
+    """returns the index in "NESW" of the direction from cell to the cell next to it"""
+    return {-cols: 0, 1: 1, cols: 2, -1: 3}[next_cell - cell]
+
+
+def _cycle_turns(game: 'python_snake_game_model.SnakeGameState', rows: int,
+                 cols: int) -> list['Callable[[], bool] | None']:
+    """returns, for each position of the Hamiltonian cycle, the turn the snake has to make there to follow it,
+    or None if it just goes straight on"""
+    cycle, _ = python_snake_game_autopilot.hamiltonian_cycle(rows, cols)
+    cells = len(cycle)
+    turns = (game.turn_north, game.turn_east, game.turn_south, game.turn_west)
+    return [None if _direction(cycle[position - 1], cycle[position], cols) ==
+            _direction(cycle[position], cycle[(position + 1) % cells], cols)
+            else turns[_direction(cycle[position], cycle[(position + 1) % cells], cols)]
+            for position in range(cells)]
+
+
+class _AvoidWalls:
+    """Stands in for an autopilot, turning the snake clockwise if it is facing a wall"""
+    def choose_move(self, game: 'python_snake_game_model.SnakeGameState') -> str | None:
+        head = game.get_snake_head()
+        match head.get_direction():
+            case "N" if head.get_row() == 0:
+                return "E"
+            case "E" if head.get_column() == game.get_columns() - 1:
+                return "S"
+            case "S" if head.get_row() == game.get_rows() - 1:
+                return "W"
+            case "W" if head.get_column() == 0:
+                return "N"
+        return None
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+# python_snake_game_benchmark_test.py
+# author: Robin Jiang
+#
+# this is the unittesting for the benchmark suite (not the benchmarks themselves)
+
+import unittest
+import python_snake_game_benchmark
+from python_snake_game_benchmark import *
+from python_snake_game_model import CompactSnakeGameState, SnakeGameState
+
+
+class TestBenchmark(unittest.TestCase):
+    """Tests the games the benchmarks play and the comparison with a baseline"""
+    def test_games_with_long_snakes_follow_the_cycle_without_crashing(self):
+        for game_class in (SnakeGameState, CompactSnakeGameState):
+            game = make_game_with_snake(game_class, 6, 5, 20)
+            self.assertEqual(20, game.get_snake_length())
+            self.assertEqual(6 * 5 - 20, len(game._free_cells))
+            self.assertGreater(measure_progress_game(game_class, 6, 5, 20, steps=500)["steps_per_second"], 0)
+
+    def test_point_spawn_get_board_and_next_block_location_are_measured(self):
+        self.assertGreater(measure_create_random_point(SnakeGameState, 10, 10, 0.9, batches=3)["microseconds"], 0)
+        self.assertGreater(measure_get_board(CompactSnakeGameState, 10, 10, 10, repeats=3)["milliseconds"], 0)
+        self.assertGreater(measure_next_block_location(10, 10, batches=3, batch_size=100)["microseconds"], 0)
+
+    def test_point_spawn_batches_are_long_enough_to_time_on_small_boards(self):
+        # a board with one empty cell can still be timed in batches, since each point's cell is put back
+        for fill_ratio in (0.0, 0.99):
+            microseconds = measure_create_random_point(CompactSnakeGameState, 10, 10, fill_ratio,
+                                                       batches=3)["microseconds"]
+            self.assertGreater(microseconds * POINT_BATCH_SIZE, 100)
+
+    def test_point_spawn_batches_leave_no_old_points_on_the_board(self):
+        for game_class in (SnakeGameState, CompactSnakeGameState):
+            game = make_game_with_snake(game_class, 10, 10, 50)
+            board = game._prepare_print_board()
+            remove_point = python_snake_game_benchmark._point_remover(game)
+            for _ in range(200):
+                game.create_random_point()
+                remove_point(*game.get_point_coordinates())
+            game._point_coordinates = None
+            self.assertEqual(board, game._prepare_print_board())
+            self.assertEqual(50, len(game._free_cells))
+
+    def test_recheck_only_counts_results_that_stay_worse(self):
+        # the first result of each case was slowed down by something else running, but only case 1 stays slow
+        measured = []
+
+        def measure(case, value):
+            measured.append(case)
+            return {"microseconds": value}
+        cases = [("create_random_point", {"case": case}, measure, (case, value))
+                 for case, value in ((0, 1.1), (1, 2.0), (2, 1.0))]
+        baseline = {"create_random_point": [{"case": case, "microseconds": 1.0} for case in range(3)]}
+        results = {"create_random_point": [{"case": case, "microseconds": value}
+                                           for case, value in ((0, 2.0), (1, 2.0), (2, 1.2))]}
+        regressions = recheck(results, baseline, cases, tolerance=0.5)
+        self.assertEqual(1, len(regressions))
+        self.assertIn("'case': 1", regressions[0])
+        self.assertEqual([0] * REPEATS + [1] * REPEATS * RECHECK_RUNS, sorted(measured))
+        self.assertEqual([1.1, 2.0, 1.2], [entry["microseconds"] for entry in results["create_random_point"]])
+
+    def test_compare_flags_only_results_worse_than_the_tolerance(self):
+        baseline = {"progress_game": [{"game_class": "SnakeGameState", "rows": 10, "cols": 10, "snake_length": 3,
+                                       "steps_per_second": 1000.0}],
+                    "get_board": [{"game_class": "SnakeGameState", "rows": 10, "cols": 10, "snake_length": 25,
+                                   "milliseconds": 1.0}]}
+        results = {"progress_game": [dict(baseline["progress_game"][0], steps_per_second=900.0)],
+                   "get_board": [dict(baseline["get_board"][0], milliseconds=2.0),
+                                 dict(baseline["get_board"][0], rows=20, milliseconds=50.0)]}
+        regressions = compare(results, baseline, tolerance=0.25)
+        self.assertEqual(1, len(regressions))
+        self.assertIn("get_board", regressions[0])
+        self.assertEqual(2, len(compare(results, baseline, tolerance=0.05)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+# python_snake_game_delta.py
+# author: Robin Jiang
+#
+# this module encodes the board of a MultiSnakeGameState for sending over the network, either whole (a keyframe)
+# or as the cells one progress_game changed (a delta), which is usually a handful of cells instead of the
+# whole board. BoardDecoder puts the board back together on the other end.
+#
+# a board is one byte per cell, row by row: 0 is an empty cell, 1 is a point, 2 + 2 * i is the head of snake i
+# and 3 + 2 * i is its body. So a board can hold at most MAX_SNAKES snakes.
+#   keyframe: KEYFRAME, tick, whether the game is over (">BIB"), then the board
+#   delta:    DELTA, tick, whether the game is over and how many cells changed (">BIBI"), then the index of every
+#             changed cell (row * cols + col, 2 bytes each, or 4 if the board has more than 65536 cells),
+#             then the new value of every changed cell (1 byte each)
+# a delta changes the board of the tick before it, so it can only be applied right after that tick.
+
+import struct
+
+import python_snake_game_model
+
+# message types
+KEYFRAME, DELTA = 2, 4
+
+# cell values
+EMPTY_CELL, POINT_CELL, SNAKE_CELLS = 0, 1, 2
+
+# the most snakes whose heads and bodies fit in a byte
+MAX_SNAKES = (256 - SNAKE_CELLS) // 2
+
+_KEYFRAME = struct.Struct(">BIB")
+# the count of changed cells is 4 bytes, since every cell of a board of more than 65536 cells can change at once
+_DELTA = struct.Struct(">BIBI")
+
+
+class DeltaError(Exception):
+    """For if a keyframe or delta doesn't fit the board it is applied to"""
+    pass
+
+
+class BoardDecoder:
+    """Keeps the board up to date from keyframes and deltas"""
+    def __init__(self, rows: int, cols: int) -> None:
+        self._rows = rows
+        self._cols = cols
+        self._board = bytearray(rows * cols)
+        self._cell_format = _cell_format(rows, cols)
+        # tick of the last keyframe or delta applied, or None before the first keyframe
+        self._tick = None
+        self._game_over = False
+
+    def apply(self, message: bytes) -> tuple[int, bool]:
+        """Applies the keyframe or delta to the board, and returns its tick and whether the game is over.
+        Raises DeltaError if it is the wrong size, or a delta that doesn't follow the last tick."""
+        if message[0] == KEYFRAME:
+            if len(message) != _KEYFRAME.size + len(self._board):
+                raise DeltaError("the keyframe is for a different size of board")
+            _, self._tick, game_over = _KEYFRAME.unpack_from(message)
+            self._board[:] = message[_KEYFRAME.size:]
+        elif message[0] == DELTA:
+            _, tick, game_over, count = _DELTA.unpack_from(message)
+            if self._tick is None or tick != self._tick + 1:
+                raise DeltaError(f"a delta for tick {tick} can't follow tick {self._tick}")
+            cell_format = f">{count}{self._cell_format}{count}B"
+            if len(message) != _DELTA.size + struct.calcsize(cell_format):
+                raise DeltaError("the delta is the wrong size")
+            values = struct.unpack_from(cell_format, message, _DELTA.size)
+            board = self._board
+            for cell, value in zip(values[:count], values[count:]):
+                board[cell] = value
+            self._tick = tick
+        else:
+            raise DeltaError(f"message type {message[0]} is neither a keyframe nor a delta")
+        self._game_over = bool(game_over)
+        return self._tick, self._game_over
+
+    def get_board(self) -> bytearray:
+        """returns the board, which changes as keyframes and deltas are applied"""
+        return self._board
+
+    def get_tick(self) -> int | None:
+        return self._tick
+
+    def get_game_over(self) -> bool:
+        return self._game_over
+
+
+def encode_board(game: 'python_snake_game_model.MultiSnakeGameState') -> bytearray:
+    """returns the board as one byte per cell, row by row. The game can have at most MAX_SNAKES snakes."""
+    view = game.get_board_view()
+    cols = view.get_columns()
+    board = bytearray(view.get_rows() * cols)
+    for snake in range(game.get_snake_count()):
+        block = game.get_snake_tail(snake)
+        while block is not None:
+            board[block.get_row() * cols + block.get_column()] = SNAKE_CELLS + 2 * snake + 1
+            block = block.get_next()
+        head = game.get_snake_head(snake)
+        if head is not None:
+            board[head.get_row() * cols + head.get_column()] = SNAKE_CELLS + 2 * snake
+    for row, col in game.get_points():
+        board[row * cols + col] = POINT_CELL
+    return board
+
+
+def encode_keyframe(game: 'python_snake_game_model.MultiSnakeGameState', tick: int) -> bytes:
+    """returns a keyframe of the whole board"""
+    return _KEYFRAME.pack(KEYFRAME, tick, game.get_game_over()) + encode_board(game)
+
+
+def encode_delta(changes: 'python_snake_game_model.StepChanges', tick: int, rows: int, cols: int) -> bytes:
+    """returns a delta of the cells changed by a progress_game (see MultiSnakeGameState.get_changes)"""
+    cells = changes.get_cells()
+    count = len(cells)
+    values = [_cell_value(state, snake) for state, snake in cells.values()]
+    return (_DELTA.pack(DELTA, tick, changes.get_game_over(), count) +
+            struct.pack(f">{count}{_cell_format(rows, cols)}{count}B", *cells, *values))
+
+
+def _cell_value(state: str, snake: int | None) -> int:
+    """returns the value on the board of a cell in the state"""
+    if state == "H":
+        return SNAKE_CELLS + 2 * snake
+    elif state == "B":
+        return SNAKE_CELLS + 2 * snake + 1
+    elif state == "P":
+        return POINT_CELL
+    return EMPTY_CELL
+
+
+def _cell_format(rows: int, cols: int) -> str:
+    """returns the struct format of one cell index for the size of board"""
+    return "H" if rows * cols <= 1 << 16 else "I"
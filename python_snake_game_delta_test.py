@@ -0,0 +1,68 @@
+# python_snake_game_delta_test.py
+# author: Robin Jiang
+#
+# this is the unittesting for encoding boards as keyframes and deltas
+
+import random
+import unittest
+from python_snake_game_delta import *
+from python_snake_game_model import MultiSnakeGameState
+
+
+class TestDeltas(unittest.TestCase):
+    """Tests that boards put back together from deltas match the game"""
+    def test_deltas_rebuild_the_board(self):
+        for rows, cols, snakes in ((9, 9, 3), (60, 60, 5)):
+            turn_random = random.Random(0)
+            for seed in range(5):
+                game = MultiSnakeGameState(rows, cols, snakes, rng=random.Random(seed), record_changes=True)
+                decoder = BoardDecoder(rows, cols)
+                self.assertEqual((0, False), decoder.apply(encode_keyframe(game, 0)))
+                tick = 0
+                while not game.get_game_over():
+                    for snake in range(snakes):
+                        turn_random.choice((game.turn_north, game.turn_east, game.turn_south, game.turn_west))(snake)
+                    game.progress_game()
+                    tick += 1
+                    delta = encode_delta(game.get_changes(), tick, rows, cols)
+                    self.assertEqual((tick, game.get_game_over()), decoder.apply(delta))
+                    self.assertEqual(encode_board(game), decoder.get_board())
+                    self.assertLess(len(delta), rows * cols)
+
+    def test_deltas_can_change_more_cells_than_fit_in_two_bytes(self):
+        # the first progress_game puts every point on the board at once
+        game = MultiSnakeGameState(300, 300, 2, rng=random.Random(0), record_changes=True, points=70000)
+        decoder = BoardDecoder(300, 300)
+        decoder.apply(encode_keyframe(game, 0))
+        game.progress_game()
+        self.assertGreater(len(game.get_changes().get_cells()), 1 << 16)
+        self.assertEqual((1, False), decoder.apply(encode_delta(game.get_changes(), 1, 300, 300)))
+        self.assertEqual(encode_board(game), decoder.get_board())
+
+    def test_changes_say_where_the_point_went(self):
+        game = MultiSnakeGameState(9, 9, 2, rng=random.Random(1), record_changes=True)
+        self.assertIsNone(game.get_changes())
+        game.progress_game()
+        point, = game.get_changes().get_points()
+        self.assertEqual(game.get_point_coordinates(), point)
+        self.assertEqual(("P", None), game.get_changes().get_cells()[point[0] * 9 + point[1]])
+        self.assertEqual(("H", 1), game.get_changes().get_cells()[3 * 9 + 6])
+        game.progress_game()
+        self.assertEqual([], game.get_changes().get_points())
+        self.assertIsNone(MultiSnakeGameState(9, 9, 2).get_changes())
+
+    def test_deltas_must_follow_the_last_tick(self):
+        game = MultiSnakeGameState(9, 9, 2, record_changes=True)
+        decoder = BoardDecoder(9, 9)
+        game.progress_game()
+        with self.assertRaises(DeltaError):
+            decoder.apply(encode_delta(game.get_changes(), 1, 9, 9))
+        decoder.apply(encode_keyframe(game, 5))
+        with self.assertRaises(DeltaError):
+            decoder.apply(encode_delta(game.get_changes(), 7, 9, 9))
+        with self.assertRaises(DeltaError):
+            BoardDecoder(8, 9).apply(encode_keyframe(game, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
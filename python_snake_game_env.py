@@ -0,0 +1,179 @@
+# python_snake_game_env.py
+# author: Robin Jiang
+#
+# this module wraps the snake game as a reinforcement learning environment, in the style of OpenAI Gym:
+# reset(seed) starts a game and returns an observation, and step(action) returns (obs, reward, done, info).
+#
+# an observation is a (3, rows, cols) float32 array. Channel 0 is 1 where the snake is (head included),
+# channel 1 is 1 at the head and channel 2 is 1 at the point. A step only changes the cells that the step
+# changed (the new head, the old head, the tail if it moved and the point if it was eaten), so the board is
+# never read again after a reset. Observations are written into buffers made once, so stepping makes no arrays.
+
+import random
+from collections import deque
+
+import numpy as np
+
+import python_snake_game_model
+from python_snake_game_batch import NO_TURN
+
+# channels of an observation
+SNAKE_CHANNEL, HEAD_CHANNEL, POINT_CHANNEL = range(3)
+
+# rewards for eating a point and for crashing
+POINT_REWARD = 1.0
+CRASH_REWARD = -1.0
+
+
+class SnakeEnv:
+    """One snake game as an environment. An action is NORTH, EAST, SOUTH, WEST (the direction to turn)
+    or NO_TURN. Turning back or turning the way the snake is already going does nothing, like in the game.
+
+    The observation returned by reset and step is the env's own buffer, which the next step changes,
+    and info is the same dict every time. Copy them to keep them."""
+    def __init__(self, rows: int = 9, cols: int = 9, max_steps: int | None = None,
+                 game_class: type = python_snake_game_model.SnakeGameState, out: np.ndarray | None = None) -> None:
+        """If max_steps is given, an episode is done after that many steps. If out is given, observations are
+        written into it instead of a buffer of the env's own. It has to be a float32 array of shape (3, rows, cols)."""
+        self._rows = rows
+        self._cols = cols
+        self._max_steps = max_steps
+        self._game_class = game_class
+        if out is None:
+            out = np.zeros((3, rows, cols), dtype=np.float32)
+        if out.shape != (3, rows, cols) or out.dtype != np.float32:
+            raise ValueError("the observation buffer must be a float32 array of shape (3, rows, cols)")
+        self._observation = out
+        # the same buffer, indexed by channel and row * cols + col
+        self._cells = out.reshape(3, rows * cols)
+
+        self._game = None
+        self._turns = None
+        self._snake = None
+        self._steps = 0
+        self._info = {"length": 0, "steps": 0, "truncated": False}
+
+    def reset(self, seed: int | None = None) -> np.ndarray:
+        """Starts a new game, placing its points with random.Random(seed), and returns the first observation"""
+        game = self._game_class(self._rows, self._cols, rng=random.Random(seed))
+        self._game = game
+        self._turns = (game.turn_north, game.turn_east, game.turn_south, game.turn_west)
+        self._steps = 0
+
+        # the board is only read here, to fill the observation for the new game
+        cols = self._cols
+        self._observation.fill(0)
+        self._snake = deque()
+        block = game.get_snake_tail()
+        while block is not None:
+            cell = block.get_row() * cols + block.get_column()
+            self._snake.append(cell)
+            self._cells[SNAKE_CHANNEL, cell] = 1
+            block = block.get_next()
+        self._cells[HEAD_CHANNEL, self._snake[-1]] = 1
+        point = game.get_point_coordinates()
+        if point is not None:
+            self._cells[POINT_CHANNEL, point[0] * cols + point[1]] = 1
+        self._update_info(False)
+        return self._observation
+
+    def step(self, action: int) -> tuple[np.ndarray, float, bool, dict]:
+        """Turns the snake (unless action is NO_TURN), moves it forward one block and returns
+        (observation, reward, done, info). info has the length of the snake, the number of steps and
+        whether the episode was cut short by max_steps. Raises MoveAfterGameOverError if the game is over."""
+        game = self._game
+        if action != NO_TURN:
+            self._turns[action]()
+        point = game.get_point_coordinates()
+        length = game.get_snake_length()
+        game.progress_game()
+        self._steps += 1
+
+        reward = 0.0
+        head = game.get_snake_head()
+        head = head.get_row() * self._cols + head.get_column()
+        cells = self._cells
+        if head != self._snake[-1]:
+            cells[HEAD_CHANNEL, self._snake[-1]] = 0
+            cells[HEAD_CHANNEL, head] = 1
+            cells[SNAKE_CHANNEL, head] = 1
+            self._snake.append(head)
+            if game.get_snake_length() == length:
+                cells[SNAKE_CHANNEL, self._snake.popleft()] = 0
+            new_point = game.get_point_coordinates()
+            if new_point != point:
+                # the first point of a game only shows up after the first step
+                if point is not None:
+                    reward = POINT_REWARD
+                    cells[POINT_CHANNEL, point[0] * self._cols + point[1]] = 0
+                if new_point is not None:
+                    cells[POINT_CHANNEL, new_point[0] * self._cols + new_point[1]] = 1
+        if game.get_game_over() and reward == 0.0:
+            reward = CRASH_REWARD
+
+        truncated = self._max_steps is not None and self._steps >= self._max_steps and not game.get_game_over()
+        self._update_info(truncated)
+        return self._observation, reward, game.get_game_over() or truncated, self._info
+
+    def get_game(self) -> 'python_snake_game_model.SnakeGameState':
+        return self._game
+
+    def get_observation(self) -> np.ndarray:
+        return self._observation
+
+    # protected class methods
+    def _update_info(self, truncated: bool) -> None:
+        self._info["length"] = self._game.get_snake_length()
+        self._info["steps"] = self._steps
+        self._info["truncated"] = truncated
+
+
+class VectorSnakeEnv:
+    """num_envs SnakeEnvs stepped together. Their observations are stacked in one (num_envs, 3, rows, cols)
+    buffer, and rewards and dones are also kept in buffers, so stepping makes no arrays.
+    An env that is done is reset straight away, so the observation returned for it is the first one
+    of its next game. Env i is seeded with seed + i, and then seed + i + num_envs and so on for its later games."""
+    def __init__(self, num_envs: int, rows: int = 9, cols: int = 9, max_steps: int | None = None,
+                 game_class: type = python_snake_game_model.SnakeGameState) -> None:
+        self._observations = np.zeros((num_envs, 3, rows, cols), dtype=np.float32)
+        self._rewards = np.zeros(num_envs, dtype=np.float32)
+        self._dones = np.zeros(num_envs, dtype=bool)
+        self._envs = [SnakeEnv(rows, cols, max_steps, game_class, out=self._observations[i])
+                      for i in range(num_envs)]
+        self._infos = [env._info for env in self._envs]
+        self._next_seeds = [None] * num_envs
+
+    def reset(self, seed: int | None = None) -> np.ndarray:
+        """Starts a new game in every env and returns the stacked observations"""
+        num_envs = len(self._envs)
+        for i, env in enumerate(self._envs):
+            env_seed = seed + i if seed is not None else None
+            env.reset(env_seed)
+            self._next_seeds[i] = env_seed + num_envs if env_seed is not None else None
+        self._rewards.fill(0)
+        self._dones.fill(False)
+        return self._observations
+
+    def step(self, actions: 'np.ndarray | list[int]') -> tuple[np.ndarray, np.ndarray, np.ndarray, list[dict]]:
+        """Steps every env with its action and returns the stacked observations, rewards, dones and infos.
+        The infos of envs that were done are from the end of their games, before they were reset."""
+        num_envs = len(self._envs)
+        rewards = self._rewards
+        dones = self._dones
+        for i, env in enumerate(self._envs):
+            _, rewards[i], dones[i], _ = env.step(actions[i])
+            if dones[i]:
+                # keep the info of the finished game, since resetting writes over the env's own dict
+                self._infos[i] = dict(env._info)
+                env.reset(self._next_seeds[i])
+                if self._next_seeds[i] is not None:
+                    self._next_seeds[i] += num_envs
+            else:
+                self._infos[i] = env._info
+        return self._observations, rewards, dones, self._infos
+
+    def get_num_envs(self) -> int:
+        return len(self._envs)
+
+    def get_envs(self) -> list[SnakeEnv]:
+        return self._envs
@@ -0,0 +1,109 @@
+# python_snake_game_env_test.py
+# author: Robin Jiang
+#
+# this is the unittesting for the reinforcement learning environments
+
+import random
+import unittest
+
+import numpy as np
+
+from python_snake_game_env import *
+from python_snake_game_model import NORTH, EAST, SOUTH, WEST, CompactSnakeGameState, SnakeGameState
+
+
+class TestSnakeEnv(unittest.TestCase):
+    """Tests that observations built step by step match the board"""
+    def test_observations_match_the_board(self):
+        for game_class in (SnakeGameState, CompactSnakeGameState):
+            env = SnakeEnv(6, 7, game_class=game_class)
+            action_random = random.Random(0)
+            for seed in range(10):
+                observation = env.reset(seed)
+                done = False
+                while not done:
+                    self.assertTrue(np.array_equal(_observation_from_board(env.get_game()), observation))
+                    action = _towards_point(env.get_game()) if action_random.random() < 0.8 else \
+                        action_random.choice((NO_TURN, NORTH, EAST, SOUTH, WEST))
+                    observation, reward, done, info = env.step(action)
+                self.assertTrue(np.array_equal(_observation_from_board(env.get_game()), observation))
+
+    def test_rewards(self):
+        env = SnakeEnv(9, 9)
+        env.reset(3)
+        rewards = []
+        points_eaten = 0
+        done = False
+        while not done:
+            point = env.get_game().get_point_coordinates()
+            _, reward, done, info = env.step(_towards_point(env.get_game()))
+            rewards.append(reward)
+            if point is not None and point == (env.get_game().get_snake_head().get_row(),
+                                               env.get_game().get_snake_head().get_column()):
+                points_eaten += 1
+        self.assertGreater(points_eaten, 0)
+        self.assertEqual(points_eaten, rewards.count(POINT_REWARD))
+        self.assertEqual(CRASH_REWARD, rewards[-1])
+        self.assertEqual(len(rewards) - points_eaten - 1, rewards.count(0.0))
+
+    def test_max_steps_cuts_the_episode_short(self):
+        env = SnakeEnv(50, 50, max_steps=5)
+        env.reset(0)
+        for _ in range(4):
+            self.assertFalse(env.step(NO_TURN)[2])
+        _, _, done, info = env.step(NO_TURN)
+        self.assertTrue(done)
+        self.assertTrue(info["truncated"])
+
+
+class TestVectorSnakeEnv(unittest.TestCase):
+    """Tests the vectorized environment"""
+    def test_envs_write_into_one_buffer_and_reset_themselves(self):
+        vector_env = VectorSnakeEnv(4, 5, 6)
+        observations = vector_env.reset(seed=10)
+        singles = [SnakeEnv(5, 6) for _ in range(4)]
+        for i, env in enumerate(singles):
+            env.reset(10 + i)
+        games = [0] * 4
+        for _ in range(200):
+            actions = [_towards_point(env.get_game()) for env in singles]
+            stepped, rewards, dones, infos = vector_env.step(actions)
+            self.assertIs(observations, stepped)
+            for i, env in enumerate(singles):
+                observation, reward, done, info = env.step(actions[i])
+                self.assertEqual((reward, done, info), (rewards[i], dones[i], infos[i]))
+                if done:
+                    games[i] += 1
+                    env.reset(10 + i + 4 * games[i])
+                self.assertTrue(np.array_equal(env.get_observation(), observations[i]))
+        self.assertGreater(sum(games), 0)
+
+
+def _observation_from_board(game: SnakeGameState) -> np.ndarray:
+    """Builds an observation from the whole board"""
+    board = game.get_board()
+    observation = np.zeros((3, len(board), len(board[0])), dtype=np.float32)
+    for row, blocks in enumerate(board):
+        for col, block in enumerate(blocks):
+            if block.get_state() in ("H", "B"):
+                observation[SNAKE_CHANNEL, row, col] = 1
+            if block.get_state() == "H":
+                observation[HEAD_CHANNEL, row, col] = 1
+            if block.get_state() == "P":
+                observation[POINT_CHANNEL, row, col] = 1
+    return observation
+
+
+def _towards_point(game: SnakeGameState) -> int:
+    """returns the direction from the head towards the point"""
+    head = game.get_snake_head()
+    point = game.get_point_coordinates()
+    if point is None:
+        return NO_TURN
+    if point[0] != head.get_row():
+        return NORTH if point[0] < head.get_row() else SOUTH
+    return WEST if point[1] < head.get_column() else EAST
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+# python_snake_game_headless.py
+# author: Robin Jiang
+#
+# this module runs snake games as fast as possible, without printing or drawing anything,
+# so that policies (bots) can be evaluated over many games
+
+import multiprocessing
+import os
+import random
+import time
+from collections import Counter
+from collections.abc import Callable
+
+import python_snake_game_model
+
+# a policy looks at the game before each step and returns the direction to turn ("N", "E", "S", "W"),
+# or None to keep going straight
+Policy = Callable[['python_snake_game_model.SnakeGameState'], str | None]
+
+
+class HeadlessResults:
+    """Results of running a policy over a number of games"""
+    def __init__(self, episode_lengths: list[int], scores: list[int], seconds: float) -> None:
+        self._episode_lengths = episode_lengths
+        self._scores = scores
+        self._seconds = seconds
+
+    def __str__(self) -> str:
+        return f"HeadlessResults(episodes = {len(self._scores)}, steps = {self.get_total_steps()}, " \
+               f"steps per second = {self.get_steps_per_second():.0f}, mean score = {self.get_mean_score():.2f})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def get_episode_lengths(self) -> list[int]:
+        """returns the number of steps each game lasted"""
+        return self._episode_lengths
+
+    def get_scores(self) -> list[int]:
+        """returns the length of the snake at the end of each game"""
+        return self._scores
+
+    def get_seconds(self) -> float:
+        return self._seconds
+
+    def get_total_steps(self) -> int:
+        return sum(self._episode_lengths)
+
+    def get_steps_per_second(self) -> float:
+        if self._seconds == 0:
+            return 0.0
+        return self.get_total_steps() / self._seconds
+
+    def get_mean_score(self) -> float:
+        if len(self._scores) == 0:
+            return 0.0
+        return sum(self._scores) / len(self._scores)
+
+    def get_score_histogram(self) -> dict[int, int]:
+        """returns how many games ended with each score"""
+        return dict(sorted(Counter(self._scores).items()))
+
+    def get_mean_episode_length(self) -> float:
+        if len(self._episode_lengths) == 0:
+            return 0.0
+        return sum(self._episode_lengths) / len(self._episode_lengths)
+
+
+def run_episode(policy: Policy, rows: int = 9, cols: int = 9, max_steps: int | None = None,
+                game_class: type = python_snake_game_model.SnakeGameState, seed: int | None = None) -> tuple[int, int]:
+    """Plays one game with the policy until it is over, or until max_steps steps.
+    If a seed is given, the game places its points with its own random.Random(seed).
+    Returns the number of steps and the score (length of the snake)."""
+    rng = random.Random(seed) if seed is not None else None
+    game = game_class(rows, cols, rng=rng)
+    return play(game, policy, max_steps), game.get_snake_length()
+
+
+def play(game: 'python_snake_game_model.SnakeGameState', policy: Policy, max_steps: int | None = None) -> int:
+    """Steps the game with the policy until it is over, or until max_steps steps. Returns the number of steps."""
+    turns = {"N": game.turn_north, "E": game.turn_east, "S": game.turn_south, "W": game.turn_west}
+    progress_game = game.progress_game
+    get_game_over = game.get_game_over
+    steps = 0
+    while not get_game_over() and (max_steps is None or steps < max_steps):
+        move = policy(game)
+        if move is not None:
+            turns[move]()
+        progress_game()
+        steps += 1
+    return steps
+
+
+def run_episodes(policy: Policy, episodes: int, rows: int = 9, cols: int = 9, max_steps: int | None = None,
+                 game_class: type = python_snake_game_model.SnakeGameState) -> HeadlessResults:
+    """Plays a number of games with the policy and returns the episode lengths, scores and speed."""
+    episode_lengths = []
+    scores = []
+    start = time.perf_counter()
+    for _ in range(episodes):
+        steps, score = run_episode(policy, rows, cols, max_steps, game_class)
+        episode_lengths.append(steps)
+        scores.append(score)
+    return HeadlessResults(episode_lengths, scores, time.perf_counter() - start)
+
+
+def run_episodes_parallel(policy: Policy, episodes: int, rows: int = 9, cols: int = 9, max_steps: int | None = None,
+                          game_class: type = python_snake_game_model.SnakeGameState, seed: int = 0,
+                          processes: int | None = None) -> HeadlessResults:
+    """Plays a number of games with the policy spread over a pool of processes (one per core by default).
+    Game i is seeded with seed + i, and the random module is reseeded with "policy {seed + i}" for the policy,
+    so the results are the same whatever the number of processes. The policy must be picklable,
+    for example a function defined at the top level of a module."""
+    if processes is None:
+        processes = os.cpu_count() or 1
+    # a few chunks per process so that a process with short games doesn't sit around
+    chunk_size = max(1, episodes // (processes * 4))
+    chunks = [(policy, rows, cols, max_steps, game_class, range(start, min(start + chunk_size, episodes)), seed)
+              for start in range(0, episodes, chunk_size)]
+    episode_lengths = []
+    scores = []
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        for chunk_lengths, chunk_scores in pool.starmap(_run_chunk, chunks):
+            episode_lengths.extend(chunk_lengths)
+            scores.extend(chunk_scores)
+    return HeadlessResults(episode_lengths, scores, time.perf_counter() - start)
+
+
+def _run_chunk(policy: Policy, rows: int, cols: int, max_steps: int | None, game_class: type,
+               episodes: range, seed: int) -> tuple[list[int], list[int]]:
+    """Plays the episodes of one chunk of run_episodes_parallel. Only the lengths and scores are sent back."""
+    episode_lengths = []
+    scores = []
+    for episode in episodes:
+        random.seed(f"policy {seed + episode}")
+        steps, score = run_episode(policy, rows, cols, max_steps, game_class, seed + episode)
+        episode_lengths.append(steps)
+        scores.append(score)
+    return episode_lengths, scores
+
+
+def straight_policy(game: 'python_snake_game_model.SnakeGameState') -> None:
+    """Never turns"""
+    return None
+
+
+def random_policy(game: 'python_snake_game_model.SnakeGameState') -> str | None:
+    """Turns in a random direction half of the time"""
+    if random.random() < 0.5:
+        return None
+    return random.choice("NESW")
+
+
+if __name__ == "__main__":
+    # only needed here, so that importing this module to run other policies doesn't import the autopilot
+    import python_snake_game_autopilot
+
+    print(run_episodes(random_policy, 10000, 9, 9))
+    print(run_episodes_parallel(random_policy, 100000, 9, 9))
+    print(run_episodes(python_snake_game_autopilot.Autopilot(), 100, 9, 9, max_steps=10000))
@@ -0,0 +1,52 @@
+# python_snake_game_headless_test.py
+# author: Robin Jiang
+#
+# this is the unittesting for the headless runner
+
+import random
+import unittest
+from python_snake_game_headless import *
+from python_snake_game_model import CompactSnakeGameState, SnakeGameState
+
+
+class TestHeadless(unittest.TestCase):
+    """Tests the headless runner"""
+    def test_straight_policy_hits_the_wall(self):
+        # the snake starts in the middle of a 9x9 board going north
+        self.assertEqual((5, 3), run_episode(straight_policy, 9, 9))
+
+    def test_max_steps_stops_the_game(self):
+        steps, score = run_episode(straight_policy, 50, 50, max_steps=10)
+        self.assertEqual(10, steps)
+
+    def test_results_add_up(self):
+        results = run_episodes(random_policy, 20, 6, 6)
+        self.assertEqual(20, len(results.get_scores()))
+        self.assertEqual(sum(results.get_episode_lengths()), results.get_total_steps())
+        self.assertGreater(results.get_steps_per_second(), 0)
+
+    def test_compact_game_gives_the_same_results(self):
+        all_results = []
+        for game_class in (SnakeGameState, CompactSnakeGameState):
+            random.seed(5)
+            results = run_episodes(random_policy, 20, 6, 6, game_class=game_class)
+            all_results.append((results.get_episode_lengths(), results.get_scores()))
+        self.assertEqual(all_results[0], all_results[1])
+
+    def test_parallel_results_do_not_depend_on_the_number_of_processes(self):
+        one = run_episodes_parallel(random_policy, 40, 6, 6, seed=7, processes=1)
+        two = run_episodes_parallel(random_policy, 40, 6, 6, seed=7, processes=2)
+        self.assertEqual(one.get_scores(), two.get_scores())
+        self.assertEqual(one.get_episode_lengths(), two.get_episode_lengths())
+        self.assertEqual(40, sum(one.get_score_histogram().values()))
+
+    def test_seeded_games_are_reproducible(self):
+        results = []
+        for _ in range(2):
+            random.seed(1)
+            results.append(run_episode(random_policy, 6, 6, seed=3))
+        self.assertEqual(results[0], results[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
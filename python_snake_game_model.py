@@ -4,12 +4,41 @@
 # this module contains the logic or "model" part of the snake game
 
 import random
+from array import array
+from collections import deque
+from collections.abc import Callable, Iterator
 
 # global constants
 
 # possible states for a block
 POSSIBLE_STATES = (" ", "H", "B", "P")
 
+# indexes of the states in POSSIBLE_STATES, for boards stored as bytes
+_EMPTY, _HEAD, _BODY, _POINT = range(len(POSSIBLE_STATES))
+
+# directions as their index in "NESW", for code that keeps directions as ints
+NORTH, EAST, SOUTH, WEST = range(4)
+
+# index of each direction in "NESW"
+_DIRECTION_INDEXES = {"N": NORTH, "E": EAST, "S": SOUTH, "W": WEST}
+
+# how far the head moves in rows and columns going in each direction of "NESW"
+_ROW_DELTAS = (-1, 0, 1, 0)
+_COLUMN_DELTAS = (0, 1, 0, -1)
+
+# symbol of the head of the snake going in each direction, for drawing the board as text
+_HEAD_SYMBOLS = {"N": "^", "E": ">", "S": "v", "W": "<"}
+
+
+def _next_cell(row: int, col: int, direction: int, rows: int, cols: int) -> int:
+    """returns the cell (row * cols + col) next to the given one in the direction (an index in "NESW"),
+    or -1 if it is off the board"""
+    row += _ROW_DELTAS[direction]
+    col += _COLUMN_DELTAS[direction]
+    if not (0 <= row < rows and 0 <= col < cols):
+        return -1
+    return row * cols + col
+
 
 # exceptions
 class MoveAfterGameOverError(Exception):
@@ -19,22 +48,26 @@ class MoveAfterGameOverError(Exception):
 
 class SnakeGameState:
     """class that represents one board for a snake game"""
-    def __init__(self, rows: int = 9, cols: int = 9):
-        """Minimum 3 rows and 3 cols. preferred odd number"""
+    def __init__(self, rows: int = 9, cols: int = 9, rng: random.Random | None = None):
+        """Minimum 3 rows and 3 cols. preferred odd number.
+        Points are placed using rng, or the random module if no rng is given."""
         # board that represents a game
-        self._board: list[list['Block']] = []
-        for row in range(rows):
-            self._board.append([])
-            for col in range(cols):
-                self._board[row].append(Block())
+        # every blank space is the same shared block
+        self._board: list[list['Block']] = [[EMPTY_BLOCK] * cols for row in range(rows)]
+        self._rows = rows
+        self._cols = cols
+
+        # 1 for every cell (row * cols + col) the snake is in, so moves are checked without looking at blocks
+        self._occupied = bytearray(rows * cols)
+
+        # index of the empty cells, so a point can be spawned without scanning the board
+        self._free_cells = _FreeCellIndex(rows, cols)
+        self._random = rng if rng is not None else random
 
         # pointers to the head and tail of the snake (represented by a singly linked list)
         self._snake_head = self._create_snake()
         self._snake_tail = self._snake_head
 
-        # dictionary for mapping direction and symbol for head of snake (only for shell game)
-        self._parsing_key = {"N": "^", "E": ">", "S": "v", "W": "<"}
-
         # whether the game is still going on
         self._game_over = False
 
@@ -51,8 +84,9 @@ class SnakeGameState:
         # next move queue for turning
         self._next_move = None
 
-        # point coordinates
+        # point coordinates, and the cell they are in (-1 if there is no point)
         self._point_coordinates = None
+        self._point_cell = -1
 
 
     def progress_game(self) -> None:
@@ -60,10 +94,10 @@ class SnakeGameState:
         next_row, next_col = self._calculate_next_block_location()
         if not self._game_over:
             self._already_turned = False
+            next_cell = next_row * self._cols + next_col
             # next = towards the head
-            next_head = Block(state="H", direction=self._snake_head.get_direction(), row=next_row, col=next_col,
-                              next_value=None)
-            ate_point = self._board[next_row][next_col].get_state() == "P"
+            next_head = Block._new_head("NESW"[self._direction], next_row, next_col)
+            ate_point = next_cell == self._point_cell
             too_short = self._length < 3
             if ate_point or too_short or self._still_growing:
                 if ate_point and too_short:
@@ -78,50 +112,75 @@ class SnakeGameState:
                 self._length += 1
             else:
                 to_del = self._snake_tail
-                self._snake_tail = self._snake_tail.get_next()
-                self._board[to_del.get_row()][to_del.get_column()] = Block()
+                self._snake_tail = to_del.get_next()
+                to_del_row = to_del.get_row()
+                to_del_col = to_del.get_column()
+                self._board[to_del_row][to_del_col] = EMPTY_BLOCK
+                to_del_cell = to_del_row * self._cols + to_del_col
+                self._occupied[to_del_cell] = 0
+                self._free_cells.add_cell(to_del_cell)
+            if not ate_point:
+                self._free_cells.remove_cell(next_cell)
             self._board[next_row][next_col] = next_head
+            self._occupied[next_cell] = 1
             self._snake_head.set_next(next_head)
             self._snake_head.set_state("B")
             self._snake_head = next_head
+            self._head_row = next_row
+            self._head_col = next_col
             if self._next_move is not None:
                 self._next_move()
                 self._next_move = None
             if self._point_eaten:
                 self.create_random_point()
 
-    def turn_north(self) -> None:
-        """turns the snake north if possible"""
-
-        if self._snake_head.get_direction() in ("E", "W") and not self._already_turned:
+    def turn_north(self) -> bool:
+        """turns the snake north if possible. Returns whether the snake turned or the turn was queued"""
+        if self._direction % 2 != 0 and not self._already_turned:
             self._snake_head.set_direction("N")
+            self._direction = 0
             self._already_turned = True
+            return True
         elif self._already_turned and self._next_move is None:
             self._next_move = self.turn_north
+            return True
+        return False
 
-    def turn_east(self) -> None:
-        """turns the snake east if possible"""
-        if self._snake_head.get_direction() in ("N", "S") and not self._already_turned:
+    def turn_east(self) -> bool:
+        """turns the snake east if possible. Returns whether the snake turned or the turn was queued"""
+        if self._direction % 2 != 1 and not self._already_turned:
             self._snake_head.set_direction("E")
+            self._direction = 1
             self._already_turned = True
+            return True
         elif self._already_turned and self._next_move is None:
             self._next_move = self.turn_east
+            return True
+        return False
 
-    def turn_south(self) -> None:
-        """turns the snake south if possible"""
-        if self._snake_head.get_direction() in ("E", "W") and not self._already_turned:
+    def turn_south(self) -> bool:
+        """turns the snake south if possible. Returns whether the snake turned or the turn was queued"""
+        if self._direction % 2 != 0 and not self._already_turned:
             self._snake_head.set_direction("S")
+            self._direction = 2
             self._already_turned = True
+            return True
         elif self._already_turned and self._next_move is None:
             self._next_move = self.turn_south
+            return True
+        return False
 
-    def turn_west(self) -> None:
-        """turns the snake west if possible"""
-        if self._snake_head.get_direction() in ("N", "S") and not self._already_turned:
+    def turn_west(self) -> bool:
+        """turns the snake west if possible. Returns whether the snake turned or the turn was queued"""
+        if self._direction % 2 != 1 and not self._already_turned:
             self._snake_head.set_direction("W")
+            self._direction = 3
             self._already_turned = True
+            return True
         elif self._already_turned and self._next_move is None:
             self._next_move = self.turn_west
+            return True
+        return False
 
     def print_board(self) -> None:
         """prints the board"""
@@ -129,29 +188,36 @@ class SnakeGameState:
 
     def get_board(self) -> list[list['Block']]:
         """returns a copy of the board"""
-        copy_board = []
-        for row in range(len(self._board)):
-            copy_board.append([])
-            for col in range(len(self._board[0])):
-                copy_board[row].append(self._board[row][col].make_copy())
-        return copy_board
+        return self.get_board_view().snapshot()
+
+    def get_board_view(self) -> 'BoardView':
+        """returns a read-only view of the live board, without copying it"""
+        return BoardView(self._board)
 
     def create_random_point(self) -> None:
-        """Creates a random point and adds it to the board."""
-        eligible_blocks = []
-        for row in range(len(self._board)):
-            for col in range(len(self._board[0])):
-                if self._board[row][col].get_state() == " ":
-                    # empty board spot
-                    eligible_blocks.append((row, col))
-        row, col = random.choice(eligible_blocks)
+        """Creates a random point and adds it to the board. If the snake fills the whole board, the game is over."""
+        if len(self._free_cells) == 0:
+            self._point_coordinates = None
+            self._point_cell = -1
+            self._point_eaten = False
+            self._game_over = True
+            return
+        row, col = self._free_cells.choice(self._random)
+        self._free_cells.remove(row, col)
         self._point_coordinates = (row, col)
-        self._board[row][col] = Block(row=row, col=col, state="P")
+        self._point_cell = row * self._cols + col
+        self._board[row][col] = POINT_BLOCK
         self._point_eaten = False
 
     def get_game_over(self) -> bool:
         return self._game_over
 
+    def get_rows(self) -> int:
+        return self._rows
+
+    def get_columns(self) -> int:
+        return self._cols
+
     def get_snake_length(self) -> int:
         """returns the length of the snake"""
         return self._length
@@ -159,33 +225,88 @@ class SnakeGameState:
     def get_snake_tail(self) -> 'Block':
         return self._snake_tail
 
+    def get_snake_head(self) -> 'Block':
+        return self._snake_head
+
+    def snapshot(self) -> 'SnakeGameSnapshot':
+        """Returns a snapshot of the game that it can be restored to later.
+        Takes time in proportion to the length of the snake: the arrays of free cells are shared with the game
+        until it next changes them."""
+        cols = len(self._board[0])
+        cells = []
+        directions = bytearray()
+        block = self._snake_tail
+        while block is not None:
+            cells.append(block.get_row() * cols + block.get_column())
+            directions.append(_DIRECTION_INDEXES[block.get_direction()] |
+                              _DIRECTION_INDEXES[block.get_previous_direction()] << 2)
+            block = block.get_next()
+        return SnakeGameSnapshot(len(self._board), cols, cells, bytes(directions), self._point_coordinates,
+                                 *self._free_cells.copy_state(), self._game_over, self._still_growing,
+                                 self._point_eaten, self._already_turned, _queued_turn(self._next_move),
+                                 self._random.getstate())
+
+    def restore(self, snapshot: 'SnakeGameSnapshot') -> None:
+        """Puts the game back the way it was when the snapshot was taken, including where the next point goes.
+        The snapshot can be restored again later."""
+        cols = len(self._board[0])
+        if (snapshot.get_rows(), snapshot.get_columns()) != (len(self._board), cols):
+            raise ValueError("the snapshot is for a different size of board")
+        board = self._board
+
+        # take the current snake and point off the board
+        block = self._snake_tail
+        while block is not None:
+            board[block.get_row()][block.get_column()] = EMPTY_BLOCK
+            self._occupied[block.get_row() * cols + block.get_column()] = 0
+            block = block.get_next()
+        if self._point_coordinates is not None:
+            board[self._point_coordinates[0]][self._point_coordinates[1]] = EMPTY_BLOCK
+
+        # put the snake back, from head to tail
+        next_block = None
+        for cell, direction in zip(reversed(snapshot.get_snake()), reversed(snapshot.get_directions())):
+            row, col = divmod(cell, cols)
+            block = Block(state="B" if next_block is not None else "H", next_value=next_block,
+                          direction="NESW"[direction & 3], row=row, col=col)
+            block.set_previous_direction("NESW"[direction >> 2])
+            board[row][col] = block
+            self._occupied[cell] = 1
+            if next_block is None:
+                self._snake_head = block
+                self._head_row, self._head_col, self._direction = row, col, direction & 3
+            next_block = block
+        self._snake_tail = next_block
+
+        self._point_coordinates = snapshot.get_point_coordinates()
+        self._point_cell = -1
+        if self._point_coordinates is not None:
+            board[self._point_coordinates[0]][self._point_coordinates[1]] = POINT_BLOCK
+            self._point_cell = self._point_coordinates[0] * cols + self._point_coordinates[1]
+        _restore_flags(self, snapshot)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: 'SnakeGameSnapshot') -> 'SnakeGameState':
+        """Makes a new game from the snapshot, with its own random generator"""
+        game = cls(snapshot.get_rows(), snapshot.get_columns(), rng=random.Random())
+        game.restore(snapshot)
+        return game
+
     def get_point_coordinates(self) -> tuple[int, int]:
         return self._point_coordinates
-
     # protected class methods
     def _prepare_print_board(self) -> str:
         """returns one str for the shell to print the board"""
-        str_to_print = "_" * 3 * len(self._board[0]) + "__" + "\n"
-        for row in range(len(self._board)):
-            str_to_print += "|"
-            for col in range(len(self._board[0])):
-                str_to_print += " " + self._parse_state(self._board[row][col]) + " "
-            str_to_print += "|\n"
-        str_to_print += "_" * 3 * len(self._board[0]) + "__"
-        return str_to_print
+        border = "_" * 3 * len(self._board[0]) + "__"
+        lines = [border]
+        for row in self._board:
+            lines.append("|" + "".join([" " + self._parse_state(block) + " " for block in row]) + "|")
+        lines.append(border)
+        return "\n".join(lines)
 
     def _parse_state(self, block: 'Block') -> str:
         """Parses the state of the board from block state to a str of length one"""
-        # B = body, H = head, P = point
-        state = block.get_state()
-        if state == "B":
-            return "B"
-        elif state == "H":
-            return self._parsing_key[block.get_direction()]
-        elif state == "P":
-            return "P"
-        else:
-            return "."
+        return _parse_block(block)
 
     def _require_game_not_over(self) -> None:
         if self._game_over:
@@ -195,42 +316,849 @@ class SnakeGameState:
         """Makes a snake for the board. Intended for use only when the board is first initialized."""
         head = Block(state="H", direction="N", row=int(len(self._board)/2), col=int(len(self._board[0])/2) )
         self._board[head.get_row()][head.get_column()] = head
+        self._free_cells.remove(head.get_row(), head.get_column())
+        self._occupied[head.get_row() * self._cols + head.get_column()] = 1
+        # where the head is and the index in "NESW" of the way it is going, kept as ints for progress_game
+        self._head_row = head.get_row()
+        self._head_col = head.get_column()
+        self._direction = 0
         return head
 
     def _calculate_next_block_location(self) -> tuple[int, int]:
         """Returns the row and column of the next block if the snake is to move forward.
-        Checks to see if the next location is viable"""
-        direction = self._snake_head.get_direction()
-        row, col = -1, -1
-        if direction == "N" or direction == "S":
-            if direction == "N":
-                row = self._snake_head.get_row() - 1
-            else:
-                row = self._snake_head.get_row() + 1
-            col = self._snake_head.get_column()
-        elif direction == "E" or direction == "W":
-            if direction == "E":
-                col = self._snake_head.get_column() + 1
-            else:
-                col = self._snake_head.get_column() - 1
-            row = self._snake_head.get_row()
-        self._require_next_row_and_column_are_valid(row, col)
+        Sets game_over to True if it is off the board or part of the snake"""
+        row = self._head_row + _ROW_DELTAS[self._direction]
+        col = self._head_col + _COLUMN_DELTAS[self._direction]
+        if not (0 <= row < self._rows and 0 <= col < self._cols) or self._occupied[row * self._cols + col]:
+            self._game_over = True
         return row, col
 
-    def _require_next_row_and_column_are_valid(self, row: int, col: int) -> None:
-        """Sets game_over to True if the next position for the head is invalid"""
-        if not(0 <= row < len(self._board)) or not(0 <= col < len(self._board[0])):
+
+class CompactSnakeGameState:
+    """Same game as SnakeGameState, but the board is a flat bytearray of cell states and the snake is a deque
+    of cells from tail to head, so big boards take a few MB instead of one Block per cell.
+    Blocks are only made when they are asked for (get_board, get_snake_tail)."""
+    def __init__(self, rows: int = 9, cols: int = 9, rng: random.Random | None = None):
+        """Minimum 3 rows and 3 cols. preferred odd number.
+        Points are placed using rng, or the random module if no rng is given."""
+        self._rows = rows
+        self._cols = cols
+        # cell states indexed by row * cols + col, as indexes into POSSIBLE_STATES
+        self._cells = bytearray(rows * cols)
+        self._free_cells = _FreeCellIndex(rows, cols)
+        self._random = rng if rng is not None else random
+
+        # cells of the snake from tail to head, and the direction (index into "NESW") of each of them
+        head = int(rows / 2) * cols + int(cols / 2)
+        self._body = deque([head])
+        self._directions = deque([0])
+        self._cells[head] = _HEAD
+        self._free_cells.remove_cell(head)
+
+        self._game_over = False
+        self._still_growing = False
+        self._length = 1
+        self._point_eaten = True
+        self._already_turned = False
+        self._next_move = None
+        self._point_coordinates = None
+
+    def progress_game(self) -> None:
+        self._require_game_not_over()
+        next_cell = self._calculate_next_cell()
+        if not self._game_over:
+            self._already_turned = False
+            ate_point = self._cells[next_cell] == _POINT
+            too_short = self._length < 3
+            if ate_point or too_short or self._still_growing:
+                if ate_point and too_short:
+                    self._still_growing = True
+                else:
+                    self._still_growing = False
+
+                if ate_point:
+                    self._point_eaten = True
+                self._length += 1
+            else:
+                to_del = self._body.popleft()
+                self._directions.popleft()
+                self._cells[to_del] = _EMPTY
+                self._free_cells.add_cell(to_del)
+            if not ate_point:
+                self._free_cells.remove_cell(next_cell)
+            self._cells[self._body[-1]] = _BODY
+            self._cells[next_cell] = _HEAD
+            self._body.append(next_cell)
+            self._directions.append(self._directions[-1])
+            if self._next_move is not None:
+                self._next_move()
+                self._next_move = None
+            if self._point_eaten:
+                self.create_random_point()
+
+    def turn_north(self) -> bool:
+        """turns the snake north if possible. Returns whether the snake turned or the turn was queued"""
+        return self._turn(0, self.turn_north)
+
+    def turn_east(self) -> bool:
+        """turns the snake east if possible. Returns whether the snake turned or the turn was queued"""
+        return self._turn(1, self.turn_east)
+
+    def turn_south(self) -> bool:
+        """turns the snake south if possible. Returns whether the snake turned or the turn was queued"""
+        return self._turn(2, self.turn_south)
+
+    def turn_west(self) -> bool:
+        """turns the snake west if possible. Returns whether the snake turned or the turn was queued"""
+        return self._turn(3, self.turn_west)
+
+    def print_board(self) -> None:
+        """prints the board"""
+        print(self._prepare_print_board())
+
+    def get_board(self) -> list[list['Block']]:
+        """returns a copy of the board"""
+        board = [[EMPTY_BLOCK.make_copy() for col in range(self._cols)] for row in range(self._rows)]
+        block = self.get_snake_tail()
+        while block is not None:
+            board[block.get_row()][block.get_column()] = block
+            block = block.get_next()
+        if self._point_coordinates is not None:
+            row, col = self._point_coordinates
+            board[row][col] = POINT_BLOCK.make_copy()
+        return board
+
+    def create_random_point(self) -> None:
+        """Creates a random point and adds it to the board. If the snake fills the whole board, the game is over."""
+        if len(self._free_cells) == 0:
+            self._point_coordinates = None
+            self._point_eaten = False
             self._game_over = True
             return
-        if self._board[row][col].get_state() == "B" or self._board[row][col].get_state() == "H":
+        row, col = self._free_cells.choice(self._random)
+        self._free_cells.remove(row, col)
+        self._point_coordinates = (row, col)
+        self._cells[row * self._cols + col] = _POINT
+        self._point_eaten = False
+
+    def get_game_over(self) -> bool:
+        return self._game_over
+
+    def get_rows(self) -> int:
+        return self._rows
+
+    def get_columns(self) -> int:
+        return self._cols
+
+    def get_snake_length(self) -> int:
+        """returns the length of the snake"""
+        return self._length
+
+    def get_snake_head(self) -> 'Block':
+        """Returns a block for the head of the snake, without the rest of the snake"""
+        row, col = divmod(self._body[-1], self._cols)
+        return Block(state="H", direction="NESW"[self._directions[-1]], row=row, col=col)
+
+    def snapshot(self) -> 'SnakeGameSnapshot':
+        """Returns a snapshot of the game that it can be restored to later.
+        Takes time in proportion to the length of the snake: the arrays of free cells are shared with the game
+        until it next changes them."""
+        directions = bytes(direction | direction << 2 for direction in self._directions)
+        return SnakeGameSnapshot(self._rows, self._cols, list(self._body), directions, self._point_coordinates,
+                                 *self._free_cells.copy_state(), self._game_over, self._still_growing,
+                                 self._point_eaten, self._already_turned, _queued_turn(self._next_move),
+                                 self._random.getstate())
+
+    def restore(self, snapshot: 'SnakeGameSnapshot') -> None:
+        """Puts the game back the way it was when the snapshot was taken, including where the next point goes.
+        The snapshot can be restored again later."""
+        if (snapshot.get_rows(), snapshot.get_columns()) != (self._rows, self._cols):
+            raise ValueError("the snapshot is for a different size of board")
+        for cell in self._body:
+            self._cells[cell] = _EMPTY
+        if self._point_coordinates is not None:
+            self._cells[self._point_coordinates[0] * self._cols + self._point_coordinates[1]] = _EMPTY
+
+        self._body = deque(snapshot.get_snake())
+        self._directions = deque(direction & 3 for direction in snapshot.get_directions())
+        for cell in self._body:
+            self._cells[cell] = _BODY
+        self._cells[self._body[-1]] = _HEAD
+        self._point_coordinates = snapshot.get_point_coordinates()
+        if self._point_coordinates is not None:
+            self._cells[self._point_coordinates[0] * self._cols + self._point_coordinates[1]] = _POINT
+        _restore_flags(self, snapshot)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: 'SnakeGameSnapshot') -> 'CompactSnakeGameState':
+        """Makes a new game from the snapshot, with its own random generator"""
+        game = cls(snapshot.get_rows(), snapshot.get_columns(), rng=random.Random())
+        game.restore(snapshot)
+        return game
+
+    def get_snake_tail(self) -> 'Block':
+        """Builds the snake as a linked list of blocks from tail to head and returns the tail"""
+        next_block = None
+        for cell, direction in zip(reversed(self._body), reversed(self._directions)):
+            row, col = divmod(cell, self._cols)
+            next_block = Block(state=POSSIBLE_STATES[self._cells[cell]], next_value=next_block,
+                               direction="NESW"[direction], row=row, col=col)
+        return next_block
+
+    def get_point_coordinates(self) -> tuple[int, int]:
+        return self._point_coordinates
+    # protected class methods
+    def _prepare_print_board(self) -> str:
+        """returns one str for the shell to print the board"""
+        symbols = [".", "", "B", "P"]
+        lines = ["_" * 3 * self._cols + "__"]
+        head = self._body[-1]
+        for row in range(self._rows):
+            line = []
+            for cell in range(row * self._cols, (row + 1) * self._cols):
+                if cell == head:
+                    line.append(" " + _HEAD_SYMBOLS["NESW"[self._directions[-1]]] + " ")
+                else:
+                    line.append(" " + symbols[self._cells[cell]] + " ")
+            lines.append("|" + "".join(line) + "|")
+        lines.append("_" * 3 * self._cols + "__")
+        return "\n".join(lines)
+
+    def _require_game_not_over(self) -> None:
+        if self._game_over:
+            raise MoveAfterGameOverError
+
+    def _turn(self, direction: int, turn_method: 'Callable[[], bool]') -> bool:
+        """turns the snake to the direction if it is perpendicular to where the head is going,
+        or queues turn_method for after the next move if the snake already turned"""
+        if (self._directions[-1] - direction) % 2 == 1 and not self._already_turned:
+            self._directions[-1] = direction
+            self._already_turned = True
+            return True
+        elif self._already_turned and self._next_move is None:
+            self._next_move = turn_method
+            return True
+        return False
+
+    def _calculate_next_cell(self) -> int:
+        """Returns the cell the head moves into if the snake moves forward.
+        Sets game_over to True if it is off the board or part of the snake"""
+        row, col = divmod(self._body[-1], self._cols)
+        next_cell = _next_cell(row, col, self._directions[-1], self._rows, self._cols)
+        if next_cell == -1 or self._cells[next_cell] in (_HEAD, _BODY):
+            self._game_over = True
+        return next_cell
+
+
+class MultiSnakeGameState(SnakeGameState):
+    """SnakeGameState with several snakes and several points on one board. Every snake moves at once each
+    progress_game, so which snake crashes doesn't depend on their order: a snake crashes if it moves off the
+    board, into a cell any snake was in before the move (its own tail included, like in SnakeGameState), or into
+    the same cell as another snake. Crashed snakes are taken off the board. Whenever points are eaten, new ones
+    are put on empty cells until there are as many as the game started with (or no empty cells are left).
+    The game is over when every snake has crashed or the board is full.
+    Snakes are picked by their index in the turn and get_snake_* methods, which default to the first snake.
+
+    Which snake is in each cell is kept in an index, so a move is checked in constant time
+    and progress_game takes time in proportion to the number of snakes, not the size of the board."""
+    def __init__(self, rows: int = 9, cols: int = 9, snakes: int = 2, rng: random.Random | None = None,
+                 record_changes: bool = False, points: int = 1):
+        """The snakes start side by side along the middle row, heading north. There can be at most cols snakes.
+        If record_changes is True, every progress_game keeps track of the cells it changed, see get_changes.
+        points is how many points there are on the board at once. They are put there by the first progress_game."""
+        if not 1 <= snakes <= cols:
+            raise ValueError("there must be at least one snake and at most one snake per column")
+        if points < 1:
+            raise ValueError("there must be at least one point")
+        super().__init__(rows, cols, rng)
+        # take the snake the board starts with off it, and put the snakes in their places
+        self._board[self._snake_head.get_row()][self._snake_head.get_column()] = EMPTY_BLOCK
+        self._free_cells.add(self._snake_head.get_row(), self._snake_head.get_column())
+        self._occupied[self._snake_head.get_row() * cols + self._snake_head.get_column()] = 0
+        self._snake_head = None
+        self._snake_tail = None
+
+        # index of the snake in each cell (row * cols + col), or -1 if no snake is there
+        self._occupants = array('i', [-1]) * (rows * cols)
+        self._snakes = []
+        for index in range(snakes):
+            head = Block(state="H", direction="N", row=int(rows / 2), col=int((2 * index + 1) * cols / (2 * snakes)))
+            self._board[head.get_row()][head.get_column()] = head
+            self._free_cells.remove(head.get_row(), head.get_column())
+            self._occupants[head.get_row() * cols + head.get_column()] = index
+            self._snakes.append(_Snake(head, index))
+        self._living = snakes
+
+        # the points on the board, in the order they were put there (the values are unused)
+        self._point_count = points
+        self._points: dict[tuple[int, int], None] = {}
+
+        # what the last progress_game changed, if changes are recorded
+        self._record_changes = record_changes
+        self._changes = None
+
+    def progress_game(self) -> None:
+        self._require_game_not_over()
+        if self._record_changes:
+            self._changes = StepChanges()
+        # work out where every snake goes before any of them moves
+        moves = []
+        targets = {}
+        for snake in self._snakes:
+            if not snake.crashed:
+                cell = self._calculate_next_cell(snake)
+                moves.append((snake, cell))
+                targets[cell] = targets.get(cell, 0) + 1
+        occupants = self._occupants
+        crashed = [snake for snake, cell in moves if cell == -1 or occupants[cell] != -1 or targets[cell] > 1]
+        for snake in crashed:
+            self._remove_snake(snake)
+        for snake, cell in moves:
+            if not snake.crashed:
+                self._move_snake(snake, cell)
+        if self._living == 0:
             self._game_over = True
+        else:
+            self.create_random_point()
+        if self._changes is not None:
+            self._changes._game_over = self._game_over
+
+    def turn_north(self, snake: int = 0) -> bool:
+        """turns the snake north if possible. Returns whether the snake turned or the turn was queued"""
+        return self._turn(self._snakes[snake], "N")
+
+    def turn_east(self, snake: int = 0) -> bool:
+        """turns the snake east if possible. Returns whether the snake turned or the turn was queued"""
+        return self._turn(self._snakes[snake], "E")
+
+    def turn_south(self, snake: int = 0) -> bool:
+        """turns the snake south if possible. Returns whether the snake turned or the turn was queued"""
+        return self._turn(self._snakes[snake], "S")
+
+    def turn_west(self, snake: int = 0) -> bool:
+        """turns the snake west if possible. Returns whether the snake turned or the turn was queued"""
+        return self._turn(self._snakes[snake], "W")
+
+    def create_random_point(self) -> None:
+        """Puts points on random empty cells until there are as many as the game started with.
+        If there are no points and no empty cells left, the board is full and the game is over."""
+        while len(self._points) < self._point_count and len(self._free_cells) > 0:
+            row, col = self._free_cells.choice(self._random)
+            self._free_cells.remove(row, col)
+            self._board[row][col] = POINT_BLOCK
+            self._points[row, col] = None
+            if self._changes is not None:
+                self._changes._points.append((row, col))
+                self._record(row, col, "P", None)
+        self._point_coordinates = next(iter(self._points), None)
+        if len(self._points) == 0:
+            self._game_over = True
+
+    def get_changes(self) -> 'StepChanges | None':
+        """returns what the last progress_game changed, or None if changes aren't recorded
+        or progress_game hasn't been called yet"""
+        return self._changes
+
+    def get_points(self) -> list[tuple[int, int]]:
+        """returns the coordinates of every point, oldest first. get_point_coordinates returns the oldest one."""
+        return list(self._points)
+
+    def get_occupant(self, row: int, col: int) -> int | None:
+        """returns the index of the snake in the cell, or None if there is none"""
+        occupant = self._occupants[row * self._cols + col]
+        return occupant if occupant != -1 else None
+
+    def get_snake_count(self) -> int:
+        """returns how many snakes the game started with, crashed ones included"""
+        return len(self._snakes)
+
+    def get_crashed(self, snake: int = 0) -> bool:
+        return self._snakes[snake].crashed
+
+    def get_snake_length(self, snake: int = 0) -> int:
+        """returns the length of the snake, or 0 if it has crashed"""
+        return self._snakes[snake].length if not self._snakes[snake].crashed else 0
+
+    def get_snake_tail(self, snake: int = 0) -> 'Block | None':
+        """returns the tail of the snake, or None if it has crashed"""
+        return self._snakes[snake].tail if not self._snakes[snake].crashed else None
+
+    def get_snake_head(self, snake: int = 0) -> 'Block | None':
+        """returns the head of the snake, or None if it has crashed"""
+        return self._snakes[snake].head if not self._snakes[snake].crashed else None
+
+    def snapshot(self) -> 'MultiSnakeGameSnapshot':
+        """Returns a snapshot of the game that it can be restored to later.
+        Takes time in proportion to the length of the snakes, like SnakeGameState.snapshot."""
+        snakes = []
+        for snake in self._snakes:
+            cells = []
+            directions = bytearray()
+            block = snake.tail if not snake.crashed else None
+            while block is not None:
+                cells.append(block.get_row() * self._cols + block.get_column())
+                directions.append(_DIRECTION_INDEXES[block.get_direction()] |
+                                  _DIRECTION_INDEXES[block.get_previous_direction()] << 2)
+                block = block.get_next()
+            next_move = _DIRECTION_INDEXES[snake.next_move] if snake.next_move is not None else None
+            snakes.append((cells, bytes(directions), snake.still_growing, snake.already_turned, next_move))
+        return MultiSnakeGameSnapshot(self._rows, self._cols, snakes, list(self._points), self._point_count,
+                                      *self._free_cells.copy_state(), self._game_over, self._random.getstate())
+
+    def restore(self, snapshot: 'MultiSnakeGameSnapshot') -> None:
+        """Puts the game back the way it was when the snapshot was taken, including where the next points go.
+        The snapshot can be restored again later, and can have a different number of snakes or points."""
+        if not isinstance(snapshot, MultiSnakeGameSnapshot):
+            raise TypeError("a MultiSnakeGameState can only be restored from a MultiSnakeGameSnapshot")
+        if (snapshot.get_rows(), snapshot.get_columns()) != (self._rows, self._cols):
+            raise ValueError("the snapshot is for a different size of board")
+        board = self._board
+        cols = self._cols
+
+        # take the snakes and points off the board
+        for snake in self._snakes:
+            block = snake.tail if not snake.crashed else None
+            while block is not None:
+                board[block.get_row()][block.get_column()] = EMPTY_BLOCK
+                self._occupants[block.get_row() * cols + block.get_column()] = -1
+                block = block.get_next()
+        for row, col in self._points:
+            board[row][col] = EMPTY_BLOCK
+
+        # put the snakes back, each from head to tail
+        self._snakes = []
+        self._living = 0
+        for index, (cells, directions, still_growing, already_turned, next_move) in enumerate(snapshot.get_snakes()):
+            head = None
+            next_block = None
+            for cell, direction in zip(reversed(cells), reversed(directions)):
+                row, col = divmod(cell, cols)
+                block = Block(state="B" if next_block is not None else "H", next_value=next_block,
+                              direction="NESW"[direction & 3], row=row, col=col)
+                block.set_previous_direction("NESW"[direction >> 2])
+                board[row][col] = block
+                self._occupants[cell] = index
+                if head is None:
+                    head = block
+                next_block = block
+            snake = _Snake(head, index)
+            snake.tail = next_block
+            snake.length = len(cells)
+            snake.crashed = head is None
+            self._living += not snake.crashed
+            snake.still_growing = still_growing
+            snake.already_turned = already_turned
+            snake.next_move = "NESW"[next_move] if next_move is not None else None
+            self._snakes.append(snake)
+
+        self._points = dict.fromkeys(snapshot.get_points())
+        for row, col in self._points:
+            board[row][col] = POINT_BLOCK
+        self._point_coordinates = next(iter(self._points), None)
+        self._point_count = snapshot.get_point_count()
+        self._free_cells.set_state(snapshot.get_free_cells(), snapshot.get_free_positions())
+        self._game_over = snapshot.get_game_over()
+        self._random.setstate(snapshot.get_random_state())
+        self._changes = None
+
+    @classmethod
+    def from_snapshot(cls, snapshot: 'MultiSnakeGameSnapshot') -> 'MultiSnakeGameState':
+        """Makes a new game from the snapshot, with its own random generator. Changes aren't recorded."""
+        game = cls(snapshot.get_rows(), snapshot.get_columns(), len(snapshot.get_snakes()), rng=random.Random(),
+                   points=snapshot.get_point_count())
+        game.restore(snapshot)
+        return game
+
+    # protected class methods
+    def _calculate_next_cell(self, snake: '_Snake') -> int:
+        """returns the cell the head of the snake moves into, or -1 if it would move off the board"""
+        head = snake.head
+        return _next_cell(head.get_row(), head.get_column(), _DIRECTION_INDEXES[head.get_direction()],
+                          self._rows, self._cols)
+
+    def _move_snake(self, snake: '_Snake', cell: int) -> None:
+        """Moves the snake forward one block into the cell (which must be empty or a point),
+        the same way progress_game does for a single snake"""
+        row, col = divmod(cell, self._cols)
+        head = snake.head
+        snake.already_turned = False
+        next_head = Block._new_head(head.get_direction(), row, col)
+        ate_point = (row, col) in self._points
+        too_short = snake.length < 3
+        if ate_point or too_short or snake.still_growing:
+            snake.still_growing = ate_point and too_short
+            if ate_point:
+                del self._points[row, col]
+            snake.length += 1
+        else:
+            to_del = snake.tail
+            snake.tail = to_del.get_next()
+            self._board[to_del.get_row()][to_del.get_column()] = EMPTY_BLOCK
+            self._free_cells.add(to_del.get_row(), to_del.get_column())
+            self._occupants[to_del.get_row() * self._cols + to_del.get_column()] = -1
+            if self._changes is not None:
+                self._record(to_del.get_row(), to_del.get_column(), " ", None)
+        if not ate_point:
+            self._free_cells.remove(row, col)
+        self._board[row][col] = next_head
+        self._occupants[cell] = snake.index
+        head.set_next(next_head)
+        head.set_state("B")
+        snake.head = next_head
+        if self._changes is not None:
+            self._record(head.get_row(), head.get_column(), "B", snake.index)
+            self._record(row, col, "H", snake.index)
+        if snake.next_move is not None:
+            next_move = snake.next_move
+            snake.next_move = None
+            self._turn(snake, next_move)
+
+    def _remove_snake(self, snake: '_Snake') -> None:
+        """Takes a crashed snake off the board"""
+        snake.crashed = True
+        self._living -= 1
+        block = snake.tail
+        while block is not None:
+            self._board[block.get_row()][block.get_column()] = EMPTY_BLOCK
+            self._free_cells.add(block.get_row(), block.get_column())
+            self._occupants[block.get_row() * self._cols + block.get_column()] = -1
+            if self._changes is not None:
+                self._record(block.get_row(), block.get_column(), " ", None)
+            block = block.get_next()
+
+    def _record(self, row: int, col: int, state: str, snake: int | None) -> None:
+        """records that the cell changed to the state, which belongs to the snake if it is part of one"""
+        self._changes._cells[row * self._cols + col] = (state, snake)
+
+    def _turn(self, snake: '_Snake', direction: str) -> bool:
+        """turns the snake to the direction if it is perpendicular to where the head is going,
+        or queues the turn for after the next move if the snake already turned"""
+        if snake.crashed:
+            return False
+        if (_DIRECTION_INDEXES[snake.head.get_direction()] - _DIRECTION_INDEXES[direction]) % 2 == 1 and \
+                not snake.already_turned:
+            snake.head.set_direction(direction)
+            snake.already_turned = True
+            return True
+        elif snake.already_turned and snake.next_move is None:
+            snake.next_move = direction
+            return True
+        return False
+
+
+class _Snake:
+    """One snake of a MultiSnakeGameState: a linked list of blocks like the snake of a SnakeGameState,
+    and what SnakeGameState keeps about its snake"""
+    __slots__ = ("head", "tail", "index", "length", "still_growing", "already_turned", "next_move", "crashed")
+
+    def __init__(self, head: 'Block', index: int) -> None:
+        self.head = head
+        self.tail = head
+        self.index = index
+        self.length = 1
+        self.still_growing = False
+        self.already_turned = False
+        # direction of the turn queued for after the next move
+        self.next_move = None
+        self.crashed = False
+
+
+class StepChanges:
+    """What one progress_game of a MultiSnakeGameState changed. Each changed cell (row * cols + col) is mapped
+    to its state now and the index of the snake it is part of (None if it isn't part of one).
+    A cell that changed more than once in the step only has its last state."""
+    __slots__ = ("_cells", "_points", "_game_over")
+
+    def __init__(self) -> None:
+        self._cells: dict[int, tuple[str, int | None]] = {}
+        self._points: list[tuple[int, int]] = []
+        self._game_over = False
+
+    def get_cells(self) -> dict[int, tuple[str, int | None]]:
+        return self._cells
+
+    def get_points(self) -> list[tuple[int, int]]:
+        """returns where points were put in the step"""
+        return self._points
+
+    def get_game_over(self) -> bool:
+        return self._game_over
+
+
+class SnakeGameSnapshot:
+    """Everything needed to carry on a game from where the snapshot was taken.
+    Made by snapshot() and used by restore() and from_snapshot() of SnakeGameState and CompactSnakeGameState.
+    The snake is a list of cells (row * cols + col) from tail to head, and each direction is a byte holding the
+    index in "NESW" of the direction of that part of the snake, plus 4 times the index of its previous direction."""
+    __slots__ = ("_rows", "_cols", "_snake", "_directions", "_point_coordinates", "_free_cells", "_free_positions",
+                 "_game_over", "_still_growing", "_point_eaten", "_already_turned", "_next_move", "_random_state")
+
+    def __init__(self, rows: int, cols: int, snake: list[int], directions: bytes,
+                 point_coordinates: tuple[int, int] | None, free_cells: array, free_positions: array | None,
+                 game_over: bool, still_growing: bool, point_eaten: bool, already_turned: bool,
+                 next_move: int | None, random_state: tuple) -> None:
+        """free_positions is worked out from free_cells if it is None.
+        next_move is the index in "NESW" of the turn queued for after the next step, if there is one."""
+        self._rows = rows
+        self._cols = cols
+        self._snake = snake
+        self._directions = directions
+        self._point_coordinates = point_coordinates
+        self._free_cells = free_cells
+        if free_positions is None:
+            free_positions = array('i', [-1]) * (rows * cols)
+            for position, cell in enumerate(free_cells):
+                free_positions[cell] = position
+        self._free_positions = free_positions
+        self._game_over = game_over
+        self._still_growing = still_growing
+        self._point_eaten = point_eaten
+        self._already_turned = already_turned
+        self._next_move = next_move
+        self._random_state = random_state
+
+    def get_rows(self) -> int:
+        return self._rows
+
+    def get_columns(self) -> int:
+        return self._cols
+
+    def get_snake(self) -> list[int]:
+        return self._snake
+
+    def get_directions(self) -> bytes:
+        return self._directions
+
+    def get_point_coordinates(self) -> tuple[int, int] | None:
+        return self._point_coordinates
+
+    def get_free_cells(self) -> array:
+        return self._free_cells
+
+    def get_free_positions(self) -> array:
+        return self._free_positions
+
+    def get_game_over(self) -> bool:
+        return self._game_over
+
+    def get_still_growing(self) -> bool:
+        return self._still_growing
+
+    def get_point_eaten(self) -> bool:
+        return self._point_eaten
+
+    def get_already_turned(self) -> bool:
+        return self._already_turned
+
+    def get_next_move(self) -> int | None:
+        return self._next_move
+
+    def get_random_state(self) -> tuple:
+        return self._random_state
+
+
+class MultiSnakeGameSnapshot:
+    """Everything needed to carry on a MultiSnakeGameState from where the snapshot was taken.
+    Made by MultiSnakeGameState.snapshot() and used by its restore() and from_snapshot().
+    Each snake is its cells and directions (the same way as in a SnakeGameSnapshot, and both empty if it has
+    crashed), whether it is still growing, whether it already turned and the index in "NESW" of its queued turn.
+    The points are in the order they were put on the board."""
+    __slots__ = ("_rows", "_cols", "_snakes", "_points", "_point_count", "_free_cells", "_free_positions",
+                 "_game_over", "_random_state")
+
+    def __init__(self, rows: int, cols: int, snakes: list[tuple[list[int], bytes, bool, bool, int | None]],
+                 points: list[tuple[int, int]], point_count: int, free_cells: array, free_positions: array,
+                 game_over: bool, random_state: tuple) -> None:
+        self._rows = rows
+        self._cols = cols
+        self._snakes = snakes
+        self._points = points
+        self._point_count = point_count
+        self._free_cells = free_cells
+        self._free_positions = free_positions
+        self._game_over = game_over
+        self._random_state = random_state
+
+    def get_rows(self) -> int:
+        return self._rows
+
+    def get_columns(self) -> int:
+        return self._cols
+
+    def get_snakes(self) -> list[tuple[list[int], bytes, bool, bool, int | None]]:
+        return self._snakes
+
+    def get_points(self) -> list[tuple[int, int]]:
+        return self._points
+
+    def get_point_count(self) -> int:
+        """returns how many points the game keeps on the board"""
+        return self._point_count
+
+    def get_free_cells(self) -> array:
+        return self._free_cells
+
+    def get_free_positions(self) -> array:
+        return self._free_positions
+
+    def get_game_over(self) -> bool:
+        return self._game_over
+
+    def get_random_state(self) -> tuple:
+        return self._random_state
+
+
+def _restore_flags(game: 'SnakeGameState | CompactSnakeGameState', snapshot: 'SnakeGameSnapshot') -> None:
+    """Restores everything in the snapshot except for the board and the snake"""
+    game._free_cells.set_state(snapshot.get_free_cells(), snapshot.get_free_positions())
+    game._length = len(snapshot.get_snake())
+    game._game_over = snapshot.get_game_over()
+    game._still_growing = snapshot.get_still_growing()
+    game._point_eaten = snapshot.get_point_eaten()
+    game._already_turned = snapshot.get_already_turned()
+    game._next_move = None
+    if snapshot.get_next_move() is not None:
+        game._next_move = (game.turn_north, game.turn_east, game.turn_south,
+                           game.turn_west)[snapshot.get_next_move()]
+    game._random.setstate(snapshot.get_random_state())
+
+
+def _queued_turn(next_move: 'Callable[[], bool] | None') -> int | None:
+    """returns the index in "NESW" of a turn method queued as the next move"""
+    if next_move is None:
+        return None
+    return ("turn_north", "turn_east", "turn_south", "turn_west").index(next_move.__name__)
+
+
+def _parse_block(block: 'Block') -> str:
+    """Parses a block to a str of length one"""
+    # B = body, H = head, P = point
+    state = block.get_state()
+    if state == "B":
+        return "B"
+    elif state == "H":
+        return _HEAD_SYMBOLS[block.get_direction()]
+    elif state == "P":
+        return "P"
+    else:
+        return "."
+
+
+class BoardView:
+    """Read-only view of the board of a SnakeGameState. Nothing is copied, so it always shows the current
+    state of the game. The blocks it returns belong to the game and must not be changed."""
+    def __init__(self, board: list[list['Block']]) -> None:
+        self._board = board
+
+    def __iter__(self) -> Iterator[Iterator['Block']]:
+        """Iterates over the rows, each of which is an iterator over its blocks."""
+        return self.iter_rows()
+
+    def get_rows(self) -> int:
+        return len(self._board)
+
+    def get_columns(self) -> int:
+        return len(self._board[0])
+
+    def get_block(self, row: int, col: int) -> 'Block':
+        return self._board[row][col]
+
+    def get_state(self, row: int, col: int) -> str:
+        return self._board[row][col].get_state()
+
+    def get_symbol(self, row: int, col: int) -> str:
+        """returns the str of length one the shell draws for the block (see SnakeGameState.print_board)"""
+        return _parse_block(self._board[row][col])
+
+    def iter_row(self, row: int) -> Iterator['Block']:
+        return iter(self._board[row])
+
+    def iter_rows(self) -> Iterator[Iterator['Block']]:
+        for row in self._board:
+            yield iter(row)
+
+    def snapshot(self) -> list[list['Block']]:
+        """returns a copy of the board that won't change as the game goes on"""
+        return [[block.make_copy() for block in row] for row in self._board]
+
+
+class _FreeCellIndex:
+    """Keeps track of the empty cells of a board so that a random one can be picked in constant time.
+    Cells are stored as row * cols + col in an array, with a second array mapping each cell to its position
+    in the first one (or -1 if the cell is not empty).
+    The arrays are shared copy-on-write with snapshots: they are only copied by the first change after
+    copy_state or set_state, so taking a snapshot doesn't take time in proportion to the size of the board."""
+    def __init__(self, rows: int, cols: int) -> None:
+        self._cols = cols
+        self._cells = array('i', range(rows * cols))
+        self._positions = array('i', range(rows * cols))
+        # whether the arrays are shared with a snapshot, and have to be copied before they are changed
+        self._shared = False
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def __contains__(self, cell: tuple[int, int]) -> bool:
+        return self._positions[cell[0] * self._cols + cell[1]] != -1
+
+    def add(self, row: int, col: int) -> None:
+        """Marks the cell as empty"""
+        self.add_cell(row * self._cols + col)
+
+    def remove(self, row: int, col: int) -> None:
+        """Marks the cell as taken"""
+        self.remove_cell(row * self._cols + col)
+
+    def add_cell(self, cell: int) -> None:
+        """Marks the cell, given as row * cols + col, as empty"""
+        if self._positions[cell] == -1:
+            if self._shared:
+                self._unshare()
+            self._positions[cell] = len(self._cells)
+            self._cells.append(cell)
+
+    def remove_cell(self, cell: int) -> None:
+        """Marks the cell, given as row * cols + col, as taken by moving the last empty cell into its place"""
+        position = self._positions[cell]
+        if position == -1:
             return
+        if self._shared:
+            self._unshare()
+        last = self._cells.pop()
+        if last != cell:
+            self._cells[position] = last
+            self._positions[last] = position
+        self._positions[cell] = -1
 
+    def copy_state(self) -> tuple[array, array]:
+        """Returns the empty cells, in the order they are picked from, and their positions.
+        The arrays must not be changed, since they are shared until the index next changes."""
+        self._shared = True
+        return self._cells, self._positions
+
+    def set_state(self, cells: array, positions: array) -> None:
+        """replaces the empty cells and their positions with the given ones, which are shared the same way"""
+        self._cells = cells
+        self._positions = positions
+        self._shared = True
+
+    def choice(self, rng: random.Random) -> tuple[int, int]:
+        """Returns a uniformly random empty cell as (row, col) using rng. Raises IndexError if there is none."""
+        return divmod(rng.choice(self._cells), self._cols)
+
+    # protected class methods
+    def _unshare(self) -> None:
+        """copies the arrays, so they can be changed without changing a snapshot"""
+        self._cells = self._cells[:]
+        self._positions = self._positions[:]
+        self._shared = False
 
 
 class Block:
     """Class that represents a block of the snake as part of a singly linked list from tail to head.
     Can also be used to represent a Point for the snake to eat, or a blank space."""
+    __slots__ = ("_state", "_next", "_direction", "_row", "_col", "_previous_direction")
+
     def __init__(self, state: str = " ", next_value: 'Block | None' = None, direction: str | None = None,
                  row: int | None = None, col: int | None = None) -> None:
         """Initializes the attributes of a block. Only state is needed for a point or blank space.
@@ -244,6 +1172,18 @@ class Block:
         self._col = col
         self._previous_direction = direction
 
+    @classmethod
+    def _new_head(cls, direction: str, row: int, col: int) -> 'Block':
+        """Makes a new head for the snake without checking the state, for use in the game loop."""
+        head = cls.__new__(cls)
+        head._state = "H"
+        head._next = None
+        head._direction = direction
+        head._row = row
+        head._col = col
+        head._previous_direction = direction
+        return head
+
     def __eq__(self, other) -> bool:
         return (self._state == other.get_state() and self._next == other.get_next()
                 and self._direction == other.get_direction() and
@@ -295,3 +1235,26 @@ class Block:
 
     def make_copy(self) -> 'Block':
         return Block(state=self.get_state(), direction=self._direction, col=self._col, row=self._row, next_value=self._next)
+
+
+class _SharedBlock(Block):
+    """A block that is shared by every cell in the same state, so it can't be changed.
+    Used for blank spaces and points, which don't need a position or direction."""
+    __slots__ = ()
+
+    def set_next(self, next_block: 'Block | None') -> None:
+        raise AttributeError("shared blocks can't be changed")
+
+    def set_state(self, state: str) -> None:
+        raise AttributeError("shared blocks can't be changed")
+
+    def set_direction(self, direction: str) -> None:
+        raise AttributeError("shared blocks can't be changed")
+
+    def set_previous_direction(self, direction: str) -> None:
+        raise AttributeError("shared blocks can't be changed")
+
+
+# the blocks used by every blank space and point on a board
+EMPTY_BLOCK = _SharedBlock(" ")
+POINT_BLOCK = _SharedBlock("P")
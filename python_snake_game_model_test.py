@@ -3,6 +3,7 @@
 #
 # this is the unittesting for the python snake game model
 
+import random
 import unittest
 from python_snake_game_model import *
 
@@ -13,16 +14,304 @@ class TestSnakeGameState(unittest.TestCase):
         self._game = SnakeGameState()
 
     def test_new_game_starts_with_blank_board(self):
+        # the default board is 9x9, with the head of the snake in the middle going north
         correct_board = []
-        for i in range(10):
+        for i in range(9):
             correct_board.append([])
-            for j in range(10):
+            for j in range(9):
                 correct_board[i].append(" ")
         correct_board = _blockify(correct_board)
+        correct_board[4][4] = Block(state="H", direction="N", row=4, col=4)
 
-        for i in range(10):
-            for j in range(10):
-                self.assertEqual(correct_board[i][j], self._game.get_board()[i][j])
+        board = self._game.get_board()
+        self.assertEqual(9, len(board))
+        for i in range(9):
+            self.assertEqual(9, len(board[i]))
+            for j in range(9):
+                self.assertEqual(correct_board[i][j], board[i][j])
+
+    def test_free_cells_match_empty_blocks_while_playing(self):
+        random.seed(3)
+        game = SnakeGameState(6, 6)
+        turns = (game.turn_north, game.turn_east, game.turn_south, game.turn_west)
+        while not game.get_game_over():
+            random.choice(turns)()
+            game.progress_game()
+            if game.get_game_over():
+                break
+            board = game.get_board()
+            empty = {(i, j) for i in range(6) for j in range(6) if board[i][j].get_state() == " "}
+            self.assertEqual(len(empty), len(game._free_cells))
+            for cell in empty:
+                self.assertIn(cell, game._free_cells)
+
+    def test_board_view_follows_the_live_board_and_snapshot_does_not(self):
+        view = self._game.get_board_view()
+        snapshot = view.snapshot()
+        self._game.progress_game()
+        row, col = self._game.get_point_coordinates()
+        self.assertEqual("P", view.get_state(row, col))
+        self.assertEqual(" ", snapshot[row][col].get_state())
+        self.assertEqual(view.get_columns(), len(list(next(iter(view)))))
+        self.assertEqual(view.get_rows(), len(list(view)))
+
+    def test_board_view_symbols_match_the_printed_board(self):
+        self._game.progress_game()
+        self._game.turn_east()
+        self._game.progress_game()
+        view = self._game.get_board_view()
+        printed = self._game._prepare_print_board().split("\n")[1:-1]
+        self.assertEqual([line[2:-1:3] for line in printed],
+                         ["".join(view.get_symbol(row, col) for col in range(view.get_columns()))
+                          for row in range(view.get_rows())])
+        self.assertIn(">", printed[self._game.get_snake_head().get_row()])
+
+    def test_every_kind_of_game_has_its_size(self):
+        for game in (SnakeGameState(5, 7), CompactSnakeGameState(5, 7), MultiSnakeGameState(5, 7, 2)):
+            self.assertEqual((5, 7), (game.get_rows(), game.get_columns()))
+
+    def test_empty_cells_and_points_share_one_block(self):
+        self._game.progress_game()
+        view = self._game.get_board_view()
+        self.assertIs(POINT_BLOCK, view.get_block(*self._game.get_point_coordinates()))
+        self.assertIs(EMPTY_BLOCK, view.get_block(0, 0))
+        with self.assertRaises(AttributeError):
+            EMPTY_BLOCK.set_state("P")
+
+
+class TestCompactSnakeGameState(unittest.TestCase):
+    """Tests that the CompactSnakeGameState plays the same game as the SnakeGameState"""
+    def test_same_game_as_snake_game_state_for_the_same_seed(self):
+        for seed in range(20):
+            games = []
+            for game_class in (SnakeGameState, CompactSnakeGameState):
+                random.seed(seed)
+                games.append(_play_random_game(game_class(7, 8)))
+            self.assertEqual(games[0], games[1])
+
+
+class TestSnapshots(unittest.TestCase):
+    """Tests taking snapshots of games and restoring them"""
+    def test_restored_game_plays_the_same_as_the_original(self):
+        for game_class in (SnakeGameState, CompactSnakeGameState):
+            for seed in range(10):
+                game = game_class(7, 8, rng=random.Random(seed))
+                _play_towards_point(game, random.Random(seed), 6)
+                snapshot = game.snapshot()
+                turns = random.Random(seed + 100)
+                original = _play_towards_point(game, turns, 1000)
+
+                game.restore(snapshot)
+                self.assertEqual(original, _play_towards_point(game, random.Random(seed + 100), 1000))
+                copy = game_class.from_snapshot(snapshot)
+                self.assertEqual(original, _play_towards_point(copy, random.Random(seed + 100), 1000))
+
+    def test_snapshots_work_across_both_kinds_of_game(self):
+        game = SnakeGameState(7, 8, rng=random.Random(4))
+        _play_towards_point(game, random.Random(4), 10)
+        compact = CompactSnakeGameState.from_snapshot(game.snapshot())
+        self.assertEqual(game._prepare_print_board(), compact._prepare_print_board())
+        self.assertEqual(_play_towards_point(game, random.Random(5), 1000),
+                         _play_towards_point(compact, random.Random(5), 1000))
+
+    def test_snapshots_share_the_free_cells_until_the_game_changes(self):
+        game = SnakeGameState(30, 30, rng=random.Random(6))
+        _play_towards_point(game, random.Random(6), 20)
+        snapshot = game.snapshot()
+        free_cells = list(snapshot.get_free_cells())
+        self.assertIs(snapshot.get_free_cells(), game._free_cells._cells)
+        original = _play_towards_point(game, random.Random(7), 200)
+        self.assertEqual(free_cells, list(snapshot.get_free_cells()))
+        for _ in range(2):
+            game.restore(snapshot)
+            self.assertEqual(original, _play_towards_point(game, random.Random(7), 200))
+            self.assertEqual(free_cells, list(snapshot.get_free_cells()))
+
+    def test_snapshot_of_a_different_size_is_rejected(self):
+        with self.assertRaises(ValueError):
+            SnakeGameState(5, 5).restore(SnakeGameState(6, 6).snapshot())
+
+
+class TestMultiSnakeGameState(unittest.TestCase):
+    """Tests several snakes on one board"""
+    def test_one_snake_plays_the_same_as_snake_game_state(self):
+        # except that the snake is taken off the board when it crashes
+        for seed in range(10):
+            single = _play_towards_point(SnakeGameState(7, 9, rng=random.Random(seed)), random.Random(seed), 500)
+            multi = _play_towards_point(MultiSnakeGameState(7, 9, 1, rng=random.Random(seed)), random.Random(seed), 500)
+            self.assertEqual(single[:-1], multi[:-1])
+            self.assertEqual(len(single), len(multi))
+
+    def test_crashed_snakes_are_taken_off_the_board(self):
+        game = MultiSnakeGameState(9, 9, 3, rng=random.Random(2))
+        self.assertEqual([1, 4, 7], [game.get_snake_head(snake).get_column() for snake in range(3)])
+        game.turn_east(1)
+        for _ in range(3):
+            game.progress_game()
+        # snake 1 ran into snake 2, which is still going
+        self.assertTrue(game.get_crashed(1))
+        self.assertIsNone(game.get_snake_head(1))
+        self.assertFalse(game.get_crashed(2))
+        self.assertFalse(game.get_game_over())
+        states = [block.get_state() for row in game.get_board() for block in row]
+        self.assertEqual(game.get_snake_length(0) + game.get_snake_length(2), states.count("H") + states.count("B"))
+        self.assertEqual(states.count(" "), len(game._free_cells))
+        while not game.get_game_over():
+            game.progress_game()
+        self.assertTrue(all(game.get_crashed(snake) for snake in range(3)))
+
+    def test_snakes_moving_into_the_same_cell_both_crash(self):
+        for first, second in ((0, 1), (1, 0)):
+            game = MultiSnakeGameState(9, 9, 2)
+            # the turns are made in both orders, which mustn't matter
+            (game.turn_east, game.turn_west)[first](first)
+            (game.turn_east, game.turn_west)[second](second)
+            game.progress_game()
+            self.assertFalse(game.get_crashed(0) or game.get_crashed(1))
+            game.progress_game()
+            self.assertTrue(game.get_crashed(0) and game.get_crashed(1))
+            self.assertTrue(game.get_game_over())
+
+    def test_points_are_kept_up_and_the_occupants_match_the_board(self):
+        eaten = 0
+        for seed in range(5):
+            game = MultiSnakeGameState(12, 12, 4, rng=random.Random(seed), points=6)
+            self.assertEqual([], game.get_points())
+            while not game.get_game_over():
+                points = set(game.get_points())
+                for snake in range(4):
+                    head = game.get_snake_head(snake)
+                    if head is not None and len(points) > 0:
+                        # head for the first point
+                        row, col = game.get_point_coordinates()
+                        if row != head.get_row():
+                            game.turn_north(snake) if row < head.get_row() else game.turn_south(snake)
+                        else:
+                            game.turn_west(snake) if col < head.get_column() else game.turn_east(snake)
+                game.progress_game()
+                eaten += len(points - set(game.get_points()))
+                if not game.get_game_over():
+                    self.assertEqual(6, len(game.get_points()))
+                    self.assertEqual(game.get_points()[0], game.get_point_coordinates())
+                for row, blocks in enumerate(game.get_board()):
+                    for col, block in enumerate(blocks):
+                        self.assertEqual(block.get_state() in ("H", "B"), game.get_occupant(row, col) is not None)
+                        self.assertEqual(block.get_state() == "P", (row, col) in game.get_points())
+        self.assertGreater(eaten, 0)
+
+    def test_restored_game_plays_the_same_as_the_original(self):
+        for seed in range(10):
+            game = MultiSnakeGameState(10, 12, 4, rng=random.Random(seed), points=3)
+            _play_snakes(game, random.Random(seed), 8)
+            snapshot = game.snapshot()
+            original = _play_snakes(game, random.Random(seed + 100), 300)
+            for _ in range(2):
+                game.restore(snapshot)
+                self.assertEqual(original, _play_snakes(game, random.Random(seed + 100), 300))
+            copy = MultiSnakeGameState.from_snapshot(snapshot)
+            self.assertEqual(original, _play_snakes(copy, random.Random(seed + 100), 300))
+        with self.assertRaises(TypeError):
+            game.restore(SnakeGameState(10, 12).snapshot())
+
+
+class TestNextBlockLocation(unittest.TestCase):
+    """Tests that the delta tables and occupancy array find the same next block as comparing direction letters
+    and block states did. How fast that is is measured by the benchmark suite (python_snake_game_benchmark)."""
+    def test_next_block_location_matches_comparing_strings(self):
+        for seed in range(10):
+            game = SnakeGameState(7, 8, rng=random.Random(seed))
+            turn_random = random.Random(seed)
+            turns = (game.turn_north, game.turn_east, game.turn_south, game.turn_west)
+            while not game.get_game_over():
+                if turn_random.random() < 0.3:
+                    turn_random.choice(turns)()
+                expected = _string_next_block_location(game), game.get_game_over()
+                game._game_over = False
+                self.assertEqual(expected, (game._calculate_next_block_location(), game.get_game_over()))
+                game._game_over = False
+                game.progress_game()
+
+
+def _string_next_block_location(game: SnakeGameState) -> tuple[int, int]:
+    """How SnakeGameState used to work out the next block, comparing direction letters and block states"""
+    direction = game._snake_head.get_direction()
+    row, col = -1, -1
+    if direction == "N" or direction == "S":
+        if direction == "N":
+            row = game._snake_head.get_row() - 1
+        else:
+            row = game._snake_head.get_row() + 1
+        col = game._snake_head.get_column()
+    elif direction == "E" or direction == "W":
+        if direction == "E":
+            col = game._snake_head.get_column() + 1
+        else:
+            col = game._snake_head.get_column() - 1
+        row = game._snake_head.get_row()
+    if not(0 <= row < len(game._board)) or not(0 <= col < len(game._board[0])):
+        game._game_over = True
+    elif game._board[row][col].get_state() == "B" or game._board[row][col].get_state() == "H":
+        game._game_over = True
+    return row, col
+
+
+def _play_towards_point(game: SnakeGameState | CompactSnakeGameState, turn_random: random.Random,
+                        steps: int) -> list[str]:
+    """Plays up to steps steps heading for the point, turning randomly now and then,
+    and returns what the board looked like after every step"""
+    history = []
+    for _ in range(steps):
+        if game.get_game_over():
+            break
+        head = game.get_snake_head()
+        point = game.get_point_coordinates()
+        if point is not None and turn_random.random() < 0.8:
+            if point[0] != head.get_row():
+                game.turn_north() if point[0] < head.get_row() else game.turn_south()
+            else:
+                game.turn_west() if point[1] < head.get_column() else game.turn_east()
+        else:
+            turn_random.choice((game.turn_north, game.turn_east, game.turn_south, game.turn_west))()
+        game.progress_game()
+        history.append(game._prepare_print_board())
+    return history
+
+
+def _play_snakes(game: MultiSnakeGameState, turn_random: random.Random, steps: int) -> list:
+    """Plays up to steps steps turning snakes away from the walls, and randomly now and then (sometimes twice,
+    to queue a turn), and returns what the board and the snakes looked like after every step"""
+    history = []
+    for _ in range(steps):
+        if game.get_game_over():
+            break
+        for snake in range(game.get_snake_count()):
+            head = game.get_snake_head(snake)
+            if head is None:
+                continue
+            if head.get_row() in (0, game.get_rows() - 1) or head.get_column() in (0, game.get_columns() - 1):
+                game.turn_east(snake) if head.get_column() < game.get_columns() // 2 else game.turn_west(snake)
+                game.turn_south(snake) if head.get_row() < game.get_rows() // 2 else game.turn_north(snake)
+            for _ in range(turn_random.choice((0, 0, 0, 0, 1, 2))):
+                turn_random.choice((game.turn_north, game.turn_east, game.turn_south, game.turn_west))(snake)
+        game.progress_game()
+        history.append((game._prepare_print_board(), game.get_points(),
+                        [(game.get_crashed(snake), game.get_snake_length(snake))
+                         for snake in range(game.get_snake_count())]))
+    return history
+
+
+def _play_random_game(game: SnakeGameState | CompactSnakeGameState) -> list:
+    """Plays a game with random turns and returns what the board looked like after every step"""
+    history = []
+    moves = ("turn_north", "turn_east", "turn_south", "turn_west")
+    turn_random = random.Random(1)
+    while not game.get_game_over():
+        for _ in range(turn_random.randrange(3)):
+            getattr(game, turn_random.choice(moves))()
+        game.progress_game()
+        board = [[(block.get_state(), block.get_direction()) for block in row] for row in game.get_board()]
+        history.append((board, game.get_snake_length(), game.get_point_coordinates(), game._prepare_print_board()))
+    return history
 
 
 def _blockify(board: list[list[str]]) -> list[list[Block]]:
@@ -0,0 +1,98 @@
+# python_snake_game_profiler.py
+# author: Robin Jiang
+#
+# this module times the stages of every frame of the game, so that it can be seen where the time goes when
+# frames are dropped. It keeps the times of the last few hundred frames for percentiles, and optionally the
+# times of every frame to be saved as CSV.
+
+import csv
+import time
+from collections import deque
+from collections.abc import Callable
+
+# stages of a frame, in the order they happen
+STAGES = ("events", "model", "board", "snake", "text", "flip")
+
+# how many frames the percentiles are worked out over by default
+WINDOW = 300
+
+
+class FrameProfiler:
+    """Times the stages of each frame. Functions are timed by wrapping them with wrap(). Stages are timed
+    exclusively: if a timed function calls another timed function, the time spent in the inner one only
+    counts towards the inner one's stage."""
+    def __init__(self, window: int = WINDOW, keep_history: bool = False) -> None:
+        """window is how many frames the percentiles are worked out over.
+        If keep_history is True, the times of every frame are kept for write_csv."""
+        self._windows = {stage: deque(maxlen=window) for stage in ("frame",) + STAGES}
+        self._history = [] if keep_history else None
+        # time of each stage in the current frame, and when the frame started
+        self._frame = dict.fromkeys(STAGES, 0.0)
+        self._frame_start = None
+        # for each timed function that is running, the time spent in timed functions it called
+        self._stack = []
+
+    def wrap(self, stage: str, function: Callable) -> Callable:
+        """returns a function that does the same as function and adds the time it takes to the stage"""
+        if stage not in self._frame:
+            raise ValueError(f"{stage} is not one of {STAGES}")
+        frame = self._frame
+        stack = self._stack
+        perf_counter = time.perf_counter
+
+        def timed(*args, **kwargs):
+            stack.append(0.0)
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                frame[stage] += elapsed - stack.pop()
+                if len(stack) > 0:
+                    stack[-1] += elapsed
+        return timed
+
+    def start_frame(self) -> None:
+        for stage in STAGES:
+            self._frame[stage] = 0.0
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self) -> None:
+        """Adds the times of the frame that just ended to the windows (and history), in milliseconds"""
+        if self._frame_start is None:
+            return
+        frame_time = (time.perf_counter() - self._frame_start) * 1000
+        self._frame_start = None
+        self._windows["frame"].append(frame_time)
+        times = [frame_time]
+        for stage in STAGES:
+            self._windows[stage].append(self._frame[stage] * 1000)
+            times.append(self._frame[stage] * 1000)
+        if self._history is not None:
+            self._history.append(times)
+
+    def get_frame_count(self) -> int:
+        """returns how many frames are in the window"""
+        return len(self._windows["frame"])
+
+    def get_percentiles(self, stage: str = "frame") -> tuple[float, float, float]:
+        """returns the 50th, 95th and 99th percentile milliseconds of the stage (or the whole frame)
+        over the window, or zeroes if no frames have been timed"""
+        times = sorted(self._windows[stage])
+        if len(times) == 0:
+            return 0.0, 0.0, 0.0
+        return tuple(times[min(len(times) - 1, int(len(times) * fraction))] for fraction in (0.5, 0.95, 0.99))
+
+    def get_summary(self) -> dict[str, tuple[float, float, float]]:
+        """returns the percentiles of the whole frame and of every stage"""
+        return {stage: self.get_percentiles(stage) for stage in ("frame",) + STAGES}
+
+    def write_csv(self, path: str) -> None:
+        """Saves the milliseconds of every frame, one row per frame. Needs keep_history."""
+        if self._history is None:
+            raise ValueError("the profiler wasn't made with keep_history, so there are no frames to save")
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame", "frame_ms"] + [f"{stage}_ms" for stage in STAGES])
+            for frame, times in enumerate(self._history):
+                writer.writerow([frame] + [f"{value:.4f}" for value in times])
@@ -0,0 +1,62 @@
+# python_snake_game_profiler_test.py
+# author: Robin Jiang
+#
+# this is the unittesting for the frame profiler
+
+import csv
+import os
+import tempfile
+import time
+import unittest
+from python_snake_game_profiler import *
+
+
+class TestFrameProfiler(unittest.TestCase):
+    """Tests the times of the stages and what is worked out from them"""
+    def test_nested_stages_are_not_counted_twice(self):
+        profiler = FrameProfiler(keep_history=True)
+        text = profiler.wrap("text", lambda: time.sleep(0.02))
+
+        def draw_board():
+            time.sleep(0.01)
+            text()
+        board = profiler.wrap("board", draw_board)
+        profiler.start_frame()
+        board()
+        profiler.end_frame()
+        summary = profiler.get_summary()
+        self.assertLess(summary["board"][0], 15)
+        self.assertGreaterEqual(summary["text"][0], 20)
+        self.assertGreaterEqual(summary["frame"][0], summary["board"][0] + summary["text"][0])
+        self.assertEqual(0.0, summary["flip"][0])
+        with self.assertRaises(ValueError):
+            profiler.wrap("sound", draw_board)
+
+    def test_percentiles_are_over_the_window(self):
+        profiler = FrameProfiler(window=100)
+        self.assertEqual((0.0, 0.0, 0.0), profiler.get_percentiles())
+        for milliseconds in range(200):
+            profiler.start_frame()
+            profiler._frame["model"] = milliseconds / 1000
+            profiler.end_frame()
+        self.assertEqual(100, profiler.get_frame_count())
+        self.assertEqual((150.0, 195.0, 199.0), tuple(round(p) for p in profiler.get_percentiles("model")))
+
+    def test_every_frame_is_saved_as_csv(self):
+        profiler = FrameProfiler(window=10, keep_history=True)
+        for _ in range(25):
+            profiler.start_frame()
+            profiler.end_frame()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "frames.csv")
+            profiler.write_csv(path)
+            with open(path, newline="") as file:
+                rows = list(csv.reader(file))
+        self.assertEqual(["frame", "frame_ms"] + [f"{stage}_ms" for stage in STAGES], rows[0])
+        self.assertEqual(26, len(rows))
+        with self.assertRaises(ValueError):
+            FrameProfiler().write_csv("frames.csv")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+# python_snake_game_replay.py
+# author: Robin Jiang
+#
+# this module records snake games as compact binary replays and plays them back.
+#
+# a replay is a header followed by one byte per step:
+#   header: b"SNKR", format version (1 byte), rows (2 bytes), columns (2 bytes), seed (8 bytes), big endian
+#   step:   the turns made before progress_game was called. the low 4 bits are the first turn and the high
+#           4 bits are the second, each 0 for none or 1-4 for N, E, S, W. only turns that did something are
+#           recorded, and there can be at most two of them: one turn, and one queued for after the step.
+# a game is rebuilt by making a new game with random.Random(seed) and repeating the turns and steps.
+
+import random
+import struct
+from collections.abc import Iterator
+from typing import BinaryIO
+
+import python_snake_game_model
+
+MAGIC = b"SNKR"
+VERSION = 1
+HEADER = struct.Struct(">4sBHHQ")
+
+# code of each turn in a step byte
+TURN_CODES = {"N": 1, "E": 2, "S": 3, "W": 4}
+
+# the turns of every possible step byte
+STEP_TURNS = tuple(tuple("NESW"[code - 1] for code in (byte & 0xF, byte >> 4) if 1 <= code <= 4)
+                   for byte in range(256))
+
+# how many step bytes the writer keeps before writing them to the file
+_BUFFER_SIZE = 4096
+
+
+class ReplayFormatError(Exception):
+    """For if a file is not a replay this module can read"""
+    pass
+
+
+class ReplayWriter:
+    """Writes a replay to a binary file, one step at a time. The steps are buffered in memory,
+    so recording a step only appends a byte."""
+    def __init__(self, file: BinaryIO, rows: int, cols: int, seed: int) -> None:
+        self._file = file
+        self._buffer = bytearray()
+        self._step = 0
+        self._turns = 0
+        self._file.write(HEADER.pack(MAGIC, VERSION, rows, cols, seed))
+
+    def record_turn(self, direction: str) -> None:
+        """Records a turn that did something to the game before the next step"""
+        if self._turns == 0:
+            self._step = TURN_CODES[direction]
+            self._turns = 1
+        elif self._turns == 1:
+            self._step |= TURN_CODES[direction] << 4
+            self._turns = 2
+
+    def record_step(self) -> None:
+        """Records that progress_game was called, along with the turns since the last step"""
+        self._buffer.append(self._step)
+        self._step = 0
+        self._turns = 0
+        if len(self._buffer) >= _BUFFER_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        self._file.write(self._buffer)
+        self._buffer.clear()
+        self._file.flush()
+
+    def close(self) -> None:
+        """Writes what is left and closes the file"""
+        self.flush()
+        self._file.close()
+
+
+class ReplayRecorder:
+    """Plays a game while recording it. Turns and steps go through the recorder instead of the game."""
+    def __init__(self, file: BinaryIO, rows: int = 9, cols: int = 9, seed: int | None = None,
+                 game_class: type = python_snake_game_model.SnakeGameState) -> None:
+        if seed is None:
+            seed = random.getrandbits(64)
+        self._game = new_game(rows, cols, seed, game_class)
+        self._writer = ReplayWriter(file, rows, cols, seed)
+        self._turns = {"N": self._game.turn_north, "E": self._game.turn_east,
+                       "S": self._game.turn_south, "W": self._game.turn_west}
+
+    def get_game(self) -> 'python_snake_game_model.SnakeGameState':
+        return self._game
+
+    def turn(self, direction: str) -> bool:
+        """turns the snake in the direction ("N", "E", "S", "W") and records it if it did something"""
+        if self._turns[direction]():
+            self._writer.record_turn(direction)
+            return True
+        return False
+
+    def progress_game(self) -> None:
+        self._game.progress_game()
+        self._writer.record_step()
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+class ReplayReader:
+    """Reads a replay from a binary file. The steps are read as they are needed."""
+    def __init__(self, file: BinaryIO) -> None:
+        self._file = file
+        header = file.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise ReplayFormatError("the file is too short to be a replay")
+        magic, version, self._rows, self._cols, self._seed = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ReplayFormatError("the file is not a replay")
+        if version != VERSION:
+            raise ReplayFormatError(f"replay format version {version} is not supported")
+
+    def __iter__(self) -> Iterator[tuple[str, ...]]:
+        """Iterates over the steps, each of which is a tuple of the turns made before it"""
+        while True:
+            chunk = self._file.read(_BUFFER_SIZE)
+            if len(chunk) == 0:
+                return
+            for byte in chunk:
+                yield STEP_TURNS[byte]
+
+    def get_rows(self) -> int:
+        return self._rows
+
+    def get_columns(self) -> int:
+        return self._cols
+
+    def get_seed(self) -> int:
+        return self._seed
+
+    def iter_games(self, game_class: type = python_snake_game_model.SnakeGameState
+                   ) -> Iterator['python_snake_game_model.SnakeGameState']:
+        """Plays the replay back, yielding the game after every step. The same game is yielded every time."""
+        game = new_game(self._rows, self._cols, self._seed, game_class)
+        for turns in self:
+            apply_step(game, turns)
+            yield game
+
+    def replay(self, steps: int | None = None, game_class: type = python_snake_game_model.SnakeGameState
+               ) -> 'python_snake_game_model.SnakeGameState':
+        """Returns the game after the given number of steps, or at the end of the replay"""
+        game = new_game(self._rows, self._cols, self._seed, game_class)
+        if steps == 0:
+            return game
+        for step, game in enumerate(self.iter_games(game_class), 1):
+            if step == steps:
+                break
+        return game
+
+
+def new_game(rows: int, cols: int, seed: int, game_class: type = python_snake_game_model.SnakeGameState
+             ) -> 'python_snake_game_model.SnakeGameState':
+    """Makes the game a replay with this header starts from"""
+    return game_class(rows, cols, rng=random.Random(seed))
+
+
+def apply_step(game: 'python_snake_game_model.SnakeGameState', turns: tuple[str, ...]) -> None:
+    """Makes the turns of one step of a replay and moves the game forward"""
+    for direction in turns:
+        if direction == "N":
+            game.turn_north()
+        elif direction == "E":
+            game.turn_east()
+        elif direction == "S":
+            game.turn_south()
+        else:
+            game.turn_west()
+    game.progress_game()
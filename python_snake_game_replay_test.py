@@ -0,0 +1,52 @@
+# python_snake_game_replay_test.py
+# author: Robin Jiang
+#
+# this is the unittesting for recording and playing back replays
+
+import io
+import random
+import unittest
+from python_snake_game_replay import *
+
+
+class TestReplay(unittest.TestCase):
+    """Tests that replays rebuild the games they recorded"""
+    def test_replay_rebuilds_every_step_of_the_game(self):
+        for seed in range(10):
+            file = io.BytesIO()
+            recorder = ReplayRecorder(file, 7, 8, seed=seed)
+            game = recorder.get_game()
+            history = []
+            turn_random = random.Random(seed)
+            while not game.get_game_over():
+                for _ in range(turn_random.randrange(4)):
+                    recorder.turn(turn_random.choice("NESW"))
+                recorder.progress_game()
+                history.append(game._prepare_print_board())
+            recorder._writer.flush()
+
+            self.assertEqual(HEADER.size + len(history), len(file.getvalue()))
+            reader = ReplayReader(io.BytesIO(file.getvalue()))
+            self.assertEqual((7, 8, seed), (reader.get_rows(), reader.get_columns(), reader.get_seed()))
+            replayed = [replayed_game._prepare_print_board() for replayed_game in reader.iter_games()]
+            self.assertEqual(history, replayed)
+
+    def test_replay_stops_at_the_given_step(self):
+        file = io.BytesIO()
+        recorder = ReplayRecorder(file, 9, 9, seed=1)
+        recorder.turn("E")
+        for _ in range(3):
+            recorder.progress_game()
+        board = recorder.get_game()._prepare_print_board()
+        recorder.progress_game()
+        recorder._writer.flush()
+        game = ReplayReader(io.BytesIO(file.getvalue())).replay(3)
+        self.assertEqual(board, game._prepare_print_board())
+
+    def test_other_files_are_not_replays(self):
+        with self.assertRaises(ReplayFormatError):
+            ReplayReader(io.BytesIO(b"not a replay at all"))
+
+
+if __name__ == "__main__":
+    unittest.main()
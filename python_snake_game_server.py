@@ -0,0 +1,337 @@
+# python_snake_game_server.py
+# author: Robin Jiang
+#
+# this module hosts multiplayer snake games over TCP. The server runs many rooms on one asyncio event loop,
+# each with its own MultiSnakeGameState, which is the only copy of the game that counts: clients just send
+# which way they want to turn, and are sent what changed on the board after every tick.
+#
+# every message is a frame: a 4 byte big-endian length, then that many bytes, the first of which is the type.
+#   client to server: JOIN + room name (utf-8), then TURN + direction (NORTH, EAST, SOUTH or WEST)
+#   server to client: WELCOME + snake index, rows, cols and number of snakes, then after every tick
+#                     a KEYFRAME or DELTA of the board (see python_snake_game_delta).
+#                     ERROR + a message (utf-8) if the client can't join, before the connection is closed.
+# a client is sent a keyframe after joining, after being skipped for being too slow, and every KEYFRAME_INTERVAL
+# ticks. Otherwise it is sent a delta.
+# when a room's game is over, a new one starts on the next tick, with every client keeping its snake.
+
+import argparse
+import asyncio
+import logging
+import struct
+
+import python_snake_game_model
+from python_snake_game_model import NORTH, EAST, SOUTH, WEST
+from python_snake_game_delta import MAX_SNAKES, BoardDecoder, encode_delta, encode_keyframe
+
+# message types, from the client and from the server
+# (the server also sends KEYFRAME and DELTA messages, which are 2 and 4)
+JOIN, TURN = 1, 2
+WELCOME, ERROR = 1, 3
+
+TICK_RATE = 6
+KEYFRAME_INTERVAL = 60
+ROWS = 20
+COLUMNS = 20
+SNAKES_PER_ROOM = 4
+POINTS_PER_ROOM = 1
+
+# a client that has this many bytes waiting to be sent is too slow, and is skipped until it catches up
+MAX_BUFFERED_BYTES = 1 << 16
+
+# the longest frame a client can send (a JOIN with a long room name), so that a client can't make the server
+# wait for gigabytes by sending a big length
+MAX_FRAME_BYTES = 1 << 10
+
+_logger = logging.getLogger(__name__)
+
+_LENGTH = struct.Struct(">I")
+_WELCOME = struct.Struct(">BBHHB")
+
+
+class ProtocolError(Exception):
+    """For if a client or server sends a message that doesn't follow the protocol"""
+    pass
+
+
+class Room:
+    """One game and the clients playing it. Client i plays snake i."""
+    def __init__(self, name: str, rows: int, cols: int, snakes: int, points: int = POINTS_PER_ROOM) -> None:
+        """Raises ValueError if the snakes don't fit on the board or in the boards sent to the clients"""
+        _require_snakes_fit(snakes, cols)
+        self._name = name
+        self._rows = rows
+        self._cols = cols
+        self._points = points
+        self._game = python_snake_game_model.MultiSnakeGameState(rows, cols, snakes, record_changes=True,
+                                                                 points=points)
+        self._clients: list[asyncio.StreamWriter | None] = [None] * snakes
+        # whether each client has to be sent a keyframe, because it can't follow a delta
+        self._needs_keyframe = [True] * snakes
+        self._tick = 0
+
+    def join(self, writer: asyncio.StreamWriter) -> int | None:
+        """Gives the client the first snake nobody plays, and returns its index (or None if the room is full)"""
+        for index, client in enumerate(self._clients):
+            if client is None:
+                self._clients[index] = writer
+                self._needs_keyframe[index] = True
+                return index
+        return None
+
+    def leave(self, snake: int) -> None:
+        self._clients[snake] = None
+
+    def turn(self, snake: int, direction: int) -> None:
+        """turns the snake, if it can turn that way"""
+        game = self._game
+        (game.turn_north, game.turn_east, game.turn_south, game.turn_west)[direction](snake)
+
+    def tick(self) -> None:
+        """Moves the game on by one tick (starting a new game if the last one is over), then sends what changed
+        to every client. The delta and the keyframe are each made at most once, and each client gets one write."""
+        self._tick += 1
+        delta = None
+        keyframe = None
+        if self._game.get_game_over():
+            self._game = python_snake_game_model.MultiSnakeGameState(self._rows, self._cols, len(self._clients),
+                                                                     record_changes=True, points=self._points)
+        else:
+            self._game.progress_game()
+            if self._tick % KEYFRAME_INTERVAL != 0:
+                delta = _frame(encode_delta(self._game.get_changes(), self._tick, self._rows, self._cols))
+        for index, writer in enumerate(self._clients):
+            if writer is None:
+                continue
+            if writer.transport.get_write_buffer_size() >= MAX_BUFFERED_BYTES:
+                # the client will have missed this delta, so it needs a keyframe once it catches up
+                self._needs_keyframe[index] = True
+            elif delta is not None and not self._needs_keyframe[index]:
+                writer.write(delta)
+            else:
+                if keyframe is None:
+                    keyframe = _frame(encode_keyframe(self._game, self._tick))
+                writer.write(keyframe)
+                self._needs_keyframe[index] = False
+
+    def close(self) -> None:
+        """closes the connection of every client in the room"""
+        for writer in self._clients:
+            if writer is not None:
+                writer.close()
+
+    def get_name(self) -> str:
+        return self._name
+
+    def get_game(self) -> 'python_snake_game_model.MultiSnakeGameState':
+        return self._game
+
+    def get_client_count(self) -> int:
+        return sum(client is not None for client in self._clients)
+
+
+class SnakeServer:
+    """Hosts rooms of multiplayer snake. A room is made when the first client joins it and
+    thrown away when the last one leaves. Every room is ticked by one task, tick_rate times a second."""
+    def __init__(self, rows: int = ROWS, cols: int = COLUMNS, snakes_per_room: int = SNAKES_PER_ROOM,
+                 tick_rate: float = TICK_RATE, points_per_room: int = POINTS_PER_ROOM) -> None:
+        """Raises ValueError if the snakes of a room don't fit on the board or in the boards sent to the clients,
+        so that the server fails here instead of when the first client joins"""
+        _require_snakes_fit(snakes_per_room, cols)
+        self._rows = rows
+        self._cols = cols
+        self._snakes_per_room = snakes_per_room
+        self._points_per_room = points_per_room
+        self._tick_rate = tick_rate
+        self._rooms: dict[str, Room] = {}
+        self._server = None
+        self._ticker = None
+        # the task and connection of every connected client
+        self._handlers: dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Starts listening and ticking. With port 0 a free port is picked, see get_port."""
+        self._server = await asyncio.start_server(self._handle_client, host, port)
+        self._ticker = asyncio.create_task(self._tick_rooms())
+
+    async def close(self) -> None:
+        """Stops ticking, closes every connection and stops listening"""
+        self._ticker.cancel()
+        self._server.close()
+        # closing the connections ends the clients' tasks
+        for writer in self._handlers.values():
+            writer.close()
+        await asyncio.gather(*self._handlers)
+        await self._server.wait_closed()
+
+    def get_port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    def get_rooms(self) -> dict[str, Room]:
+        return self._rooms
+
+    def tick(self) -> None:
+        """Ticks every room once. A room that fails to tick is logged and closed, so that the others go on."""
+        for name, room in list(self._rooms.items()):
+            try:
+                room.tick()
+            except Exception:
+                _logger.exception("room %r failed to tick and was closed", name)
+                del self._rooms[name]
+                room.close()
+
+    # protected class methods
+    async def _tick_rooms(self) -> None:
+        """Ticks every room tick_rate times a second. Ticks are scheduled from when the first one was,
+        so that a slow tick doesn't make the rest late."""
+        loop = asyncio.get_running_loop()
+        interval = 1 / self._tick_rate
+        next_tick = loop.time() + interval
+        while True:
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            self.tick()
+            next_tick += interval
+            if next_tick < loop.time():
+                # too far behind to catch up, so skip the ticks that were missed
+                next_tick = loop.time() + interval
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Puts the client in the room it asks for, then turns its snake whenever it asks to"""
+        room = None
+        snake = None
+        self._handlers[asyncio.current_task()] = writer
+        try:
+            message = await read_frame(reader)
+            if message[0] != JOIN:
+                raise ProtocolError("the first message must be JOIN")
+            name = message[1:].decode()
+            room = self._rooms.get(name)
+            if room is None:
+                room = Room(name, self._rows, self._cols, self._snakes_per_room, self._points_per_room)
+                self._rooms[name] = room
+            snake = room.join(writer)
+            if snake is None:
+                writer.write(_frame(bytes([ERROR]) + b"the room is full"))
+                return
+            writer.write(_frame(_WELCOME.pack(WELCOME, snake, self._rows, self._cols, self._snakes_per_room)))
+            while True:
+                message = await read_frame(reader)
+                if message[0] != TURN or len(message) != 2 or message[1] not in (NORTH, EAST, SOUTH, WEST):
+                    raise ProtocolError("only TURN messages can be sent after joining")
+                room.turn(snake, message[1])
+        except (asyncio.IncompleteReadError, ConnectionError, ProtocolError, UnicodeDecodeError):
+            pass
+        finally:
+            if snake is not None:
+                room.leave(snake)
+                if room.get_client_count() == 0 and self._rooms.get(room.get_name()) is room:
+                    del self._rooms[room.get_name()]
+            writer.close()
+            del self._handlers[asyncio.current_task()]
+
+
+class SnakeClient:
+    """A client for the server, used to stand in for a real one. Open one with SnakeClient.connect."""
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, snake: int, rows: int, cols: int,
+                 snakes: int) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._snake = snake
+        self._rows = rows
+        self._cols = cols
+        self._snakes = snakes
+        self._decoder = BoardDecoder(rows, cols)
+        # a delta can change every cell, which takes up to 5 bytes a cell
+        self._max_frame_size = MAX_FRAME_BYTES + 5 * rows * cols
+
+    @classmethod
+    async def connect(cls, host: str, port: int, room: str) -> 'SnakeClient':
+        """Connects to the server and joins the room. Raises ProtocolError if it can't join."""
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(_frame(bytes([JOIN]) + room.encode()))
+        message = await read_frame(reader)
+        if message[0] != WELCOME:
+            writer.close()
+            raise ProtocolError(message[1:].decode(errors="replace"))
+        _, snake, rows, cols, snakes = _WELCOME.unpack(message)
+        return cls(reader, writer, snake, rows, cols, snakes)
+
+    def turn(self, direction: int) -> None:
+        """asks the server to turn the snake NORTH, EAST, SOUTH or WEST"""
+        self._writer.write(_frame(bytes((TURN, direction))))
+
+    async def read_state(self) -> tuple[int, bool, bytes]:
+        """Waits for what changed in the next tick, and returns the tick, whether the game is over and a copy of
+        the board (one byte per cell, see python_snake_game_delta). Raises DeltaError if the changes don't fit."""
+        tick, game_over = self._decoder.apply(await read_frame(self._reader, self._max_frame_size))
+        return tick, game_over, bytes(self._decoder.get_board())
+
+    async def close(self) -> None:
+        self._writer.close()
+        await self._writer.wait_closed()
+
+    def get_snake(self) -> int:
+        return self._snake
+
+    def get_rows(self) -> int:
+        return self._rows
+
+    def get_columns(self) -> int:
+        return self._cols
+
+    def get_snake_count(self) -> int:
+        return self._snakes
+
+
+async def read_frame(reader: asyncio.StreamReader, max_size: int = MAX_FRAME_BYTES) -> bytes:
+    """Reads one frame and returns what is in it. Raises ProtocolError if it is empty or longer than max_size,
+    before reading what is in it."""
+    length, = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+    if length == 0:
+        raise ProtocolError("empty frame")
+    if length > max_size:
+        raise ProtocolError(f"a frame of {length} bytes is longer than the limit of {max_size}")
+    return await reader.readexactly(length)
+
+
+def _frame(payload: bytes) -> bytes:
+    return _LENGTH.pack(len(payload)) + payload
+
+
+def _require_snakes_fit(snakes: int, cols: int) -> None:
+    """Raises ValueError if the snakes don't fit in the cells of a board sent to the clients, or can't all start
+    on the board (each snake starts in its own column)"""
+    if snakes > MAX_SNAKES:
+        raise ValueError(f"a room can have at most {MAX_SNAKES} snakes, not {snakes}")
+    if not 1 <= snakes <= cols:
+        raise ValueError(f"a room must have at least one snake and at most one snake per column ({cols}), "
+                         f"not {snakes}")
+
+
+async def _serve(host: str, port: int, rows: int, cols: int, snakes: int, tick_rate: float, points: int) -> None:
+    server = SnakeServer(rows, cols, snakes, tick_rate, points)
+    await server.start(host, port)
+    print(f"serving snake on {host}:{server.get_port()}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hosts multiplayer snake games")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--rows", type=int, default=ROWS)
+    parser.add_argument("--cols", type=int, default=COLUMNS)
+    parser.add_argument("--snakes", type=int, default=SNAKES_PER_ROOM, help="snakes (players) per room")
+    parser.add_argument("--tick-rate", type=float, default=TICK_RATE)
+    parser.add_argument("--points", type=int, default=POINTS_PER_ROOM, help="points on the board at once")
+    args = parser.parse_args()
+    try:
+        _require_snakes_fit(args.snakes, args.cols)
+    except ValueError as error:
+        parser.error(f"--snakes: {error}")
+    try:
+        asyncio.run(_serve(args.host, args.port, args.rows, args.cols, args.snakes, args.tick_rate, args.points))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,138 @@
+# python_snake_game_server_test.py
+# author: Robin Jiang
+#
+# this is the unittesting for the multiplayer server, played with stand-in clients
+
+import asyncio
+import struct
+import unittest
+from python_snake_game_delta import MAX_SNAKES, POINT_CELL, SNAKE_CELLS, encode_board
+from python_snake_game_server import *
+
+
+class TestSnakeServer(unittest.IsolatedAsyncioTestCase):
+    """Tests rooms, turning and the boards sent after each tick"""
+    async def asyncSetUp(self):
+        self._server = SnakeServer(rows=9, cols=9, snakes_per_room=2, tick_rate=1000)
+        await self._server.start()
+        # tick by hand, so that the test decides when the game moves
+        self._server._ticker.cancel()
+
+    async def asyncTearDown(self):
+        await self._server.close()
+
+    async def _connect(self, room: str) -> SnakeClient:
+        return await SnakeClient.connect("127.0.0.1", self._server.get_port(), room)
+
+    async def test_clients_in_a_room_play_the_same_game(self):
+        first = await self._connect("a")
+        second = await self._connect("a")
+        other = await self._connect("b")
+        self.assertEqual((0, 1, 0), (first.get_snake(), second.get_snake(), other.get_snake()))
+        self.assertEqual((9, 9, 2), (first.get_rows(), first.get_columns(), first.get_snake_count()))
+        with self.assertRaises(ProtocolError):
+            await self._connect("a")
+
+        first.turn(EAST)
+        await asyncio.sleep(0.05)
+        self._server.tick()
+        states = [await client.read_state() for client in (first, second)]
+        self.assertEqual(states[0], states[1])
+        tick, game_over, board = states[0]
+        self.assertEqual((1, False), (tick, game_over))
+        self.assertEqual(encode_board(self._server.get_rooms()["a"].get_game()), board)
+        # snake 0 started at (4, 2) and went east, snake 1 started at (4, 6) and went north
+        self.assertEqual(SNAKE_CELLS, board[4 * 9 + 3])
+        self.assertEqual(SNAKE_CELLS + 3, board[4 * 9 + 6])
+        self.assertEqual(SNAKE_CELLS + 2, board[3 * 9 + 6])
+        self.assertEqual(1, board.count(POINT_CELL))
+        self.assertEqual((1, False), (await other.read_state())[:2])
+        for client in (first, second, other):
+            await client.close()
+
+    async def test_a_client_joining_late_gets_the_whole_board(self):
+        first = await self._connect("a")
+        for _ in range(5):
+            self._server.tick()
+            await first.read_state()
+        second = await self._connect("a")
+        for _ in range(3):
+            self._server.tick()
+            state = await second.read_state()
+            self.assertEqual(await first.read_state(), state)
+            self.assertEqual(encode_board(self._server.get_rooms()["a"].get_game()), state[2])
+        for client in (first, second):
+            await client.close()
+
+    async def test_rooms_are_thrown_away_when_everyone_leaves(self):
+        client = await self._connect("a")
+        self.assertIn("a", self._server.get_rooms())
+        await client.close()
+        await asyncio.sleep(0.05)
+        self.assertNotIn("a", self._server.get_rooms())
+
+    async def test_a_room_that_fails_to_tick_is_closed_without_stopping_the_others(self):
+        broken = await self._connect("a")
+        other = await self._connect("b")
+
+        def fail():
+            raise RuntimeError("broken room")
+        self._server.get_rooms()["a"].get_game().progress_game = fail
+        with self.assertLogs("python_snake_game_server", "ERROR"):
+            self._server.tick()
+        self.assertNotIn("a", self._server.get_rooms())
+        with self.assertRaises(asyncio.IncompleteReadError):
+            await broken.read_state()
+        self._server.tick()
+        self.assertEqual([1, 2], [(await other.read_state())[0] for _ in range(2)])
+        for client in (broken, other):
+            await client.close()
+
+    async def test_frames_longer_than_the_limit_are_refused_before_they_are_read(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self._server.get_port())
+        # only the length is sent, so the server would wait forever if it tried to read the rest
+        writer.write(struct.pack(">I", MAX_FRAME_BYTES + 1))
+        self.assertEqual(b"", await asyncio.wait_for(reader.read(), 1))
+        writer.close()
+
+        reader = asyncio.StreamReader()
+        reader.feed_data(struct.pack(">I", 4) + b"long")
+        with self.assertRaises(ProtocolError):
+            await read_frame(reader, max_size=3)
+
+    async def test_rooms_with_more_snakes_than_a_board_can_hold_are_refused(self):
+        Room("a", 9, 2 * MAX_SNAKES, MAX_SNAKES)
+        with self.assertRaises(ValueError):
+            Room("a", 30, 30, MAX_SNAKES + 1)
+        with self.assertRaises(ValueError):
+            SnakeServer(snakes_per_room=MAX_SNAKES + 1)
+
+    async def test_servers_with_more_snakes_than_columns_are_refused_before_anyone_joins(self):
+        with self.assertRaises(ValueError):
+            SnakeServer(rows=9, cols=3, snakes_per_room=4)
+        with self.assertRaises(ValueError):
+            SnakeServer(snakes_per_room=COLUMNS + 1)
+        with self.assertRaises(ValueError):
+            Room("a", 9, 3, 4)
+        server = SnakeServer(rows=9, cols=3, snakes_per_room=3, tick_rate=1000)
+        await server.start()
+        client = await SnakeClient.connect("127.0.0.1", server.get_port(), "a")
+        self.assertEqual(3, client.get_snake_count())
+        await client.close()
+        await server.close()
+
+    async def test_a_new_game_starts_when_the_last_one_is_over(self):
+        client = await self._connect("a")
+        game_over = False
+        while not game_over:
+            self._server.tick()
+            tick, game_over, board = await client.read_state()
+        self._server.tick()
+        tick, game_over, board = await client.read_state()
+        self.assertFalse(game_over)
+        self.assertEqual(2, board.count(SNAKE_CELLS) + board.count(SNAKE_CELLS + 2))
+        await client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
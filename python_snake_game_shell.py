@@ -2,14 +2,91 @@
 # author: Robin Jiang
 #
 # this implements a shell version of the python game
+#
+# in a terminal, the board is drawn with ANSI escape codes: it is drawn whole once, and after that only the cells
+# that changed are drawn again, by moving the cursor to them. Every frame is one write, so even big boards
+# play smoothly over a slow connection. If the output isn't a terminal, the board is printed after every move.
+
+import sys
+from typing import TextIO
 
 import python_snake_game_model
 
+# escape codes
+_CLEAR_SCREEN = "\x1b[H\x1b[2J"
+_CLEAR_TO_END = "\x1b[J"
+
+
+class TerminalRenderer:
+    """Draws a SnakeGameState in a terminal, with a status line under the board. The first frame of a game
+    draws the whole board, and after that only the cells where the head, the tail and the point were or are
+    now are looked at, and drawn again if they changed. The cursor is left at the end of the status line."""
+    def __init__(self, out: TextIO = sys.stdout) -> None:
+        self._out = out
+        self._game = None
+        # the symbol on the screen in each cell (row * cols + col)
+        self._symbols = []
+        # the cells of the head, the tail and the point in the last frame
+        self._watched = ()
+
+    def draw(self, game: 'python_snake_game_model.SnakeGameState', status: str = "") -> None:
+        """draws the frame for the game in one write"""
+        if game is not self._game:
+            parts = self._draw_board(game)
+        else:
+            parts = self._draw_changes(game)
+        self._game = game
+        view = game.get_board_view()
+        # the status line is under the bottom border
+        parts.append(f"\x1b[{view.get_rows() + 3};1H{_CLEAR_TO_END}{status}")
+        self._out.write("".join(parts))
+        self._out.flush()
+
+    def redraw(self) -> None:
+        """makes the next frame draw the whole board, for if something else wrote over the screen"""
+        self._game = None
+
+    # protected class methods
+    def _draw_board(self, game: 'python_snake_game_model.SnakeGameState') -> list[str]:
+        """returns the parts of a frame that draws the whole board"""
+        view = game.get_board_view()
+        self._symbols = [view.get_symbol(row, col) for row in range(view.get_rows())
+                         for col in range(view.get_columns())]
+        self._watched = _watched_cells(game)
+        cols = view.get_columns()
+        border = "_" * 3 * cols + "__"
+        lines = [border]
+        for row in range(view.get_rows()):
+            lines.append("|" + "".join([" " + symbol + " " for symbol in self._symbols[row * cols:(row + 1) * cols]]) +
+                         "|")
+        lines.append(border)
+        return [_CLEAR_SCREEN, "\n".join(lines)]
+
+    def _draw_changes(self, game: 'python_snake_game_model.SnakeGameState') -> list[str]:
+        """returns the parts of a frame that draws the cells that changed since the last frame"""
+        view = game.get_board_view()
+        cols = view.get_columns()
+        watched = _watched_cells(game)
+        parts = []
+        for cell in set(self._watched + watched):
+            if cell == -1:
+                continue
+            row, col = divmod(cell, cols)
+            symbol = view.get_symbol(row, col)
+            if symbol != self._symbols[cell]:
+                self._symbols[cell] = symbol
+                # the board starts one line down, and each cell is 3 characters wide after the "|"
+                parts.append(f"\x1b[{row + 2};{3 * col + 3}H{symbol}")
+        self._watched = watched
+        return parts
+
+
 def run() -> None:
     """Runs the shell game"""
     rows, cols = _get_dimensions()
     game = python_snake_game_model.SnakeGameState(rows, cols)
-    game.print_board()
+    renderer = TerminalRenderer() if sys.stdout.isatty() else None
+    _show(game, renderer)
     while not game.get_game_over():
         next_move = input().strip().upper()
         if len(next_move) == 0:
@@ -22,11 +99,29 @@ def run() -> None:
             game.turn_south()
         elif next_move == "A":
             game.turn_west()
-        game.print_board()
-        print(game._already_turned)
+        _show(game, renderer)
     print()
     print("GAME OVER")
 
+
+def _show(game: 'python_snake_game_model.SnakeGameState', renderer: TerminalRenderer | None) -> None:
+    """draws the game with the renderer, or prints the board if there is no renderer"""
+    if renderer is None:
+        game.print_board()
+    else:
+        renderer.draw(game, "W A S D to turn, enter to move: ")
+
+
+def _watched_cells(game: 'python_snake_game_model.SnakeGameState') -> tuple[int, int, int]:
+    """returns the cells of the head, the tail and the point (-1 if there is no point)"""
+    cols = game.get_board_view().get_columns()
+    head = game.get_snake_head()
+    tail = game.get_snake_tail()
+    point = game.get_point_coordinates()
+    return (head.get_row() * cols + head.get_column(), tail.get_row() * cols + tail.get_column(),
+            point[0] * cols + point[1] if point is not None else -1)
+
+
 def _get_dimensions() -> tuple[int, int]:
     """Asks the user for the dimensions of the board"""
     rows, cols = 0, 0
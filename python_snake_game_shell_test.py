@@ -0,0 +1,105 @@
+# python_snake_game_shell_test.py
+# author: Robin Jiang
+#
+# this is the unittesting for the terminal renderer of the shell game
+
+import io
+import random
+import re
+import unittest
+from python_snake_game_model import SnakeGameState
+from python_snake_game_shell import *
+
+
+class TestTerminalRenderer(unittest.TestCase):
+    """Tests that what the renderer writes puts the same board on the screen as print_board"""
+    def test_screen_matches_the_board_after_every_step(self):
+        out = _CountingWriter()
+        renderer = TerminalRenderer(out)
+        screen = _Screen()
+        turn_random = random.Random(0)
+        for seed in range(3):
+            game = SnakeGameState(8, 12, rng=random.Random(seed))
+            while not game.get_game_over():
+                turn_random.choice((game.turn_north, game.turn_east, game.turn_south, game.turn_west))()
+                renderer.draw(game, "status")
+                screen.feed(out.getvalue())
+                out.seek(0)
+                out.truncate()
+                self.assertEqual(game._prepare_print_board().split("\n"), screen.get_lines()[:10])
+                self.assertEqual("status", screen.get_lines()[10])
+                game.progress_game()
+        self.assertEqual(out.flushes, out.writes)
+
+    def test_only_changed_cells_are_drawn_again(self):
+        out = io.StringIO()
+        renderer = TerminalRenderer(out)
+        game = SnakeGameState(60, 60, rng=random.Random(1))
+        renderer.draw(game)
+        full = len(out.getvalue())
+        for _ in range(5):
+            out.seek(0)
+            out.truncate()
+            game.progress_game()
+            renderer.draw(game)
+            self.assertLess(len(out.getvalue()), 60)
+        renderer.redraw()
+        out.seek(0)
+        out.truncate()
+        renderer.draw(game)
+        self.assertEqual(full, len(out.getvalue()))
+
+
+class _CountingWriter(io.StringIO):
+    """StringIO that counts its writes and flushes"""
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes = 0
+        self.flushes = 0
+
+    def write(self, text: str) -> int:
+        self.writes += 1
+        return super().write(text)
+
+    def flush(self) -> None:
+        self.flushes += 1
+
+
+class _Screen:
+    """The few escape codes the renderer uses, played onto a grid of characters"""
+    def __init__(self) -> None:
+        self._lines = [[]]
+        self._row = 0
+        self._col = 0
+
+    def feed(self, text: str) -> None:
+        for token in re.findall(r"\x1b\[[0-9;]*[A-Za-z]|\n|[^\x1b\n]", text):
+            if token == "\n":
+                self._row += 1
+                self._col = 0
+            elif token == "\x1b[2J":
+                self._lines = [[]]
+            elif token == "\x1b[J":
+                del self._lines[self._row + 1:]
+                self._put_line()
+                del self._lines[self._row][self._col:]
+            elif token.endswith("H"):
+                numbers = token[2:-1].split(";") if len(token) > 3 else ["1", "1"]
+                self._row, self._col = int(numbers[0]) - 1, int(numbers[1]) - 1
+            else:
+                self._put_line()
+                line = self._lines[self._row]
+                line.extend(" " * (self._col + 1 - len(line)))
+                line[self._col] = token
+                self._col += 1
+
+    def get_lines(self) -> list[str]:
+        return ["".join(line) for line in self._lines]
+
+    def _put_line(self) -> None:
+        while len(self._lines) <= self._row:
+            self._lines.append([])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,13 +4,19 @@
 # this module contains the gui or "view" of the snake game
 
 import pygame
+import python_snake_game_autopilot
 import python_snake_game_model
+import python_snake_game_profiler
+import python_snake_game_replay
 import random
+import time
 from pathlib import Path
 
 # global constants
-TARGET_FRAMERATE = 30
-CYCLE_SPEED = TARGET_FRAMERATE / 6
+TARGET_FRAMERATE = 60
+TICK_RATE = 6
+MAX_TICKS_PER_FRAME = 5
+POINT_PULSE_TICKS = 8
 ROWS = 9
 COLUMNS = 16
 FONT = "Arial"
@@ -22,6 +28,9 @@ BUTTON_BACKGROUND_COLOR = pygame.Color(13, 105, 115)
 BODY_COLOR = pygame.Color(50, 200, 100)
 HEAD_COLOR = pygame.Color(50, 100, 200)
 POINT_COLOR = pygame.Color(200, 50, 50)
+TEXT_CACHE_SIZE = 64
+PROFILE_OVERLAY_COLOR = pygame.Color(0, 0, 0, 170)
+PROFILE_OVERLAY_FRAMES = 15
 
 
 # KEY_DICT = {pygame.K_LEFT: "LEFT", pygame.K_a: "LEFT", pygame.K_UP: "UP", pygame.K_w: "UP", pygame.K_s: "DOWN", pygame.K_DOWN: "DOWN", pygame.K_d: "RIGHT", pygame.K_RIGHT: "RIGHT"}
@@ -30,8 +39,18 @@ POINT_COLOR = pygame.Color(200, 50, 50)
 class SnakeGame:
     """class that implements the pygame view of a snake game"""
 
-    def __init__(self, **kwargs: 'paths to images') -> None:
-        """init method that initializes all class attributes"""
+    def __init__(self, dirty_rects: bool = False, replay_dir: str | Path | None = None, demo: bool = False,
+                 profile: bool = False, profile_csv: str | Path | None = None, tick_rate: float = TICK_RATE,
+                 frame_rate: int = TARGET_FRAMERATE, **kwargs: 'paths to images') -> None:
+        """init method that initializes all class attributes.
+        If dirty_rects is True, only the parts of the window that changed are redrawn and updated each frame,
+        instead of redrawing everything and flipping the whole display.
+        If replay_dir is given, every game played is recorded there as a replay.
+        If demo is True, the game plays itself with the autopilot, starting a new game whenever one ends.
+        If profile is True, every stage of every frame is timed, and the percentiles are shown over the game
+        (F3 hides and shows them). If profile_csv is also given, the times of every frame are saved there on exit.
+        tick_rate is how many times a second the snake moves, whatever the frame rate. frame_rate is the most
+        frames drawn a second; in between moves the snake is drawn part of the way to its next block."""
         # initializing paths
         self._image_paths = {
                              'avogadro': Path('./img/avogadro.png'),
@@ -54,9 +73,18 @@ class SnakeGame:
 
         # attributes to use when running through game loop
         self._running = True
-        self._cycles = 0
-        self._point_cycles = 0
-        self._game = python_snake_game_model.SnakeGameState(ROWS, COLUMNS)
+        self._tick_rate = tick_rate
+        self._frame_rate = frame_rate
+        # ticks since the game started, and seconds since the last tick
+        self._ticks = 0
+        self._tick_time = 0.0
+        self._replay_dir = replay_dir
+        self._replay_writer = None
+        self._replay_seed = None
+        self._game = self._new_game()
+
+        # steers the snake in demo mode
+        self._autopilot = python_snake_game_autopilot.Autopilot() if demo else None
 
         # possible phases: "START", "GAME", "GAME_OVER_ANIMATION", "GAME_OVER"
         self._phase = "START"
@@ -68,9 +96,45 @@ class SnakeGame:
         self._high_score = 0
         self._current_score = 1
 
-        # tuple of possible links to images for body
-        self._img_link_tuple = random.choice(((self._image_paths['avogadro'], self._image_paths['bananabit']),
-                                              (self._image_paths['bananabit'], self._image_paths['avogadro'])))
+        # tuple of possible images for body
+        self._img_link_tuple = random.choice((('avogadro', 'bananabit'), ('bananabit', 'avogadro')))
+
+        # images loaded once, and the scaled/rotated sprites made from them for the current cell size.
+        # keys of the sprite cache are (image name, (width, height), direction)
+        self._images = {}
+        self._sprite_cache = {}
+        self._sprite_cell_size = None
+
+        # fonts by size, and rendered text keyed by (text, size, color)
+        self._fonts = {}
+        self._text_cache = {}
+
+        # the board and its grid lines, drawn once per window size
+        self._board_surface = None
+        self._board_surface_pos = (0, 0)
+        self._board_surface_size = None
+
+        # for dirty rectangle rendering: the rects blitted in the last frame, and what the last full redraw showed
+        self._dirty_rects = dirty_rects
+        self._drawn_rects = []
+        self._last_full_redraw = None
+
+        # times the stages of each frame. The methods of each stage are only wrapped when profiling,
+        # so that the game doesn't pay for the timing otherwise
+        self._profiler = None
+        self._profile_csv = profile_csv
+        self._profile_overlay = None
+        self._show_profile_overlay = True
+        # frames the overlay has been drawn in, so it is rendered again every PROFILE_OVERLAY_FRAMES frames
+        self._profile_overlay_frames = 0
+        if profile:
+            self._profiler = python_snake_game_profiler.FrameProfiler(keep_history=profile_csv is not None)
+            for stage, names in (("events", ("_handle_events",)), ("model", ("_step_game",)),
+                                 ("board", ("_draw_game",)), ("snake", ("_draw_snake",)),
+                                 ("text", ("_blit_score", "_render_text", "_draw_game_over")),
+                                 ("flip", ("_flip", "_update_display"))):
+                for name in names:
+                    setattr(self, name, self._profiler.wrap(stage, getattr(self, name)))
 
     def run(self) -> None:
         pygame.init()
@@ -79,25 +143,79 @@ class SnakeGame:
         clock = pygame.time.Clock()
         pygame.display.set_caption('Snake')
         pygame.display.set_icon(pygame.image.load(self._image_paths['icon']))
+        self._load_images()
+        if self._autopilot is not None:
+            self._start_game()
+        drawn_phase = None
         while self._running:
-            clock.tick(TARGET_FRAMERATE)
-            self._cycles += 1
-            self._point_cycles += 1
-            if self._cycles == CYCLE_SPEED:
-                self._cycles = 0
-                if self._phase == "GAME":
-                    self._game.progress_game()
-                    self._update_score()
-                if self._phase == "GAME_OVER_ANIMATION":
-                    self._phase = "GAME_OVER"
-            if self._point_cycles == 8 * CYCLE_SPEED:
-                self._point_cycles = 0
-            self._handle_events()
-            self._redraw()
+            # the time since the last frame, including any time spent waiting for events
+            seconds = clock.tick(self._frame_rate) / 1000
+            if self._profiler is not None:
+                self._profiler.start_frame()
+            self._advance(seconds)
+            handled = self._handle_events()
+            # the start and game over screens only change when something happens,
+            # so there is no need to draw them again until then
+            redraw = self._phase in ("GAME", "GAME_OVER_ANIMATION") or handled or self._phase != drawn_phase
+            if redraw:
+                self._redraw()
+                drawn_phase = self._phase
+            if self._profiler is not None and redraw:
+                self._profiler.end_frame()
+            if not redraw:
+                self._wait_for_event(1 / self._tick_rate - self._tick_time)
+        self._stop_recording()
+        if self._profiler is not None and self._profile_csv is not None:
+            self._profiler.write_csv(self._profile_csv)
         pygame.quit()
 
+    def get_profiler(self) -> 'python_snake_game_profiler.FrameProfiler | None':
+        return self._profiler
+
     # protected class methods
 
+    def _advance(self, seconds: float) -> None:
+        """Moves the game on by seconds, doing a tick for every 1 / tick_rate seconds that have passed.
+        If the game has fallen far behind, the ticks it missed are dropped instead of being done all at once."""
+        tick_seconds = 1 / self._tick_rate
+        self._tick_time = min(self._tick_time + seconds, MAX_TICKS_PER_FRAME * tick_seconds)
+        while self._tick_time >= tick_seconds:
+            self._tick_time -= tick_seconds
+            self._tick()
+
+    def _tick(self) -> None:
+        """Moves the game on by one tick. The game over animation starts on the tick the game ends, so that
+        the rest of the ticks of the frame don't step a game that is over."""
+        self._ticks += 1
+        if self._phase == "GAME_OVER" and self._autopilot is not None:
+            self._restart_game()
+        if self._phase == "GAME":
+            self._step_game()
+            if self._game.get_game_over():
+                self._phase = "GAME_OVER_ANIMATION"
+                self._stop_recording()
+        elif self._phase == "GAME_OVER_ANIMATION":
+            self._phase = "GAME_OVER"
+
+    def _get_tick_progress(self) -> float:
+        """returns how far the game is from the last tick to the next one, from 0 to 1"""
+        return min(self._tick_time * self._tick_rate, 1.0)
+
+    def _wait_for_event(self, seconds: float) -> None:
+        """Sleeps until there is an event or for seconds, whichever comes first. The event is left in the queue."""
+        event = pygame.event.wait(max(1, int(seconds * 1000)))
+        if event.type != pygame.NOEVENT:
+            pygame.event.post(event)
+
+    def _step_game(self) -> None:
+        """moves the snake forward one block, recording the move if the game is being recorded"""
+        if self._autopilot is not None:
+            self._steer()
+        self._game.progress_game()
+        if self._replay_writer is not None:
+            self._replay_writer.record_step()
+        self._update_score()
+
     def _update_score(self) -> None:
         """updates the score and last snake part version"""
         if self._current_score < self._game.get_snake_length():
@@ -105,37 +223,114 @@ class SnakeGame:
         if self._current_score > self._high_score:
             self._high_score = self._current_score
 
-    def _handle_events(self) -> None:
-        for event in pygame.event.get():
+    def _handle_events(self) -> bool:
+        """handles the events since the last frame, and returns whether there were any"""
+        events = pygame.event.get()
+        for event in events:
             if event.type == pygame.QUIT:
                 self._running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3 and self._profiler is not None:
+                self._show_profile_overlay = not self._show_profile_overlay
+                self._last_full_redraw = None
             elif event.type == pygame.KEYDOWN:
                 self._turn_snake(event.key)
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 self._handle_click(event.pos)
-        if self._game.get_game_over() and self._phase == "GAME":
-            self._phase = "GAME_OVER_ANIMATION"
+            elif event.type == pygame.VIDEORESIZE:
+                self._clear_caches()
+        return len(events) > 0
 
     def _resize_surface(self, size: tuple[int, int]) -> None:
         """Resizes the pygame window to the size."""
         pygame.display.set_mode(size, pygame.RESIZABLE)
+        self._clear_caches()
+
+    def _clear_caches(self) -> None:
+        """Throws away everything that was drawn for the old window size."""
+        self._sprite_cache.clear()
+        self._sprite_cell_size = None
+        self._text_cache.clear()
+        self._board_surface = None
+
+    def _get_font(self, size: int) -> pygame.font.Font:
+        """Returns the font with the given size, only looking it up the first time."""
+        font = self._fonts.get(size)
+        if font is None:
+            font = pygame.font.SysFont(FONT, size)
+            self._fonts[size] = font
+        return font
+
+    def _render_text(self, text: str, size: int, color: pygame.Color) -> pygame.Surface:
+        """Returns the text rendered in the given size and color, only rendering it if it isn't cached yet."""
+        key = (text, size, tuple(color))
+        rendered = self._text_cache.get(key)
+        if rendered is None:
+            if len(self._text_cache) >= TEXT_CACHE_SIZE:
+                # old scores are never drawn again, so just start over
+                self._text_cache.clear()
+            rendered = self._get_font(size).render(text, True, color)
+            self._text_cache[key] = rendered
+        return rendered
+
+    def _load_images(self) -> None:
+        """Loads the images for the snake and the point. Only needs to be done once."""
+        for name in ('avogadro', 'bananabit', 'materwelon', 'strawberry'):
+            self._images[name] = pygame.image.load(self._image_paths[name]).convert_alpha()
+
+    def _build_sprite_cache(self, size: tuple[int, int]) -> None:
+        """Scales and rotates the snake images for every direction for the new cell size."""
+        self._sprite_cache.clear()
+        self._sprite_cell_size = size
+        for name in ('avogadro', 'bananabit', 'materwelon'):
+            for direction in "NESW":
+                self._get_sprite(name, size, direction)
+
+    def _get_sprite(self, name: str, size: tuple[int, int], direction: str | None) -> pygame.Surface:
+        """Returns the image scaled to size and rotated to face direction, making it if it isn't cached yet."""
+        key = (name, size, direction)
+        sprite = self._sprite_cache.get(key)
+        if sprite is None:
+            if name not in self._images:
+                self._load_images()
+            sprite = self._rotate_image(pygame.transform.scale(self._images[name], size), direction)
+            self._sprite_cache[key] = sprite
+        return sprite
 
     def _turn_snake(self, key: int) -> None:
         """handles keystrokes to turn the snake when the key is first pressed down"""
-        if self._phase == "GAME":
+        if self._phase == "GAME" and self._autopilot is None:
             if self._turn_east(key):
-                self._game.turn_east()
+                self._turn("E")
             elif self._turn_south(key):
-                self._game.turn_south()
+                self._turn("S")
             elif self._turn_west(key):
-                self._game.turn_west()
+                self._turn("W")
             elif self._turn_north(key):
-                self._game.turn_north()
+                self._turn("N")
         elif self._phase == "START" and key == pygame.K_SPACE:
-            self._phase = "GAME"
+            self._start_game()
         elif self._phase == "GAME_OVER" and key == pygame.K_SPACE:
             self._restart_game()
 
+    def _turn(self, direction: str) -> None:
+        """turns the snake in the direction ("N", "E", "S", "W"), and records the turn if it did something"""
+        if direction == "E":
+            turned = self._game.turn_east()
+        elif direction == "S":
+            turned = self._game.turn_south()
+        elif direction == "W":
+            turned = self._game.turn_west()
+        else:
+            turned = self._game.turn_north()
+        if turned and self._replay_writer is not None:
+            self._replay_writer.record_turn(direction)
+
+    def _steer(self) -> None:
+        """lets the autopilot turn the snake before the next step"""
+        move = self._autopilot.choose_move(self._game)
+        if move is not None:
+            self._turn(move)
+
     def _turn_east(self, key: int) -> bool:
         return key in (pygame.K_RIGHT, pygame.K_d)
 
@@ -151,6 +346,12 @@ class SnakeGame:
     def _redraw(self) -> None:
         """Draws the board"""
         surface = pygame.display.get_surface()
+        full_redraw = (self._phase, surface.get_size(), self._current_score, self._high_score)
+        if self._dirty_rects and full_redraw == self._last_full_redraw:
+            self._redraw_dirty(surface)
+            return
+        self._last_full_redraw = full_redraw
+        self._drawn_rects = []
         surface.fill(BACKGROUND_COLOR)
         if self._phase == "START":
             self._draw_start_screen(surface)
@@ -160,8 +361,58 @@ class SnakeGame:
             self._blit_score(surface)
         elif self._phase == "GAME_OVER":
             self._draw_game_over(surface)
+        self._draw_profile_overlay(surface)
+        self._flip()
+
+    def _flip(self) -> None:
         pygame.display.flip()
 
+    def _update_display(self, rects: list[pygame.Rect]) -> None:
+        pygame.display.update(rects)
+
+    def _redraw_dirty(self, surface: pygame.Surface) -> None:
+        """Redraws only the snake and the point, and updates only the parts of the display they covered
+        in this frame and the last one. Everything else is the same as the last full redraw."""
+        if self._phase not in ("GAME", "GAME_OVER_ANIMATION"):
+            # the start and game over screens don't change between frames
+            return
+        previous_rects = self._drawn_rects
+        for rect in previous_rects:
+            self._restore_background(surface, rect)
+        self._drawn_rects = []
+        self._draw_snake(surface)
+        self._draw_profile_overlay(surface)
+        self._update_display(previous_rects + self._drawn_rects)
+
+    def _draw_profile_overlay(self, surface: pygame.Surface) -> None:
+        """Draws the percentiles of the frame and of each stage in the bottom left corner, if profiling.
+        The text is only rendered again every few frames, so that drawing it hardly shows up in the times."""
+        if self._profiler is None or not self._show_profile_overlay:
+            return
+        if self._profile_overlay is None or self._profile_overlay_frames % PROFILE_OVERLAY_FRAMES == 0:
+            # rendered without _render_text, so the overlay is neither cached nor counted as text
+            font = self._get_font(14)
+            lines = [font.render(f"{stage:>6}  p50 {p50:6.2f}  p95 {p95:6.2f}  p99 {p99:6.2f} ms", True, TEXT_COLOR)
+                     for stage, (p50, p95, p99) in self._profiler.get_summary().items()]
+            line_height = font.get_linesize()
+            overlay = pygame.Surface((max(line.get_width() for line in lines) + 8, line_height * len(lines) + 8),
+                                     pygame.SRCALPHA)
+            overlay.fill(PROFILE_OVERLAY_COLOR)
+            for i, line in enumerate(lines):
+                overlay.blit(line, (4, 4 + i * line_height))
+            self._profile_overlay = overlay
+        self._profile_overlay_frames += 1
+        rect = surface.blit(self._profile_overlay, self._profile_overlay.get_rect(bottomleft=(0, surface.get_height())))
+        self._drawn_rects.append(rect)
+
+    def _restore_background(self, surface: pygame.Surface, rect: pygame.Rect) -> None:
+        """Draws the background and the board back over the rect, erasing whatever was blitted there."""
+        surface.fill(BACKGROUND_COLOR, rect)
+        board_rect = self._board_surface.get_rect(topleft=self._board_surface_pos)
+        clipped = rect.clip(board_rect)
+        if clipped.width > 0 and clipped.height > 0:
+            surface.blit(self._board_surface, clipped, area=clipped.move(-board_rect.x, -board_rect.y))
+
     def _draw_start_screen(self, surface: pygame.Surface) -> None:
         """Draws the start screen"""
         # drawing the button
@@ -181,8 +432,7 @@ class SnakeGame:
         pygame.draw.rect(surface, TEXT_COLOR, self._starting_button, width=2, border_radius=border_radius)
 
         # blitting the "START" text over the button
-        font = pygame.font.SysFont(FONT, _round(button_height * 0.8))
-        text = font.render("START", True, TEXT_COLOR)
+        text = self._render_text("START", _round(button_height * 0.8), TEXT_COLOR)
         text_box = text.get_rect()
         text_box.center = (width_pix / 2, height_pix / 2)
         surface.blit(text, text_box)
@@ -193,11 +443,10 @@ class SnakeGame:
         width_pix = surface.get_width()
         height_pix = surface.get_height()
         font_height = _round(min(width_pix * 0.07, height_pix / 20))
-        font = pygame.font.SysFont(FONT, font_height)
-        text1 = font.render("Left Arrow = Turn West", True, color)
-        text2 = font.render("Right Arrow = Turn East", True, color)
-        text3 = font.render("Down Arrow = Turn South", True, color)
-        text4 = font.render("Up Arrow = Turn North", True, color)
+        text1 = self._render_text("Left Arrow = Turn West", font_height, color)
+        text2 = self._render_text("Right Arrow = Turn East", font_height, color)
+        text3 = self._render_text("Down Arrow = Turn South", font_height, color)
+        text4 = self._render_text("Up Arrow = Turn North", font_height, color)
         text1_box, text2_box, text3_box, text4_box = text1.get_rect(), text2.get_rect(), \
             text3.get_rect(), text4.get_rect()
         text1_box.center = (width_pix / 2, font_height * 1)
@@ -240,7 +489,7 @@ class SnakeGame:
             rect = self._starting_button
             if (rect.centerx - rect.width / 2 < pos[0] < rect.centerx + rect.width / 2 and
                     rect.centery - rect.height / 2 < pos[1] < rect.centery + rect.height / 2):
-                self._phase = "GAME"
+                self._start_game()
         elif self._phase == "GAME_OVER":
             rect = self._restart_button
             if (rect.centerx - rect.width / 2 < pos[0] < rect.centerx + rect.width / 2 and
@@ -249,40 +498,58 @@ class SnakeGame:
 
     def _draw_game(self, surface: pygame.Surface) -> None:
         """draws the game board."""
-        width_pix = surface.get_width()
-        height_pix = surface.get_height()
+        if self._board_surface is None or self._board_surface_size != surface.get_size():
+            self._build_board_surface(surface.get_size())
+        surface.blit(self._board_surface, self._board_surface_pos)
+
+        self._blit_score(surface)
+
+    def _build_board_surface(self, size: tuple[int, int]) -> None:
+        """draws the board, its border and the grid lines onto an off-screen surface.
+        Only needs to be done again when the window is resized."""
+        width_pix, height_pix = size
 
         box_width = min(0.9 * width_pix / COLUMNS, 0.8 * height_pix / ROWS)
         game_width = (box_width + 1) * COLUMNS
         game_height = (box_width + 1) * ROWS
         top_left_x = (width_pix - game_width) / 2
         top_left_y = 0.1 * height_pix
-
-        # draw a rectangle to be the background color of the game
         self._game_rect = pygame.Rect(top_left_x, top_left_y, game_width, game_height)
-        pygame.draw.rect(surface, BOARD_COLOR, self._game_rect)
 
-        # draws a border around the game, in a rectangle 2px wider and taller and 3px thick
+        # the border goes around the game, in a rectangle 2px wider and taller and 3px thick
         delta = 3
         board_outline = pygame.Rect(top_left_x - delta, top_left_y - delta,
                                     game_width + 2 * delta - 1, game_height + 2 * delta - 1)
-        pygame.draw.rect(surface, BOARD_BORDER_COLOR, board_outline, width=delta)
+
+        # everything is drawn relative to the top left corner of the border
+        offset_x, offset_y = board_outline.topleft
+        board_surface = pygame.Surface(board_outline.size)
+        board_surface.fill(BACKGROUND_COLOR)
+        top_left_x -= offset_x
+        top_left_y -= offset_y
+
+        # draw a rectangle to be the background color of the game
+        pygame.draw.rect(board_surface, BOARD_COLOR, self._game_rect.move(-offset_x, -offset_y))
+        pygame.draw.rect(board_surface, BOARD_BORDER_COLOR, board_outline.move(-offset_x, -offset_y), width=delta)
 
         # draw the lines inside the board that make a grid pattern
         for delta_rows in range(1, ROWS):
             y_level = _round(top_left_y + delta_rows * (game_height / ROWS) - 1)
-            pygame.draw.line(surface, BOARD_BORDER_COLOR, (top_left_x, y_level), (top_left_x + game_width - 2, y_level))
+            pygame.draw.line(board_surface, BOARD_BORDER_COLOR, (top_left_x, y_level),
+                             (top_left_x + game_width - 2, y_level))
         for delta_cols in range(1, COLUMNS):
             x_level = _round(top_left_x + delta_cols * (game_width / COLUMNS) - 1)
-            pygame.draw.line(surface, BOARD_BORDER_COLOR, (x_level, top_left_y),
+            pygame.draw.line(board_surface, BOARD_BORDER_COLOR, (x_level, top_left_y),
                              (x_level, top_left_y + game_height - 2))
 
-        self._blit_score(surface)
+        self._board_surface = board_surface
+        self._board_surface_pos = (offset_x, offset_y)
+        self._board_surface_size = size
 
     def _draw_snake(self, surface: pygame.Surface) -> None:
         """draws the snake on the surface"""
 
-        game = self._game.get_board()
+        board = self._game.get_board_view()
         snake_part = self._game.get_snake_tail()
         # snake_pos used to alternate colors in snake body
         snake_pos = 1
@@ -298,13 +565,17 @@ class SnakeGame:
         # draw head
         self._calculate_snake_part_and_draw(surface, snake_part)
 
-        # draw point
+        # draw point. points don't know where they are, so the coordinates come from the game
         if self._game.get_point_coordinates() is not None:
-            self._calculate_snake_part_and_draw(surface, game[self._game.get_point_coordinates()[0]][self._game.get_point_coordinates()[1]])
-
-    def _calculate_snake_part_and_draw(self, surface: pygame.Surface, snake_part: python_snake_game_model.Block, pos: int = 0) -> None:
-        part_x = _round(self._game_rect.topleft[0] + (snake_part.get_column()) * self._game_rect.width / COLUMNS)
-        part_y = _round(self._game_rect.topleft[1] + (snake_part.get_row()) * self._game_rect.height / ROWS)
+            row, col = self._game.get_point_coordinates()
+            self._calculate_snake_part_and_draw(surface, board.get_block(row, col), row=row, col=col)
+
+    def _calculate_snake_part_and_draw(self, surface: pygame.Surface, snake_part: python_snake_game_model.Block,
+                                       pos: int = 0, row: int | None = None, col: int | None = None) -> None:
+        if row is None:
+            row, col = snake_part.get_row(), snake_part.get_column()
+        part_x = _round(self._game_rect.topleft[0] + col * self._game_rect.width / COLUMNS)
+        part_y = _round(self._game_rect.topleft[1] + row * self._game_rect.height / ROWS)
         self._draw_snake_part(part_x, part_y, snake_part, surface, pos)
 
     def _draw_snake_part(self, x: int, y: int, snake_part: python_snake_game_model.Block,
@@ -313,54 +584,51 @@ class SnakeGame:
         # subtract 1 from width to fit inside the box from trial and error
         width = self._game_rect.width / COLUMNS - 1
         height = self._game_rect.height / ROWS - 1
-        bounding_rect = pygame.Rect(x, y, width, height)
+        cell_size = (int(width), int(height))
+        if cell_size != self._sprite_cell_size:
+            self._build_sprite_cache(cell_size)
         if snake_part.get_state() == "H":
-            head_img = pygame.image.load(self._image_paths['materwelon'])
-            head_img = pygame.transform.scale(head_img, (width, height))
-            head_img = self._rotate_snake_head(head_img, snake_part)
+            head_img = self._get_sprite('materwelon', cell_size, snake_part.get_direction())
             img_x, img_y = self._calculate_snake_part_coordinates(x, y, width, height, snake_part)
-            surface.blit(head_img, (img_x, img_y))
+            self._drawn_rects.append(surface.blit(head_img, (img_x, img_y)))
         elif snake_part.get_state() == "P":
-            point_img = pygame.image.load(self._image_paths['strawberry'])
-            if self._point_cycles <= 20:
-                img_width = width * 0.7 + width * 0.3 * (self._point_cycles/(4 * CYCLE_SPEED))
-                img_height = height * 0.7 + height * 0.3 * (self._point_cycles/(4 * CYCLE_SPEED))
-                point_img = pygame.transform.scale(point_img, (img_width, img_height))
+            # the point grows for the first half of a pulse and shrinks for the second
+            pulse = (self._ticks % POINT_PULSE_TICKS + self._get_tick_progress()) / POINT_PULSE_TICKS
+            if pulse <= 0.5:
+                img_width = width * 0.7 + width * 0.3 * (pulse * 2)
+                img_height = height * 0.7 + height * 0.3 * (pulse * 2)
             else:
-                img_width = width - width * 0.3 * ((self._point_cycles - 20)/(4 * CYCLE_SPEED))
-                img_height = height - height * 0.3 * ((self._point_cycles - 20)/(4 * CYCLE_SPEED))
-                point_img = pygame.transform.scale(point_img, (img_width, img_height))
-            point_img = self._rotate_snake_head(point_img, snake_part)
+                img_width = width - width * 0.3 * ((pulse - 0.5) * 2)
+                img_height = height - height * 0.3 * ((pulse - 0.5) * 2)
+            point_img = self._get_sprite('strawberry', (int(img_width), int(img_height)), snake_part.get_direction())
             img_x, img_y = (x + (width - img_width)/2, y + (height - img_height)/2)
-            surface.blit(point_img, (img_x, img_y))
+            self._drawn_rects.append(surface.blit(point_img, (img_x, img_y)))
         elif snake_part.get_state() == "B":
-            pic_link = self._img_link_tuple[pos % 2]
-            body_img = pygame.image.load(pic_link)
-            body_img = pygame.transform.scale(body_img, (width, height))
-            body_img = self._rotate_snake_head(body_img, snake_part)
+            body_img = self._get_sprite(self._img_link_tuple[pos % 2], cell_size, snake_part.get_direction())
             img_x, img_y = self._calculate_snake_part_coordinates(x, y, width, height, snake_part)
-            surface.blit(body_img, (img_x, img_y))
+            self._drawn_rects.append(surface.blit(body_img, (img_x, img_y)))
 
-    def _rotate_snake_head(self, head_img: pygame.image, snake_part: python_snake_game_model.Block) -> pygame.image:
-        """rotates the snake block in accordance to the direction it is facing"""
-        return_img = head_img
+    def _rotate_image(self, img: pygame.Surface, direction: str | None) -> pygame.Surface:
+        """rotates the image to face the direction"""
+        return_img = img
         # no intermediate images turning:
-        match snake_part.get_direction():
+        match direction:
             case "N":
-                return_img = pygame.transform.rotate(head_img, 0)
+                return_img = pygame.transform.rotate(img, 0)
             case "E":
-                return_img = pygame.transform.rotate(head_img, 270)
+                return_img = pygame.transform.rotate(img, 270)
             case "S":
-                return_img = pygame.transform.rotate(head_img, 180)
+                return_img = pygame.transform.rotate(img, 180)
             case "W":
-                return_img = pygame.transform.rotate(head_img, 90)
+                return_img = pygame.transform.rotate(img, 90)
         return return_img
 
     def _calculate_snake_part_coordinates(self, x: int, y: int, width: int, height: int,
                                           snake_part: python_snake_game_model.Block) -> tuple[int, int]:
-        """calculates the coordinates of the snake part so that it looks animated"""
+        """calculates the coordinates of the snake part so that it looks animated: it is drawn as far towards
+        its next block as the game is towards the next tick"""
         multiplier = 1
-        max_cycle = int(CYCLE_SPEED)
+        max_progress = 1.0
         if self._phase == "GAME_OVER_ANIMATION":
             if snake_part.get_state() == "H":
                 multiplier = -1
@@ -370,16 +638,17 @@ class SnakeGame:
                 snake_part.get_direction() == "E" and snake_part.get_column() == COLUMNS - 1 or
                 snake_part.get_direction() == "S" and snake_part.get_row() == ROWS - 1 or
                 snake_part.get_direction() == "W" and snake_part.get_column() == 0):
-            max_cycle = int(max_cycle / 2)
+            max_progress = 0.5
+        progress = min(self._get_tick_progress(), max_progress) * multiplier
         match snake_part.get_direction():
             case "N":
-                y = y - (height / CYCLE_SPEED * min(self._cycles, max_cycle) * multiplier)
+                y = y - height * progress
             case "E":
-                x = x + (width / CYCLE_SPEED * min(self._cycles, max_cycle) * multiplier)
+                x = x + width * progress
             case "S":
-                y = y + (height / CYCLE_SPEED * min(self._cycles, max_cycle) * multiplier)
+                y = y + height * progress
             case "W":
-                x = x - (width / CYCLE_SPEED * min(self._cycles, max_cycle) * multiplier)
+                x = x - width * progress
         return x, y
 
     def _blit_score(self, surface: pygame.Surface) -> None:
@@ -389,9 +658,8 @@ class SnakeGame:
         height_pix = surface.get_height()
         text_width = min(100, _round(width_pix * 0.3))
         text_height = min(_round(text_width / (1.4 * 4)), _round(height_pix / 2 * 0.1))
-        font = pygame.font.SysFont(FONT, text_height)
-        text_current_score = font.render(f"Score = {self._current_score}", True, color)
-        text_high_score = font.render(f"High Score = {self._high_score}", True, color)
+        text_current_score = self._render_text(f"Score = {self._current_score}", text_height, color)
+        text_high_score = self._render_text(f"High Score = {self._high_score}", text_height, color)
         text_box_current_score = text_current_score.get_rect()
         text_box_high_score = text_high_score.get_rect()
         text_box_current_score.center = (width_pix * 0.15, 1.1 * text_height)
@@ -406,11 +674,10 @@ class SnakeGame:
         height_pix = surface.get_height()
         text_width = min(300, _round(width_pix * 0.7))
         text_height = min(_round(text_width / (1.3 * 4)), _round(height_pix / 2 * 0.5))
-        font = pygame.font.SysFont(FONT, text_height)
-        font_small = pygame.font.SysFont(FONT, _round(text_height * 0.8))
-        text_game_over = font.render("GAME OVER", True, color)
-        text_current_score = font_small.render(f"Score = {self._current_score}", True, color)
-        text_high_score = font_small.render(f"High Score = {self._high_score}", True, color)
+        small_height = _round(text_height * 0.8)
+        text_game_over = self._render_text("GAME OVER", text_height, color)
+        text_current_score = self._render_text(f"Score = {self._current_score}", small_height, color)
+        text_high_score = self._render_text(f"High Score = {self._high_score}", small_height, color)
         text_box_game_over = text_game_over.get_rect()
         text_box_current_score = text_current_score.get_rect()
         text_box_high_score = text_high_score.get_rect()
@@ -435,17 +702,39 @@ class SnakeGame:
         pygame.draw.rect(surface, TEXT_COLOR, self._restart_button, width=2, border_radius=border_radius)
 
         # blitting the "START" text over the button
-        font = pygame.font.SysFont(FONT, _round(button_height * 0.6))
-        text = font.render("RESTART", True, TEXT_COLOR)
+        text = self._render_text("RESTART", _round(button_height * 0.6), TEXT_COLOR)
         text_box = text.get_rect()
         text_box.center = (width_pix / 2, height_pix * 0.7)
         surface.blit(text, text_box)
 
+    def _new_game(self) -> python_snake_game_model.SnakeGameState:
+        """makes a new game. If games are being recorded, it gets its own seed so it can be replayed."""
+        if self._replay_dir is None:
+            return python_snake_game_model.SnakeGameState(ROWS, COLUMNS)
+        self._replay_seed = random.getrandbits(64)
+        return python_snake_game_model.SnakeGameState(ROWS, COLUMNS, rng=random.Random(self._replay_seed))
+
+    def _start_game(self) -> None:
+        """starts playing the current game, and starts recording it if games are being recorded"""
+        self._phase = "GAME"
+        if self._replay_dir is not None:
+            self._stop_recording()
+            path = Path(self._replay_dir) / f"{time.strftime('%Y%m%d-%H%M%S')}-{self._replay_seed:016x}.snkr"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._replay_writer = python_snake_game_replay.ReplayWriter(open(path, "wb"), ROWS, COLUMNS,
+                                                                        self._replay_seed)
+
+    def _stop_recording(self) -> None:
+        """finishes the replay of the current game, if there is one"""
+        if self._replay_writer is not None:
+            self._replay_writer.close()
+            self._replay_writer = None
+
     def _restart_game(self) -> None:
         """restarts the game"""
-        self._game = python_snake_game_model.SnakeGameState(ROWS, COLUMNS)
-        self._phase = "GAME"
-        self._cycles = 0
+        self._game = self._new_game()
+        self._start_game()
+        self._tick_time = 0.0
         self._current_score = 1
 
 
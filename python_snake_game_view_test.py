@@ -0,0 +1,61 @@
+# python_snake_game_view_test.py
+# author: Robin Jiang
+#
+# this is the unittesting for the game loop of the pygame view (not the drawing)
+
+import os
+import random
+import unittest
+
+# draw off-screen so the tests can run without a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from python_snake_game_view import *
+
+
+class TestTicks(unittest.TestCase):
+    """Tests that the game moves on by ticks, whatever the frame rate"""
+    def test_several_ticks_in_one_frame_stop_when_the_game_ends(self):
+        # the snake starts in the middle of the board going north, so it crashes on its fifth move
+        for tick_rate, seconds in ((120, 1 / 60), (TICK_RATE, 0.5)):
+            random.seed(0)
+            game = SnakeGame(tick_rate=tick_rate)
+            game._phase = "GAME"
+            while game._phase == "GAME":
+                game._advance(seconds)
+            self.assertTrue(game._game.get_game_over())
+            self.assertIn(game._phase, ("GAME_OVER_ANIMATION", "GAME_OVER"))
+            for _ in range(3):
+                game._advance(seconds)
+            self.assertEqual("GAME_OVER", game._phase)
+
+    def test_ticks_follow_the_time_not_the_frames(self):
+        game = SnakeGame(tick_rate=10)
+        game._phase = "GAME"
+        for _ in range(30):
+            game._advance(1 / 144)
+        self.assertEqual(2, game._ticks)
+        game._advance(10)
+        self.assertEqual(2 + MAX_TICKS_PER_FRAME, game._ticks)
+
+
+class TestProfileOverlay(unittest.TestCase):
+    """Tests the overlay of frame times"""
+    def test_overlay_is_rendered_every_few_frames_once_the_window_is_full(self):
+        pygame.init()
+        game = SnakeGame(profile=True)
+        surface = pygame.Surface((800, 450))
+        profiler = game.get_profiler()
+        overlays = []
+        for _ in range(1000):
+            profiler.start_frame()
+            game._draw_profile_overlay(surface)
+            if len(overlays) == 0 or overlays[-1] is not game._profile_overlay:
+                overlays.append(game._profile_overlay)
+            profiler.end_frame()
+        pygame.quit()
+        self.assertEqual(-(-1000 // PROFILE_OVERLAY_FRAMES), len(overlays))
+
+
+if __name__ == "__main__":
+    unittest.main()